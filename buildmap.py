@@ -3,8 +3,8 @@ BuildMap - n8n Workflow Builder Prototype
 A conversational assistant that guides users through building n8n workflows phase-by-phase.
 """
 
-import json
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -12,8 +12,26 @@ import streamlit as st
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from llm_integration.context_window import ContextBudgetError, build_context
+from llm_integration.hedging import hedge_policy, hedged_completion
+from llm_integration.metrics import stream_metrics
+from llm_integration.openrouter_client import openrouter_clients
+from llm_integration.prompt_cache import system_prompt_cache
+from llm_integration.prompt_caching import (
+    apply_cache_control,
+    cache_request_options,
+    parse_usage,
+)
+from llm_integration.response_cache import make_cache_key, response_cache
+from llm_integration.stream_renderer import StreamRenderer
+from n8n_integration.export_store import ExportStore
+from n8n_integration.export_writer import ExportWriter
+from n8n_integration.health_monitor import health_monitor
 from n8n_integration.n8n_client import n8n_client
+from n8n_integration.node_catalog import node_catalog
+from n8n_integration.tracing import tracer
 from n8n_integration.workflow_manager import workflow_manager
+from n8n_integration.workflow_mirror import workflow_mirror
 
 # Load environment variables
 load_dotenv()
@@ -71,31 +89,43 @@ MODELS = {
     "anthropic/claude-3-haiku": "Claude 3 Haiku",
 }
 
+# Sampling settings for each answer
+TEMPERATURE = 0.7
+MAX_OUTPUT_TOKENS = 4000
+
 # Create exports directory
 EXPORTS_DIR = Path(__file__).parent / "exports"
 os.makedirs(EXPORTS_DIR, exist_ok=True)
+export_store = ExportStore(EXPORTS_DIR)
+# Exports are written behind the chat on a background thread
+export_writer = ExportWriter(export_store)
+workflow_manager.export_writer = export_writer
+# Validate node types and versions against what the instance has installed
+n8n_client.node_types = node_catalog
 
 
 def save_workflow(workflow_json: dict, phase_name: str) -> str:
-    """Save workflow JSON to file and return filename"""
+    """Queue workflow JSON for the export store and return its filename"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"workflow_{phase_name}_{timestamp}.json"
-    filepath = EXPORTS_DIR / filename
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(workflow_json, f, indent=2)
+    # Identical workflows share one compressed blob; the name is a reference.
+    # The write happens on the export writer thread, off the script thread.
+    export_writer.submit(workflow_json, filename)
 
     return filename
 
 
 def load_system_prompt() -> str:
-    """Load the system prompt from file."""
-    prompt_path = Path(__file__).parent / "prompts" / "system_prompt.txt"
+    """Load the system prompt (cached process-wide, reloaded when edited).
+
+    The node types installed on the n8n instance are appended from the
+    node catalog, which refreshes itself in the background.
+    """
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return system_prompt_cache.get().text + node_catalog.prompt_section()
     except FileNotFoundError:
-        st.error(f"System prompt file not found at {prompt_path}")
+        st.error(f"System prompt file not found at {system_prompt_cache.path}")
         return "You are a helpful assistant for building n8n workflows."
 
 
@@ -105,13 +135,15 @@ def initialize_session_state():
         st.session_state.messages = []
     if "model" not in st.session_state:
         st.session_state.model = "anthropic/claude-sonnet-4"
+    if "usage_log" not in st.session_state:
+        st.session_state.usage_log = []
 
     # Initialize workflow manager session state
     workflow_manager.initialize_session_state()
 
 
 def get_openrouter_client() -> OpenAI:
-    """Create and return an OpenRouter client."""
+    """Return the process-wide OpenRouter client for the configured key."""
     api_key = os.getenv("OPENROUTER_API_KEY")
 
     if not api_key:
@@ -121,37 +153,161 @@ def get_openrouter_client() -> OpenAI:
         )
         st.stop()
 
-    return OpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key)
+    # Shared across sessions and reruns so connections stay warm
+    return openrouter_clients.get_client(api_key)
 
 
 def stream_response(client: OpenAI, messages: list, model: str):
     """Stream response from OpenRouter API."""
+    timer = None
     try:
         system_prompt = load_system_prompt()
 
-        # Prepare messages with system prompt
-        api_messages = [{"role": "system", "content": system_prompt}] + messages
+        # Fit system prompt + history into the model's budget (raises before
+        # any network call if even the latest message cannot fit)
+        with tracer.span("llm.build_context", model=model) as span:
+            context = build_context(
+                system_prompt, messages, model, max_output_tokens=MAX_OUTPUT_TOKENS
+            )
+            span.set(tokens=context.tokens, dropped=context.dropped)
+        st.session_state.last_context = {
+            "tokens": context.tokens,
+            "budget": context.budget,
+            "dropped": context.dropped,
+            "trimmed": context.trimmed,
+        }
+
+        # Replay identical requests from the response cache (opt-in)
+        cache_key = None
+        if response_cache.is_cacheable(model, TEMPERATURE):
+            cache_key = make_cache_key(
+                model, TEMPERATURE, MAX_OUTPUT_TOKENS, system_prompt, context.messages
+            )
+            cached_chunks = response_cache.get(cache_key)
+            if cached_chunks is not None:
+                tracer.current_span().set(response_cache="hit")
+                yield from response_cache.replay(cached_chunks)
+                return
+
+        def open_stream(request_model: str):
+            # The stable prefix is served from the provider's prompt cache
+            # after the first turn
+            return client.chat.completions.create(
+                model=request_model,
+                messages=apply_cache_control(context.messages, request_model),
+                stream=True,
+                temperature=TEMPERATURE,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                **cache_request_options(),
+            )
 
-        # Create streaming completion
-        stream = client.chat.completions.create(
-            model=model,
-            messages=api_messages,
-            stream=True,
-            temperature=0.7,
-            max_tokens=4000,
-        )
+        # Time from here: TTFT includes request setup and any hedge
+        timer = stream_metrics.start(model)
+        stream_started_ns = time.time_ns()
+
+        # Race a backup model if the first token is late (when configured)
+        backup_model = hedge_policy.backup_for(model)
+        if backup_model:
+            # The timer follows the winner, so a backup's answer counts for it
+            stream = hedged_completion(
+                open_stream, model, backup_model, hedge_policy, timer.attribute_to
+            )
+        else:
+            stream = open_stream(model)
 
-        # Stream the response
+        # Stream the response; the final chunk carries usage and no choices
+        chunks = []
         for chunk in stream:
-            if chunk.choices[0].delta.content:
+            if chunk.choices and chunk.choices[0].delta.content:
+                timer.chunk(chunk.choices[0].delta.content)
+                chunks.append(chunk.choices[0].delta.content)
                 yield chunk.choices[0].delta.content
+            if chunk.usage:
+                usage = parse_usage(chunk.usage)
+                timer.output_tokens = usage.output_tokens
+                record_usage(usage)
+        timer.finish()
+        record_stream_spans(timer, stream_started_ns, backup_model)
+
+        # A backup's answer belongs under the backup model's cache key
+        if timer.model != model:
+            cache_key = None
+            if response_cache.is_cacheable(timer.model, TEMPERATURE):
+                cache_key = make_cache_key(
+                    timer.model,
+                    TEMPERATURE,
+                    MAX_OUTPUT_TOKENS,
+                    system_prompt,
+                    context.messages,
+                )
+
+        # Only complete answers are cached
+        if cache_key is not None and chunks:
+            response_cache.put(cache_key, chunks)
+
+    except ContextBudgetError as e:
+        error_msg = f"Error: {str(e)}"
+        st.error(error_msg)
+        st.info("💡 Tip: Clear the conversation to start over with an empty history.")
+        yield error_msg
 
     except Exception as e:
+        if timer is not None:
+            timer.fail()
         error_msg = f"Error: {str(e)}"
         st.error(error_msg)
         yield error_msg
 
 
+def record_stream_spans(timer, started_ns: int, backup_model):
+    """Trace the LLM call, split into prefill (until first token) and generation."""
+    ended_ns = time.time_ns()
+    stream_span = tracer.record_span(
+        "llm.stream",
+        started_ns,
+        ended_ns,
+        model=timer.model,
+        hedged=bool(backup_model),
+        chunks=timer.chunks,
+        chars=timer.chars,
+        output_tokens=timer.output_tokens,
+    )
+    if timer.first_chunk_at is not None:
+        # Measured back from the end: a hedge winner's timer starts later
+        first_token_ns = ended_ns - int((time.monotonic() - timer.first_chunk_at) * 1e9)
+        tracer.record_span("llm.prefill", started_ns, first_token_ns, stream_span)
+        tracer.record_span("llm.generation", first_token_ns, ended_ns, stream_span)
+
+
+def record_usage(usage):
+    """Store the token usage of the latest turn for the sidebar."""
+    st.session_state.usage_log.append(usage._asdict())
+
+
+def latency_rows(summary: dict) -> list:
+    """Flatten metrics summaries into one table row per model."""
+
+    def fmt(value, scale=1.0, unit="s"):
+        return "–" if value is None else f"{value * scale:.2f}{unit}"
+
+    rows = []
+    for model, metrics in summary.items():
+        rows.append(
+            {
+                "Model": MODELS.get(model, model),
+                "Answers": metrics["total"]["count"],
+                "TTFT p50": fmt(metrics["ttft"]["p50"]),
+                "TTFT p95": fmt(metrics["ttft"]["p95"]),
+                "TTFT p99": fmt(metrics["ttft"]["p99"]),
+                "Total p95": fmt(metrics["total"]["p95"]),
+                "Gap p99": fmt(metrics["gap"]["p99"], 1000, "ms"),
+                "Tok/s p50": fmt(metrics["tokens_per_second"]["p50"], unit=""),
+                "Errors": metrics["errors"],
+            }
+        )
+    return rows
+
+
 def display_message(role: str, content: str):
     """Display a chat message with appropriate styling."""
     message_class = "user-message" if role == "user" else "assistant-message"
@@ -184,7 +340,8 @@ def main():
         # n8n Connection Status
         st.subheader("🔗 n8n Connection")
 
-        connection_status = n8n_client.test_connection()
+        # Cached status from the background prober - never blocks the rerun
+        connection_status = health_monitor.get_status(wait=1.0)
 
         if connection_status["connected"]:
             st.success(f"✅ Connected to n8n")
@@ -194,6 +351,10 @@ def main():
                 st.code(connection_status["base_url"], language="text")
             if "endpoint" in connection_status:
                 st.caption(f"Endpoint: {connection_status['endpoint']}")
+            if "latency_ms" in connection_status:
+                st.caption(f"Latency: {connection_status['latency_ms']:.0f} ms")
+        elif connection_status.get("pending"):
+            st.info("⏳ Checking n8n connection...")
         else:
             st.warning(
                 f"⚠️ Not connected: {connection_status.get('error', 'Unknown error')}"
@@ -219,6 +380,12 @@ def main():
                 """
                 )
 
+        if "age" in connection_status:
+            st.caption(f"Last checked {int(connection_status['age'])}s ago")
+        if st.button("🔄 Recheck Connection", use_container_width=True):
+            health_monitor.refresh()
+            st.rerun()
+
         st.divider()
 
         # Current Workflow Status
@@ -231,6 +398,27 @@ def main():
             st.markdown(f"[Open in n8n]({workflow_status['n8n_url']})")
             st.caption(f"Phase {workflow_status['current_phase']}")
 
+            # Earlier phases can be restored from local snapshots with one PUT
+            earlier_phases = [
+                entry
+                for entry in workflow_status["phase_history"][:-1]
+                if entry.get("version")
+            ]
+            if earlier_phases:
+                target = st.selectbox(
+                    "Roll back to",
+                    options=earlier_phases[::-1],
+                    format_func=lambda entry: f"Phase {entry['phase']}: {entry['name']}",
+                    key="rollback_target",
+                )
+                if st.button("↩️ Roll Back", use_container_width=True):
+                    rollback = workflow_manager.rollback_to_version(target["version"])
+                    if rollback["success"]:
+                        st.rerun()
+                    st.error(
+                        f"Rollback failed: {rollback.get('error', 'Unknown error')}"
+                    )
+
             if st.button("🗑️ Reset Workflow", use_container_width=True):
                 workflow_manager.reset_current_workflow()
                 st.rerun()
@@ -256,12 +444,77 @@ def main():
         # Session info
         st.subheader("📊 Session Info")
         st.metric("Messages", len(st.session_state.messages))
+        last_context = st.session_state.get("last_context")
+        if last_context:
+            st.caption(
+                f"Last request: {last_context['tokens']:,} / "
+                f"{last_context['budget']:,} input tokens"
+            )
+            if last_context["dropped"] or last_context["trimmed"]:
+                st.caption(
+                    f"{last_context['dropped']} older messages dropped, "
+                    f"{last_context['trimmed']} with superseded workflow JSON trimmed"
+                )
+        latency = stream_metrics.get_summary()
+        if latency:
+            with st.expander("⏱️ Latency"):
+                st.table(latency_rows(latency))
+
+        if response_cache.enabled:
+            cache_stats = response_cache.get_stats()
+            st.caption(
+                f"Response cache: {cache_stats['hits']} hits / "
+                f"{cache_stats['misses']} misses, "
+                f"{cache_stats['bytes_saved'] / 1024:.0f} KB saved"
+            )
+        if hedge_policy.backups:
+            hedge_stats = hedge_policy.get_stats()
+            if hedge_stats["fired"] or hedge_stats["failovers"]:
+                st.caption(
+                    f"Hedging: fired {hedge_stats['fired']}/"
+                    f"{hedge_stats['requests']} requests, backup won "
+                    f"{hedge_stats['backup_wins']}, failovers "
+                    f"{hedge_stats['failovers']}"
+                )
+        pool_stats = openrouter_clients.get_pool_stats()
+        if pool_stats["requests"]:
+            connections = pool_stats.get("open_connections")
+            st.caption(
+                "OpenRouter pool: "
+                + (f"{connections} connections, " if connections is not None else "")
+                + f"{pool_stats['pool_hits']}/{pool_stats['requests']} requests reused"
+            )
+        mirror_stats = workflow_mirror.get_stats()
+        if mirror_stats["hits"]:
+            st.caption(
+                f"n8n mirror: {mirror_stats['hits']} updates without a fetch, "
+                f"{mirror_stats['stale']} UI edits picked up, "
+                f"{mirror_stats['conflicts']} conflicts refetched"
+            )
+        catalog_stats = node_catalog.get_stats()
+        st.caption(
+            f"Node catalog: {catalog_stats['types']} types from "
+            f"{catalog_stats['source']}"
+        )
+        if st.session_state.usage_log:
+            last_usage = st.session_state.usage_log[-1]
+            cached = last_usage["cached_tokens"]
+            uncached = last_usage["input_tokens"] - cached
+            st.caption(f"Last turn: {cached:,} cached / {uncached:,} uncached tokens")
+            total_input = sum(u["input_tokens"] for u in st.session_state.usage_log)
+            total_cached = sum(u["cached_tokens"] for u in st.session_state.usage_log)
+            if total_input:
+                st.caption(
+                    f"Session cache hit rate: {total_cached / total_input:.0%} "
+                    f"of {total_input:,} input tokens"
+                )
 
         st.divider()
 
         # Clear conversation button
         if st.button("🗑️ Clear Conversation", use_container_width=True):
             st.session_state.messages = []
+            st.session_state.usage_log = []
             st.rerun()
 
         # Export conversation button
@@ -285,30 +538,33 @@ def main():
 
         # Workflow exports section
         st.subheader("📥 Workflow Exports")
-        if EXPORTS_DIR.exists():
-            export_files = sorted(
-                [f for f in EXPORTS_DIR.iterdir() if f.suffix == ".json"],
-                key=lambda x: x.stat().st_mtime,
-                reverse=True,
-            )
-            if export_files:
-                st.caption(f"Found {len(export_files)} workflow file(s)")
-                # Show last 5 exports
-                for filepath in export_files[:5]:
-                    with open(filepath, "rb") as f:
-                        file_content = f.read()
+        latest_exports = export_store.catalog.latest(5)
+        if latest_exports:
+            export_count = export_store.catalog.count()
+            st.caption(f"Found {export_count} workflow file(s)")
+            # Show last 5 exports; bytes are read only for the one requested
+            for entry in latest_exports:
+                if st.session_state.get("export_requested") == entry.name:
+                    file_content = export_store.read(entry.name)
+                    if file_content is not None:
                         st.download_button(
-                            label=f"📄 {filepath.name}",
+                            label=f"💾 Download {entry.name}",
                             data=file_content,
-                            file_name=filepath.name,
+                            file_name=entry.name,
                             mime="application/json",
-                            key=f"download_{filepath.name}",
+                            key=f"download_{entry.name}",
                             use_container_width=True,
                         )
-                if len(export_files) > 5:
-                    st.caption(f"+ {len(export_files) - 5} more file(s) in exports/")
-            else:
-                st.caption("No workflow exports yet")
+                        continue
+                if st.button(
+                    f"📄 {entry.name}",
+                    key=f"export_{entry.name}",
+                    use_container_width=True,
+                ):
+                    st.session_state.export_requested = entry.name
+                    st.rerun()
+            if export_count > 5:
+                st.caption(f"+ {export_count - 5} more file(s) in exports/")
         else:
             st.caption("No workflow exports yet")
 
@@ -340,35 +596,45 @@ def main():
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Generate and display assistant response
-        with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            full_response = ""
-
-            # Stream the response
-            for chunk in stream_response(
-                client, st.session_state.messages, st.session_state.model
-            ):
-                full_response += chunk
-                message_placeholder.markdown(full_response + "▌")
-
-            message_placeholder.markdown(full_response)
-
-        # Process the response through workflow manager
-        processed_response = workflow_manager.process_ai_response(full_response)
-
-        # If workflow was created/updated, show the enhanced response
-        if processed_response != full_response:
-            message_placeholder.markdown(processed_response)
-            # Add the enhanced response to history
-            st.session_state.messages.append(
-                {"role": "assistant", "content": processed_response}
-            )
-        else:
-            # Add assistant response to history
-            st.session_state.messages.append(
-                {"role": "assistant", "content": full_response}
-            )
+        # One trace per turn (when tracing is enabled and the turn is sampled)
+        with tracer.turn(
+            model=st.session_state.model,
+            messages=len(st.session_state.messages),
+            workflow_id=st.session_state.get("current_workflow_id"),
+        ):
+            # Generate and display assistant response
+            with st.chat_message("assistant"):
+                message_placeholder = st.empty()
+
+                # Collect workflow blocks as they close, to write them as one change
+                streaming_commit = workflow_manager.start_streaming_commit()
+
+                # Stream the response, redrawing at a bounded frame rate
+                renderer = StreamRenderer(message_placeholder)
+                with tracer.span("llm.respond"):
+                    full_response = renderer.render(
+                        stream_response(
+                            client, st.session_state.messages, st.session_state.model
+                        ),
+                        on_chunk=streaming_commit.feed,
+                    )
+
+            # Process the response through workflow manager
+            with tracer.span("workflow.finish", blocks=len(streaming_commit.workflows)):
+                processed_response = streaming_commit.finish(full_response)
+
+            # If workflow was created/updated, show the enhanced response
+            if processed_response != full_response:
+                message_placeholder.markdown(processed_response)
+                # Add the enhanced response to history
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": processed_response}
+                )
+            else:
+                # Add assistant response to history
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": full_response}
+                )
 
         # Rerun to update the display
         st.rerun()
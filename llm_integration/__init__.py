@@ -0,0 +1,31 @@
+"""
+LLM Integration Package
+
+This package provides the model-side plumbing for BuildMap: streaming,
+prompt handling and OpenRouter access.
+"""
+
+from llm_integration.context_window import ContextBudgetError, build_context
+from llm_integration.hedging import HedgePolicy, hedged_completion
+from llm_integration.metrics import MetricsRegistry, stream_metrics
+from llm_integration.openrouter_client import OpenRouterClientPool
+from llm_integration.prompt_cache import SystemPromptCache
+from llm_integration.prompt_caching import apply_cache_control, parse_usage
+from llm_integration.response_cache import ResponseCache
+from llm_integration.stream_renderer import StreamRenderer
+
+__all__ = [
+    "ContextBudgetError",
+    "HedgePolicy",
+    "MetricsRegistry",
+    "OpenRouterClientPool",
+    "ResponseCache",
+    "StreamRenderer",
+    "SystemPromptCache",
+    "apply_cache_control",
+    "build_context",
+    "hedged_completion",
+    "parse_usage",
+    "stream_metrics",
+]
+__version__ = "0.1.0"
@@ -0,0 +1,182 @@
+"""
+BuildMap Context Window - Fits chat history into a per-model token budget
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+from llm_integration.tokens import count_tokens
+from n8n_integration.json_extractor import is_workflow_candidate, iter_json_candidates
+
+# Context window sizes (input + output tokens) of the models offered in the UI
+MODEL_CONTEXT_LIMITS = {
+    "anthropic/claude-sonnet-4": 200_000,
+    "anthropic/claude-3.5-sonnet": 200_000,
+    "anthropic/claude-3-haiku": 200_000,
+    "openai/gpt-4o": 128_000,
+    "openai/gpt-4o-mini": 128_000,
+}
+DEFAULT_CONTEXT_LIMIT = 128_000
+
+# Input tokens we are willing to send per request, whatever the model allows
+CONTEXT_INPUT_BUDGET = int(os.environ.get("BUILDMAP_CONTEXT_BUDGET", "24000"))
+
+# Per-message framing (role, separators) added by chat templates
+MESSAGE_OVERHEAD_TOKENS = 4
+# Headroom for tokenizer differences between our count and the provider's
+SAFETY_MARGIN_TOKENS = 512
+
+SUPERSEDED_WORKFLOW_NOTE = "[workflow JSON omitted - superseded by a later version]"
+
+_FENCED_BLOCK_RE = re.compile(r"```[^\n`]*\n.*?```", re.DOTALL)
+
+
+class ContextBudgetError(Exception):
+    """Raised when a request cannot fit the model's context budget"""
+
+    def __init__(self, message: str, required_tokens: int, budget: int):
+        super().__init__(message)
+        self.required_tokens = required_tokens
+        self.budget = budget
+
+
+class ContextWindow(NamedTuple):
+    """Messages to send for one request, and how they were chosen"""
+
+    messages: List[Dict[str, str]]
+    tokens: int
+    budget: int
+    dropped: int  # history messages left out
+    trimmed: int  # history messages sent with superseded workflow JSON removed
+
+
+@lru_cache(maxsize=1024)
+def _strip_workflow_json(content: str) -> str:
+    """Replace the workflow blocks in a message with a short note"""
+    parts = []
+    last = 0
+    for candidate in iter_json_candidates(content):
+        if not is_workflow_candidate(candidate):
+            continue
+        start, end = candidate.start, candidate.end
+        # Drop the surrounding ``` fence together with the object
+        block = _FENCED_BLOCK_RE.search(content, max(start - 64, last), end + 8)
+        if block and block.start() <= start and block.end() >= end:
+            start, end = block.start(), block.end()
+        parts.append(content[last:start])
+        parts.append(SUPERSEDED_WORKFLOW_NOTE)
+        last = end
+    if not parts:
+        return content
+    parts.append(content[last:])
+    return "".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def _has_workflow_json(content: str) -> bool:
+    """Whether a message carries a workflow block"""
+    return any(is_workflow_candidate(c) for c in iter_json_candidates(content))
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    """Token cost of one chat message, including template overhead"""
+    return count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def input_budget(model: str, max_output_tokens: int = 4000) -> int:
+    """Input tokens available for `model` after reserving the answer"""
+    limit = MODEL_CONTEXT_LIMITS.get(model, DEFAULT_CONTEXT_LIMIT)
+    return min(CONTEXT_INPUT_BUDGET, limit - max_output_tokens - SAFETY_MARGIN_TOKENS)
+
+
+def build_context(
+    system_prompt: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    max_output_tokens: int = 4000,
+    budget: Optional[int] = None,
+) -> ContextWindow:
+    """Select the messages to send so the request fits the model's budget
+
+    Always sends the system prompt, the latest message and the most recent
+    workflow JSON. Assistant messages lose their workflow JSON once a later
+    assistant message carries a newer one. That happens on the turn a
+    message is superseded and never again, so the history sent on later
+    turns stays byte-identical and keeps hitting the provider's prompt
+    cache. The remaining history is added newest first until the budget
+    is used, so the oldest turns are dropped first.
+
+    Raises ContextBudgetError, before any network call, when the system
+    prompt and the latest message alone do not fit.
+    """
+    if budget is None:
+        budget = input_budget(model, max_output_tokens)
+    system_message = {"role": "system", "content": system_prompt}
+    used = message_tokens(system_message)
+
+    if not messages:
+        return ContextWindow([system_message], used, budget, 0, 0)
+
+    # The newest assistant message with workflow JSON stays intact
+    latest_workflow_index = None
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index]["role"] == "assistant" and _has_workflow_json(
+            messages[index]["content"]
+        ):
+            latest_workflow_index = index
+            break
+
+    superseded_before = latest_workflow_index or 0
+    candidates = []
+    for index, message in enumerate(messages):
+        if index < superseded_before and message["role"] == "assistant":
+            content = _strip_workflow_json(message["content"])
+            if content is not message["content"]:
+                message = {"role": message["role"], "content": content}
+        candidates.append(message)
+
+    # Required messages: the latest one, then the latest workflow
+    required = [len(messages) - 1]
+    if latest_workflow_index is not None and latest_workflow_index not in required:
+        required.append(latest_workflow_index)
+    for index in required:
+        used += message_tokens(candidates[index])
+    if used > budget:
+        raise ContextBudgetError(
+            f"Request needs {used:,} input tokens but {model} allows {budget:,}. "
+            "Shorten your message or start a new conversation.",
+            required_tokens=used,
+            budget=budget,
+        )
+
+    # Fill the rest of the budget with the newest history
+    kept = set(required)
+    for index in range(len(messages) - 2, -1, -1):
+        if index in kept:
+            continue
+        cost = message_tokens(candidates[index])
+        if used + cost > budget:
+            break
+        used += cost
+        kept.add(index)
+
+    # Providers expect the history after the system prompt to open with the user
+    order = sorted(kept)
+    while order[0] not in required and messages[order[0]]["role"] != "user":
+        used -= message_tokens(candidates[order.pop(0)])
+
+    selected = [candidates[index] for index in order]
+    trimmed = sum(
+        1
+        for index in order
+        if candidates[index]["content"] is not messages[index]["content"]
+    )
+    return ContextWindow(
+        [system_message] + selected,
+        used,
+        budget,
+        dropped=len(messages) - len(selected),
+        trimmed=trimmed,
+    )
@@ -0,0 +1,240 @@
+"""
+BuildMap Hedging - Race a backup model when the primary is slow to start
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from llm_integration.metrics import MetricsRegistry, stream_metrics
+
+# Backup model per primary, e.g. "anthropic/claude-sonnet-4=openai/gpt-4o".
+# Comma-separated; models without a backup are never hedged.
+HEDGE_BACKUPS = os.environ.get("BUILDMAP_HEDGE_BACKUPS", "")
+# Seconds to wait for the first token before hedging, or "auto" for the
+# primary's rolling p95 time-to-first-token
+HEDGE_DEADLINE = os.environ.get("BUILDMAP_HEDGE_DEADLINE", "auto")
+
+# Adaptive deadline settings
+HEDGE_DEFAULT_DEADLINE = 4.0  # used until enough samples are collected
+HEDGE_MIN_DEADLINE = 1.0
+HEDGE_MAX_DEADLINE = 15.0
+HEDGE_MIN_SAMPLES = 20
+
+_STREAM_END = object()
+
+
+def _parse_backups(spec: str) -> Dict[str, str]:
+    """Parse "primary=backup,primary=backup" into a dict"""
+    backups = {}
+    for pair in spec.split(","):
+        if "=" in pair:
+            primary, backup = (part.strip() for part in pair.split("=", 1))
+            if primary and backup and primary != backup:
+                backups[primary] = backup
+    return backups
+
+
+def _has_content(chunk: Any) -> bool:
+    """Whether a streamed completion chunk carries answer text"""
+    return bool(chunk.choices and chunk.choices[0].delta.content)
+
+
+class HedgePolicy:
+    """Decides when to hedge and records how hedges turn out
+
+    The adaptive deadline reads time-to-first-token from the streaming
+    metrics registry: the request is hedged once it has waited longer than
+    the primary's p95.
+    """
+
+    def __init__(
+        self,
+        backups: str = None,
+        deadline: str = None,
+        metrics: MetricsRegistry = None,
+    ):
+        self.backups = _parse_backups(HEDGE_BACKUPS if backups is None else backups)
+        deadline = HEDGE_DEADLINE if deadline is None else str(deadline)
+        self.fixed_deadline = None if deadline == "auto" else float(deadline)
+        self.metrics = metrics or stream_metrics
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,  # hedge-eligible requests
+            "fired": 0,  # backup requests started
+            "backup_wins": 0,
+            "primary_wins": 0,  # primary answered first after a hedge fired
+            "failovers": 0,  # backup started because the primary failed
+        }
+
+    def backup_for(self, model: str) -> Optional[str]:
+        """Backup model for `model`, or None if it is not hedged"""
+        return self.backups.get(model)
+
+    def deadline_for(self, model: str) -> float:
+        """Seconds to wait for the primary's first token before hedging"""
+        if self.fixed_deadline is not None:
+            return self.fixed_deadline
+        p95 = self.metrics.percentile(model, "ttft", 95, HEDGE_MIN_SAMPLES)
+        if p95 is None:
+            return HEDGE_DEFAULT_DEADLINE
+        return min(max(p95, HEDGE_MIN_DEADLINE), HEDGE_MAX_DEADLINE)
+
+    def count(self, counter: str):
+        with self._lock:
+            self.stats[counter] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Copy of the hedge counters"""
+        with self._lock:
+            return dict(self.stats)
+
+
+class _Attempt:
+    """One streaming request, read on its own thread into a shared queue"""
+
+    def __init__(self, model: str, open_stream, events: "queue.Queue"):
+        self.model = model
+        self.started_at = time.monotonic()
+        self.stop = threading.Event()
+        self.stream = None
+        self._open_stream = open_stream
+        self._events = events
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name=f"hedge-{model}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        stream = None
+        try:
+            stream = self._open_stream(self.model)
+            with self._lock:
+                self.stream = stream
+            if self.stop.is_set():
+                return
+            for chunk in stream:
+                if self.stop.is_set():
+                    break
+                self._events.put((self, chunk))
+            else:
+                self._events.put((self, _STREAM_END))
+        except Exception as e:
+            self._events.put((self, e))
+        finally:
+            _close(stream)
+
+    def cancel(self):
+        """Stop the attempt and drop its connection, even mid-read
+
+        A stalled stream never reaches its next chunk, so its response is
+        closed from here; the blocked read then fails on the reading thread.
+        A stream still being opened is closed as soon as it is returned.
+        """
+        with self._lock:
+            self.stop.set()
+            stream = self.stream
+        _close(stream)
+
+
+def _close(stream: Any):
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
+
+
+def hedged_completion(
+    open_stream: Callable[[str], Iterable[Any]],
+    model: str,
+    backup: str,
+    policy: HedgePolicy,
+    on_winner: Callable[[str, float], None] = None,
+) -> Iterator[Any]:
+    """Stream `model`, racing `backup` if the first token is late
+
+    `open_stream(model)` starts a streaming completion and returns its
+    chunks. The backup request starts once the deadline passes without a
+    token, or at once if the primary fails first. The first attempt to
+    produce answer text wins and is streamed; the other is cancelled and
+    its connection closed. `on_winner(model, started_at)` is called with the
+    winning model and the `time.monotonic()` its request started, before its
+    first chunk is yielded, so the caller can time the answer for that model.
+    """
+    policy.count("requests")
+    events: "queue.Queue" = queue.Queue()
+    primary = _Attempt(model, open_stream, events)
+    attempts = [primary]
+    deadline = primary.started_at + policy.deadline_for(model)
+    winner = None
+    backup_started = False
+    buffered = []  # usage-only or empty chunks seen before a winner
+    error = None
+
+    try:
+        while winner is None:
+            timeout = None if backup_started else max(deadline - time.monotonic(), 0)
+            try:
+                attempt, item = events.get(timeout=timeout)
+            except queue.Empty:
+                attempts.append(_Attempt(backup, open_stream, events))
+                backup_started = True
+                policy.count("fired")
+                continue
+
+            if isinstance(item, Exception) or item is _STREAM_END:
+                if isinstance(item, Exception):
+                    error = item
+                attempts.remove(attempt)
+                if attempts:
+                    continue
+                if not backup_started and item is not _STREAM_END:
+                    # The primary failed before answering; fail over at once
+                    attempts.append(_Attempt(backup, open_stream, events))
+                    backup_started = True
+                    policy.count("failovers")
+                    continue
+                if error is not None:
+                    raise error
+                return
+            if attempt not in attempts:
+                continue
+            if not _has_content(item):
+                buffered.append((attempt, item))
+                continue
+
+            winner = attempt
+            if backup_started:
+                policy.count("primary_wins" if attempt is primary else "backup_wins")
+            if attempt is not primary:
+                # The primary's true TTFT is at least this long; keep the p95
+                # from drifting down because slow requests never finish
+                policy.metrics.record_ttft(model, time.monotonic() - primary.started_at)
+            for loser in attempts:
+                if loser is not winner:
+                    loser.cancel()
+            if on_winner is not None:
+                on_winner(winner.model, winner.started_at)
+            yield from (chunk for owner, chunk in buffered if owner is winner)
+            yield item
+
+        # Stream the winner to the end
+        while True:
+            attempt, item = events.get()
+            if attempt is not winner:
+                continue
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+
+
+# Singleton policy shared by all sessions
+hedge_policy = HedgePolicy()
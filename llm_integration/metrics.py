@@ -0,0 +1,214 @@
+"""
+BuildMap Metrics - Process-wide latency histograms for streamed answers
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from llm_integration.tokens import CHARS_PER_TOKEN
+
+# Samples kept per histogram; percentiles cover the most recent window
+METRICS_WINDOW = int(os.environ.get("BUILDMAP_METRICS_WINDOW", "500"))
+
+
+def _nearest_rank(sorted_samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted, non-empty list (q in 0-100)"""
+    rank = max(math.ceil(q / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+class RollingHistogram:
+    """Fixed-size window of samples with percentile summaries"""
+
+    def __init__(self, window: int = None):
+        self._samples: Deque[float] = deque(maxlen=window or METRICS_WINDOW)
+        self.count = 0  # all samples ever added, not just the window
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float):
+        self._samples.append(value)
+        self.count += 1
+
+    def extend(self, values: List[float]):
+        for value in values:
+            self.add(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile of the window (q in 0-100)"""
+        samples = sorted(self._samples)
+        return _nearest_rank(samples, q) if samples else None
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """p50/p95/p99, mean and max of the window"""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "p50": None, "p95": None, "p99": None}
+        return {
+            "count": self.count,
+            "p50": _nearest_rank(samples, 50),
+            "p95": _nearest_rank(samples, 95),
+            "p99": _nearest_rank(samples, 99),
+            "mean": sum(samples) / len(samples),
+            "max": samples[-1],
+        }
+
+
+class StreamTimer:
+    """Timing of one streamed answer, reported to the registry on finish"""
+
+    def __init__(self, registry: "MetricsRegistry", model: str):
+        self.registry = registry
+        self.model = model
+        self.started_at = time.monotonic()
+        self.first_chunk_at: Optional[float] = None
+        self.last_chunk_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.chunks = 0
+        self.chars = 0
+        self.output_tokens: Optional[int] = None  # from provider usage, if sent
+        self.gaps: List[float] = []
+
+    def chunk(self, text: str):
+        """Record the arrival of one chunk of answer text"""
+        now = time.monotonic()
+        if self.first_chunk_at is None:
+            self.first_chunk_at = now
+        else:
+            self.gaps.append(now - self.last_chunk_at)
+        self.last_chunk_at = now
+        self.chunks += 1
+        self.chars += len(text)
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds from request start to the first chunk"""
+        if self.first_chunk_at is None:
+            return None
+        return self.first_chunk_at - self.started_at
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation speed after the first token"""
+        if self.first_chunk_at is None or self.ended_at is None:
+            return None
+        generating = self.ended_at - self.first_chunk_at
+        if generating <= 0:
+            return None
+        tokens = self.output_tokens or self.chars / CHARS_PER_TOKEN
+        return tokens / generating
+
+    def attribute_to(self, model: str, started_at: float):
+        """Count this answer for `model`, whose request began at `started_at`
+
+        Called when a hedge picks the model that answers, so a backup's TTFT
+        and rate are recorded for the backup, measured from its own request.
+        """
+        self.model = model
+        self.started_at = started_at
+
+    def finish(self):
+        """Mark the end of the stream and record it"""
+        self.ended_at = time.monotonic()
+        self.registry.record(self)
+
+    def fail(self):
+        """Record a stream that ended with an error"""
+        self.ended_at = time.monotonic()
+        self.registry.record_error(self.model)
+
+
+class MetricsRegistry:
+    """Per-model rolling histograms of streaming latency
+
+    Tracks time to first token, total duration, inter-chunk gaps,
+    tokens per second, and chunk and character counts per answer.
+    """
+
+    METRICS = ("ttft", "total", "gap", "tokens_per_second", "chunks", "chars")
+
+    def __init__(self, window: int = None):
+        self.window = window or METRICS_WINDOW
+        self._models: Dict[str, Dict[str, RollingHistogram]] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self, model: str) -> StreamTimer:
+        """Start timing a request to `model`"""
+        return StreamTimer(self, model)
+
+    def _histograms(self, model: str) -> Dict[str, RollingHistogram]:
+        if model not in self._models:
+            self._models[model] = {
+                name: RollingHistogram(self.window) for name in self.METRICS
+            }
+            # One answer has hundreds of gaps; keep as many answers' worth
+            self._models[model]["gap"] = RollingHistogram(self.window * 10)
+        return self._models[model]
+
+    def record(self, timer: StreamTimer):
+        """Add a finished stream's timings"""
+        with self._lock:
+            histograms = self._histograms(timer.model)
+            histograms["total"].add(timer.ended_at - timer.started_at)
+            histograms["chunks"].add(timer.chunks)
+            histograms["chars"].add(timer.chars)
+            histograms["gap"].extend(timer.gaps)
+            if timer.ttft is not None:
+                histograms["ttft"].add(timer.ttft)
+            if timer.tokens_per_second is not None:
+                histograms["tokens_per_second"].add(timer.tokens_per_second)
+
+    def record_ttft(self, model: str, seconds: float):
+        """Add a TTFT sample that has no finished answer
+
+        Used for a hedged primary that lost: its TTFT is at least `seconds`.
+        """
+        with self._lock:
+            self._histograms(model)["ttft"].add(seconds)
+
+    def percentile(
+        self, model: str, metric: str, q: float, min_samples: int = 1
+    ) -> Optional[float]:
+        """Percentile of one metric, or None with fewer than `min_samples`"""
+        with self._lock:
+            histogram = self._models.get(model, {}).get(metric)
+            if histogram is None or len(histogram) < min_samples:
+                return None
+            return histogram.percentile(q)
+
+    def record_error(self, model: str):
+        """Count a failed stream; a model that only failed is still listed"""
+        with self._lock:
+            self._histograms(model)
+            self._errors[model] = self._errors.get(model, 0) + 1
+
+    def get_summary(self, model: str = None) -> Dict[str, Dict[str, dict]]:
+        """Percentile summaries, keyed by model then metric"""
+        with self._lock:
+            models = [model] if model else list(self._models)
+            return {
+                name: {
+                    **{
+                        metric: histogram.summary()
+                        for metric, histogram in self._models[name].items()
+                    },
+                    "errors": self._errors.get(name, 0),
+                }
+                for name in models
+                if name in self._models
+            }
+
+    def reset(self):
+        with self._lock:
+            self._models.clear()
+            self._errors.clear()
+
+
+# Singleton registry shared by all sessions
+stream_metrics = MetricsRegistry()
@@ -0,0 +1,192 @@
+"""
+BuildMap OpenRouter Client - One pooled OpenAI client per API key, shared by
+every Streamlit session in the process
+"""
+
+import importlib.util
+import os
+import threading
+from typing import Any, Dict
+
+import httpx
+from openai import OpenAI
+
+OPENROUTER_BASE_URL = os.environ.get(
+    "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"
+)
+
+# Connection pool configuration
+OPENROUTER_MAX_CONNECTIONS = int(os.environ.get("OPENROUTER_MAX_CONNECTIONS", "100"))
+OPENROUTER_MAX_KEEPALIVE = int(os.environ.get("OPENROUTER_MAX_KEEPALIVE", "20"))
+OPENROUTER_KEEPALIVE_EXPIRY = float(os.environ.get("OPENROUTER_KEEPALIVE_EXPIRY", "60"))
+
+# Timeouts in seconds; the read timeout bounds the gap between streamed chunks
+OPENROUTER_CONNECT_TIMEOUT = float(os.environ.get("OPENROUTER_CONNECT_TIMEOUT", "5"))
+OPENROUTER_READ_TIMEOUT = float(os.environ.get("OPENROUTER_READ_TIMEOUT", "120"))
+
+# HTTP/2 needs the optional `h2` package (installed by `httpx[http2]`)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Server-sent-events terminator that ends an OpenAI-compatible stream
+SSE_DONE_MARKER = b"[DONE]"
+
+
+class DrainingStream(httpx.SyncByteStream):
+    """Response body that finishes reading a completed SSE stream on close
+
+    The OpenAI SDK closes a streamed response as soon as it sees `[DONE]`,
+    before the final bytes (e.g. the last chunk terminator) are read, so
+    httpcore discards the connection instead of returning it to the pool.
+    Once the marker has been seen, close() reads the short remainder first.
+    Streams closed earlier (an aborted answer) are not drained.
+    """
+
+    def __init__(self, stream: httpx.SyncByteStream):
+        self._stream = stream
+        self._iterator = None
+        self._tail = b""
+        self._done = False
+
+    def __iter__(self):
+        if self._iterator is None:
+            self._iterator = iter(self._stream)
+        for chunk in self._iterator:
+            if not self._done:
+                self._done = SSE_DONE_MARKER in self._tail + chunk
+                self._tail = chunk[-len(SSE_DONE_MARKER) :]
+            yield chunk
+
+    def close(self):
+        if self._done and self._iterator is not None:
+            try:
+                for _ in self._iterator:
+                    pass
+            except httpx.HTTPError:
+                pass
+        self._stream.close()
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """httpx transport that counts requests and newly opened connections
+
+    Every request that does not open a TCP connection reused a pooled one,
+    so the two counters give the pool's hit rate.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+        response = super().handle_request(request)
+        response.stream = DrainingStream(response.stream)
+        return response
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Request and connection counters for this transport
+
+        Open and idle connections are read from httpx's private connection
+        pool and left out when this httpx version does not expose it.
+        """
+        stats = {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "pool_hits": max(self.requests - self.connections_opened, 0),
+        }
+        try:
+            connections = list(self._pool.connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        except (AttributeError, TypeError):
+            return stats
+        stats["open_connections"] = len(connections)
+        return stats
+
+
+class OpenRouterClientPool:
+    """Process-wide cache of OpenAI clients for OpenRouter, one per API key
+
+    Clients are thread-safe, so every session and rerun shares one
+    connection pool and keeps its TLS connections (HTTP/2 when available)
+    warm instead of handshaking again on each turn.
+    """
+
+    def __init__(self, base_url: str = None, http2: bool = True):
+        self.base_url = base_url or OPENROUTER_BASE_URL
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._clients: Dict[str, OpenAI] = {}
+        self._transports: Dict[str, PooledTransport] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, api_key: str) -> OpenAI:
+        """Return the shared client for `api_key`, creating it on first use"""
+        client = self._clients.get(api_key)
+        if client is not None:
+            return client
+        with self._lock:
+            if api_key not in self._clients:
+                transport = PooledTransport(
+                    http2=self.http2,
+                    limits=httpx.Limits(
+                        max_connections=OPENROUTER_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENROUTER_MAX_KEEPALIVE,
+                        keepalive_expiry=OPENROUTER_KEEPALIVE_EXPIRY,
+                    ),
+                )
+                http_client = httpx.Client(
+                    transport=transport,
+                    timeout=httpx.Timeout(
+                        OPENROUTER_READ_TIMEOUT, connect=OPENROUTER_CONNECT_TIMEOUT
+                    ),
+                )
+                self._transports[api_key] = transport
+                self._clients[api_key] = OpenAI(
+                    base_url=self.base_url, api_key=api_key, http_client=http_client
+                )
+            return self._clients[api_key]
+
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Connection pool statistics summed over all shared clients
+
+        `open_connections` and `idle_connections` are only present when
+        every transport reports them.
+        """
+        stats = {
+            "clients": len(self._transports),
+            "requests": 0,
+            "connections_opened": 0,
+            "pool_hits": 0,
+            "open_connections": 0,
+            "idle_connections": 0,
+        }
+        for transport in list(self._transports.values()):
+            transport_stats = transport.get_pool_stats()
+            for key in list(stats):
+                if key == "clients":
+                    continue
+                if key not in transport_stats:
+                    del stats[key]
+                else:
+                    stats[key] += transport_stats[key]
+        return stats
+
+    def close(self):
+        """Close every shared client and its connections"""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._transports.clear()
+
+
+# Singleton pool shared by all sessions
+openrouter_clients = OpenRouterClientPool()
@@ -0,0 +1,93 @@
+"""
+BuildMap Prompt Cache - Process-wide system prompt cache with hot reload
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from llm_integration.tokens import count_tokens
+
+SYSTEM_PROMPT_PATH = Path(__file__).parent.parent / "prompts" / "system_prompt.txt"
+
+# Minimum seconds between stat() calls on the prompt file
+PROMPT_CHECK_INTERVAL = float(os.environ.get("BUILDMAP_PROMPT_CHECK_INTERVAL", "1.0"))
+
+
+class PromptSnapshot(NamedTuple):
+    """One loaded version of the system prompt"""
+
+    text: str
+    sha256: str
+    token_count: int
+    mtime_ns: int
+    size: int
+
+
+class SystemPromptCache:
+    """Keeps the system prompt in memory and reloads it when the file changes
+
+    Every session shares one snapshot. The file is re-read only when its
+    mtime or size changes, and it is stat()ed at most once per
+    `check_interval` seconds. Prompt edits take effect without a restart.
+    The snapshot's `sha256` and `token_count` can serve as cache keys.
+    """
+
+    def __init__(self, path: Path = None, check_interval: float = None):
+        self.path = Path(path or SYSTEM_PROMPT_PATH)
+        self.check_interval = (
+            PROMPT_CHECK_INTERVAL if check_interval is None else check_interval
+        )
+        self.reloads = 0
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[PromptSnapshot] = None
+        self._checked_at = 0.0
+
+    def get(self) -> PromptSnapshot:
+        """Return the current prompt, reloading it if the file changed
+
+        Raises FileNotFoundError if the prompt file does not exist.
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            stat = self.path.stat()
+            self._checked_at = now
+            snapshot = self._snapshot
+            if (
+                snapshot is None
+                or snapshot.mtime_ns != stat.st_mtime_ns
+                or snapshot.size != stat.st_size
+            ):
+                snapshot = self._load(stat)
+                self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self):
+        """Force a reload on the next get()"""
+        with self._lock:
+            self._snapshot = None
+
+    def _load(self, stat: os.stat_result) -> PromptSnapshot:
+        """Read the prompt file and build a snapshot"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            text = f.read()
+        self.reloads += 1
+        return PromptSnapshot(
+            text=text,
+            sha256=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            token_count=count_tokens(text),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+
+
+# Singleton cache for prompts/system_prompt.txt
+system_prompt_cache = SystemPromptCache()
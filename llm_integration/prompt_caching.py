@@ -0,0 +1,84 @@
+"""
+BuildMap Prompt Caching - Provider-side prompt caching through OpenRouter
+"""
+
+from typing import Any, Dict, List, NamedTuple
+
+# Providers that need explicit cache breakpoints; others cache prefixes on their own
+CACHE_CONTROL_PROVIDERS = ("anthropic/",)
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+class CacheUsage(NamedTuple):
+    """Token usage of one request, split by prompt cache status"""
+
+    input_tokens: int
+    cached_tokens: int  # input tokens read from the provider's cache
+    cache_write_tokens: int  # input tokens written to the cache this turn
+    output_tokens: int
+
+    @property
+    def uncached_tokens(self) -> int:
+        return self.input_tokens - self.cached_tokens
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+def supports_cache_control(model: str) -> bool:
+    """Whether `model` needs cache_control breakpoints to use prompt caching"""
+    return model.startswith(CACHE_CONTROL_PROVIDERS)
+
+
+def _with_cache_control(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of `message` with a cache breakpoint after its content"""
+    return {
+        "role": message["role"],
+        "content": [
+            {"type": "text", "text": message["content"], "cache_control": CACHE_CONTROL}
+        ],
+    }
+
+
+def apply_cache_control(
+    messages: List[Dict[str, Any]], model: str
+) -> List[Dict[str, Any]]:
+    """Mark the stable prefix of a request as cacheable
+
+    Anthropic models get two breakpoints: one after the system prompt, which
+    is identical on every request, and one after the last message of the
+    previous turn, so the next request reads the whole history from cache.
+    OpenAI models cache any repeated prefix automatically and are returned
+    unchanged. `messages` is not modified.
+    """
+    if not supports_cache_control(model) or not messages:
+        return messages
+
+    marked = list(messages)
+    breakpoints = [0]
+    if len(marked) > 2:
+        # Everything up to the previous answer is resent verbatim next turn
+        breakpoints.append(len(marked) - 2)
+    for index in breakpoints:
+        if isinstance(marked[index].get("content"), str):
+            marked[index] = _with_cache_control(marked[index])
+    return marked
+
+
+def cache_request_options() -> Dict[str, Any]:
+    """Extra create() arguments that make streamed answers report usage"""
+    return {"stream_options": {"include_usage": True}}
+
+
+def parse_usage(usage: Any) -> CacheUsage:
+    """Read cached vs uncached input tokens from an OpenRouter usage object"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or 0
+    cache_write = getattr(details, "cache_write_tokens", None) or 0
+    return CacheUsage(
+        input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        cached_tokens=cached,
+        cache_write_tokens=cache_write,
+        output_tokens=getattr(usage, "completion_tokens", 0) or 0,
+    )
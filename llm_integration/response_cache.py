@@ -0,0 +1,247 @@
+"""
+BuildMap Response Cache - Exact-match cache of streamed LLM answers with an
+in-memory LRU tier backed by a size-bounded disk tier
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Opt-in: comma-separated models ("*" for all) and/or a temperature ceiling.
+# A request is cached if its model is listed or its temperature is at or
+# below the ceiling; by default nothing is cached.
+RESPONSE_CACHE_MODELS = os.environ.get("BUILDMAP_RESPONSE_CACHE_MODELS", "")
+RESPONSE_CACHE_MAX_TEMPERATURE = float(
+    os.environ.get("BUILDMAP_RESPONSE_CACHE_MAX_TEMPERATURE", "-1")
+)
+
+# Tier sizes
+RESPONSE_CACHE_MEMORY_ITEMS = int(
+    os.environ.get("BUILDMAP_RESPONSE_CACHE_MEMORY_ITEMS", "256")
+)
+RESPONSE_CACHE_DISK_MB = float(os.environ.get("BUILDMAP_RESPONSE_CACHE_DISK_MB", "100"))
+RESPONSE_CACHE_DIR = Path(
+    os.environ.get(
+        "BUILDMAP_RESPONSE_CACHE_DIR",
+        Path(__file__).parent.parent / ".cache" / "responses",
+    )
+)
+
+
+def _normalize_content(content: Any) -> Any:
+    """Content with line endings and surrounding whitespace normalized"""
+    if isinstance(content, str):
+        return content.replace("\r\n", "\n").strip()
+    return content
+
+
+def make_cache_key(
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system_prompt: str,
+    messages: List[Dict[str, Any]],
+) -> str:
+    """Key identifying one request exactly
+
+    Built from the model, sampling settings, a hash of the system prompt
+    and the normalized conversation (system messages excluded).
+    """
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "system": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+        "messages": [
+            [message["role"], _normalize_content(message["content"])]
+            for message in messages
+            if message["role"] != "system"
+        ],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache of complete streamed answers, keyed by make_cache_key
+
+    Hits replay the stored chunks, so callers consume them exactly like a
+    live stream. The memory tier is an LRU bounded by entry count; the disk
+    tier survives restarts and evicts least recently used files once it
+    exceeds `disk_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: Path = None,
+        models: str = None,
+        max_temperature: float = None,
+        memory_items: int = None,
+        disk_bytes: int = None,
+    ):
+        self.directory = Path(directory or RESPONSE_CACHE_DIR)
+        models = RESPONSE_CACHE_MODELS if models is None else models
+        self.models = {m.strip() for m in models.split(",") if m.strip()}
+        self.max_temperature = (
+            RESPONSE_CACHE_MAX_TEMPERATURE
+            if max_temperature is None
+            else max_temperature
+        )
+        self.memory_items = memory_items or RESPONSE_CACHE_MEMORY_ITEMS
+        self.disk_bytes = disk_bytes or int(RESPONSE_CACHE_DISK_MB * 1024 * 1024)
+
+        self._memory: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._disk_usage: Optional[int] = None  # computed on first disk access
+        self._lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_saved": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any request can be cached"""
+        return bool(self.models) or self.max_temperature >= 0
+
+    def is_cacheable(self, model: str, temperature: float) -> bool:
+        """Whether requests for this model and temperature opted in"""
+        return (
+            "*" in self.models
+            or model in self.models
+            or temperature <= self.max_temperature
+        )
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Return the cached chunks for `key`, or None on a miss"""
+        with self._lock:
+            chunks = self._memory.get(key)
+            if chunks is not None:
+                self._memory.move_to_end(key)
+                self._record_hit("memory_hits", chunks)
+                return chunks
+
+        chunks = self._read_disk(key)
+        with self._lock:
+            if chunks is None:
+                self.stats["misses"] += 1
+                return None
+            self._remember(key, chunks)
+            self._record_hit("disk_hits", chunks)
+            return chunks
+
+    def put(self, key: str, chunks: List[str]):
+        """Store a complete answer in both tiers"""
+        chunks = list(chunks)
+        with self._lock:
+            self._remember(key, chunks)
+            self.stats["stores"] += 1
+        self._write_disk(key, chunks)
+
+    def replay(self, chunks: List[str]) -> Iterator[str]:
+        """Yield cached chunks the way a live stream would"""
+        yield from chunks
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit, miss and byte-saved counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["memory_items"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_usage or 0
+            return stats
+
+    def clear(self):
+        """Empty both tiers"""
+        with self._lock:
+            self._memory.clear()
+            for path in self._disk_entries():
+                path.unlink(missing_ok=True)
+            self._disk_usage = 0
+
+    def _record_hit(self, counter: str, chunks: List[str]):
+        self.stats[counter] += 1
+        self.stats["bytes_saved"] += sum(len(c.encode("utf-8")) for c in chunks)
+
+    def _remember(self, key: str, chunks: List[str]):
+        """Insert into the memory LRU, evicting the oldest entry if full"""
+        self._memory[key] = chunks
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _disk_entries(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob("*.json"))
+
+    def _read_disk(self, key: str) -> Optional[List[str]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                chunks = json.load(f)["chunks"]
+            # Touch the entry so disk eviction is least-recently-used
+            os.utime(path)
+            return chunks
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_disk(self, key: str, chunks: List[str]):
+        """Write an entry atomically, then evict until under the size limit"""
+        path = self._path(key)
+        data = json.dumps(
+            {"created": time.time(), "chunks": chunks}, ensure_ascii=False
+        ).encode("utf-8")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            with self._lock:
+                previous = path.stat().st_size if path.exists() else 0
+                os.replace(temp_path, path)
+                if self._disk_usage is None:
+                    self._disk_usage = sum(
+                        p.stat().st_size for p in self._disk_entries()
+                    )
+                else:
+                    self._disk_usage += len(data) - previous
+                if self._disk_usage > self.disk_bytes:
+                    self._evict_disk()
+        except OSError:
+            # The disk tier is best effort; the memory tier still has the entry
+            pass
+
+    def _evict_disk(self):
+        """Delete least recently used files until under the size limit"""
+        entries = []
+        for entry in self._disk_entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.disk_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            self.stats["evictions"] += 1
+        self._disk_usage = total
+
+
+# Singleton cache shared by all sessions
+response_cache = ResponseCache()
@@ -0,0 +1,133 @@
+"""
+BuildMap Stream Renderer - Frame-coalesced rendering of a streamed chat answer
+"""
+
+import contextvars
+import os
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # Older Streamlit versions
+    add_script_run_ctx = get_script_run_ctx = None
+
+# Rendering configuration
+STREAM_FRAME_RATE = float(os.environ.get("BUILDMAP_STREAM_FPS", "12"))
+STREAM_FLUSH_BYTES = int(os.environ.get("BUILDMAP_STREAM_FLUSH_BYTES", "4096"))
+
+_END_OF_STREAM = object()
+
+
+class StreamRenderer:
+    """Renders a chunk stream into a Streamlit placeholder at a bounded rate
+
+    Chunks are read on a producer thread, so a slow browser or websocket
+    never stalls the network stream, and buffered in a list. The
+    placeholder is redrawn at most `frame_rate` times per second, or sooner
+    when `flush_bytes` of new text are waiting, instead of once per chunk.
+    """
+
+    def __init__(
+        self,
+        placeholder,
+        frame_rate: float = None,
+        flush_bytes: int = None,
+        cursor: str = "▌",
+    ):
+        self.placeholder = placeholder
+        self.frame_interval = 1.0 / (frame_rate or STREAM_FRAME_RATE)
+        self.flush_bytes = flush_bytes or STREAM_FLUSH_BYTES
+        self.cursor = cursor
+        self.frames = 0
+
+    def render(
+        self,
+        chunks: Iterable[str],
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Consume `chunks`, update the placeholder and return the full text
+
+        `on_chunk` is called for every chunk on the calling (script) thread.
+        """
+        chunk_queue: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        # Run in a copy of this context so context variables (e.g. the
+        # current tracing span) are visible to the chunk generator
+        producer = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._produce, chunks, chunk_queue, stop),
+            name="stream-producer",
+            daemon=True,
+        )
+        if add_script_run_ctx is not None:
+            # Let st.* calls inside the chunk generator reach this session
+            add_script_run_ctx(producer, get_script_run_ctx())
+        producer.start()
+
+        text = ""
+        pending: List[str] = []
+        pending_bytes = 0
+        next_frame = time.monotonic() + self.frame_interval
+        finished = False
+
+        try:
+            while not finished:
+                timeout = max(next_frame - time.monotonic(), 0.0)
+                try:
+                    item = chunk_queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                # Drain everything that has arrived since the last wake-up
+                while item is not None:
+                    if item is _END_OF_STREAM:
+                        finished = True
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    pending.append(item)
+                    pending_bytes += len(item)
+                    if on_chunk is not None:
+                        on_chunk(item)
+                    try:
+                        item = chunk_queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+
+                now = time.monotonic()
+                if pending and (now >= next_frame or pending_bytes >= self.flush_bytes):
+                    text += "".join(pending)
+                    pending = []
+                    pending_bytes = 0
+                    if not finished:
+                        self.placeholder.markdown(text + self.cursor)
+                        self.frames += 1
+                if now >= next_frame:
+                    next_frame = now + self.frame_interval
+        finally:
+            stop.set()
+
+        text += "".join(pending)
+        self.placeholder.markdown(text)
+        self.frames += 1
+        return text
+
+    def _produce(self, chunks: Iterable[str], chunk_queue: "queue.Queue", stop):
+        """Read the stream as fast as it arrives and hand chunks to the renderer"""
+        iterator = iter(chunks)
+        try:
+            for chunk in iterator:
+                if stop.is_set():
+                    break
+                if chunk:
+                    chunk_queue.put(chunk)
+        except Exception as e:
+            chunk_queue.put(e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if stop.is_set() and close is not None:
+                close()
+            chunk_queue.put(_END_OF_STREAM)
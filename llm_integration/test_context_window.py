@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test fitting chat history into a model's token budget
+"""
+
+import json
+
+from llm_integration.context_window import (
+    SUPERSEDED_WORKFLOW_NOTE,
+    ContextBudgetError,
+    build_context,
+    message_tokens,
+)
+
+SYSTEM_PROMPT = "You are BuildMap, an n8n workflow assistant."
+MODEL = "openai/gpt-4o-mini"
+
+
+def user(text):
+    return {"role": "user", "content": text}
+
+
+def answer(text, phase=None):
+    """An assistant message, with a workflow block for `phase` if given"""
+    if phase is None:
+        return {"role": "assistant", "content": text}
+    workflow = {
+        "name": f"Phase {phase}",
+        "nodes": [{"name": f"Step {step}"} for step in range(1, phase + 1)],
+        "connections": {},
+    }
+    block = f"```json\n{json.dumps(workflow, indent=2)}\n```"
+    return {"role": "assistant", "content": f"{text}\n\n{block}\n\nDone."}
+
+
+def conversation():
+    """Turns of a session; each turn adds an answer and the next question"""
+    return [
+        (user("Build an intake webhook"), answer("Here it is.", phase=1)),
+        (user("Add enrichment"), answer("Added.", phase=2)),
+        (user("What does the webhook accept?"), answer("Any JSON body.")),
+        (user("Thanks, and error handling?"), answer("Use an error workflow.")),
+        (user("Add notifications"), answer("Added.", phase=3)),
+        (user("Looks good"), answer("Great!")),
+    ]
+
+
+def test_empty_and_small_history():
+    """Everything is sent untouched when it fits and nothing is superseded"""
+    print("🧪 Testing a small history")
+    context = build_context(SYSTEM_PROMPT, [], MODEL)
+    assert context.messages == [{"role": "system", "content": SYSTEM_PROMPT}]
+
+    messages = [user("Hi"), answer("Hello", phase=1), user("Next?")]
+    context = build_context(SYSTEM_PROMPT, messages, MODEL)
+    assert context.messages[1:] == messages
+    assert context.tokens == sum(message_tokens(m) for m in context.messages)
+    assert (context.dropped, context.trimmed) == (0, 0)
+    print(f"   ✅ {context.tokens} tokens of {context.budget}")
+
+
+def test_superseded_workflow_trimmed():
+    """Only the newest workflow block is sent in full"""
+    print("🧪 Testing superseded workflow JSON")
+    messages = [m for turn in conversation()[:5] for m in turn] + [user("More?")]
+    context = build_context(SYSTEM_PROMPT, messages, MODEL)
+    sent = context.messages[1:]
+    assert context.trimmed == 2
+    assert sent[1]["content"] == f"Here it is.\n\n{SUPERSEDED_WORKFLOW_NOTE}\n\nDone."
+    assert sent[3]["content"] == f"Added.\n\n{SUPERSEDED_WORKFLOW_NOTE}\n\nDone."
+    assert sent[9] is messages[9], "the latest workflow must be sent in full"
+    assert all(s is m for s, m in zip(sent, messages) if s["role"] == "user")
+    assert messages[1]["content"].count("```json") == 1, "input was modified"
+    print("   ✅ older workflow blocks replaced by a note")
+
+
+def test_history_prefix_stable():
+    """Each sent message changes at most once, when it is first superseded"""
+    print("🧪 Testing the history prefix across turns")
+    history = []
+    sent_versions = {}  # message index -> contents it was sent with
+    previous = None
+    for question, reply in conversation():
+        history.append(question)
+        context = build_context(SYSTEM_PROMPT, history, MODEL)
+        sent = context.messages[1:]
+        for index, message in enumerate(sent):
+            versions = sent_versions.setdefault(index, [])
+            if not versions or versions[-1] != message["content"]:
+                versions.append(message["content"])
+        if previous is not None and "```json" not in history[-2]["content"]:
+            # No new workflow last turn: the earlier request is an exact prefix
+            assert context.messages[: len(previous)] == previous
+        previous = context.messages
+        history.append(reply)
+
+    changed = {index: len(v) for index, v in sent_versions.items() if len(v) > 1}
+    print(f"   Messages changed once: {sorted(changed)}")
+    assert sorted(changed) == [1, 3]
+    assert all(count == 2 for count in changed.values())
+    print("   ✅ earlier turns stay byte-identical")
+
+
+def test_oldest_messages_dropped():
+    """Over budget, the oldest turns go first and history opens with the user"""
+    print("🧪 Testing dropped history")
+    messages = [m for turn in conversation() for m in turn] + [user("Bye")]
+    full = build_context(SYSTEM_PROMPT, messages, MODEL)
+    latest_workflow = full.messages[10]
+    assert "```json" in latest_workflow["content"]
+
+    budget = full.tokens - message_tokens(full.messages[1]) - 1
+    context = build_context(SYSTEM_PROMPT, messages, MODEL, budget=budget)
+    sent = context.messages[1:]
+    print(f"   {context.dropped} dropped, {context.tokens} of {context.budget}")
+    assert context.tokens <= budget
+    assert context.dropped == 2
+    assert sent == full.messages[3:]
+    assert sent[0]["role"] == "user"
+
+    # The latest workflow and message are kept even when history is not
+    required = (
+        message_tokens(full.messages[0])
+        + message_tokens(latest_workflow)
+        + message_tokens(messages[-1])
+    )
+    context = build_context(SYSTEM_PROMPT, messages, MODEL, budget=required)
+    assert context.messages[1:] == [latest_workflow, messages[-1]]
+    assert context.dropped == len(messages) - 2
+    print("   ✅ oldest turns dropped first")
+
+
+def test_budget_error():
+    """A latest message that cannot fit raises before any request"""
+    print("🧪 Testing an oversized message")
+    messages = [user("word " * 2000)]
+    try:
+        build_context(SYSTEM_PROMPT, messages, MODEL, budget=500)
+    except ContextBudgetError as e:
+        print(f"   {e}")
+        assert e.budget == 500
+        assert e.required_tokens > 500
+    else:
+        raise AssertionError("expected ContextBudgetError")
+    print("   ✅ refused with the required token count")
+
+
+if __name__ == "__main__":
+    test_empty_and_small_history()
+    test_superseded_workflow_trimmed()
+    test_history_prefix_stable()
+    test_oldest_messages_dropped()
+    test_budget_error()
+    print("\n✅ All context window tests passed!")
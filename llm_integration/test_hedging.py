@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test racing a backup model against a slow primary, with fake streams
+"""
+
+import threading
+from types import SimpleNamespace
+
+from llm_integration.hedging import HedgePolicy, hedged_completion
+from llm_integration.metrics import MetricsRegistry
+
+# Generous bound for waits that only time out when a test is failing
+WAIT = 5.0
+
+
+def chunk(text=None, usage=None):
+    """A completion chunk shaped like the OpenAI SDK's"""
+    choices = (
+        [] if text is None else [SimpleNamespace(delta=SimpleNamespace(content=text))]
+    )
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeStream:
+    """Yields `chunks`, first waiting for `gate` if one is given
+
+    Closing the stream releases a waiting read, which then fails the way a
+    dropped connection does.
+    """
+
+    def __init__(self, chunks, gate=None, error=None):
+        self.chunks = chunks
+        self.gate = gate
+        self.error = error
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        if self.gate is not None:
+            self.gate.wait(WAIT)
+        for item in self.chunks:
+            if self.closed.is_set():
+                raise ConnectionError("stream closed")
+            yield item
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed.set()
+        if self.gate is not None:
+            self.gate.set()
+
+
+class Provider:
+    """`open_stream` for hedged_completion, serving one FakeStream per model"""
+
+    def __init__(self, streams):
+        self.streams = streams
+        self.opened = []
+        self.backup_opened = threading.Event()
+
+    def open_stream(self, model):
+        self.opened.append(model)
+        if len(self.opened) > 1:
+            self.backup_opened.set()
+        stream = self.streams[model]
+        if isinstance(stream, Exception):
+            raise stream
+        return stream
+
+
+def run(provider, deadline):
+    """Drain a hedged completion of "primary" with "backup" behind it"""
+    policy = HedgePolicy(
+        backups="primary=backup", deadline=deadline, metrics=MetricsRegistry()
+    )
+    winners = []
+    chunks = list(
+        hedged_completion(
+            provider.open_stream,
+            "primary",
+            "backup",
+            policy,
+            lambda model, started_at: winners.append(model),
+        )
+    )
+    text = "".join(c.choices[0].delta.content for c in chunks if c.choices)
+    return text, chunks, winners, policy
+
+
+def test_fast_primary_not_hedged():
+    """A primary that answers before the deadline never starts the backup"""
+    print("🧪 Testing a fast primary")
+    usage = chunk(usage={"completion_tokens": 2})
+    provider = Provider(
+        {"primary": FakeStream([chunk(""), chunk("Hel"), chunk("lo"), usage])}
+    )
+    text, chunks, winners, policy = run(provider, deadline=60)
+    assert text == "Hello"
+    assert chunks[0].choices[0].delta.content == "", "buffered chunks come first"
+    assert chunks[-1] is usage
+    assert provider.opened == ["primary"]
+    assert winners == ["primary"]
+    assert policy.get_stats() == {
+        "requests": 1,
+        "fired": 0,
+        "backup_wins": 0,
+        "primary_wins": 0,
+        "failovers": 0,
+    }
+    print("   ✅ one request, no hedge")
+
+
+def test_failed_primary_fails_over():
+    """A primary that fails before answering starts the backup at once"""
+    print("🧪 Testing failover")
+    provider = Provider(
+        {
+            "primary": ConnectionError("primary down"),
+            "backup": FakeStream([chunk("From "), chunk("backup")]),
+        }
+    )
+    text, _, winners, policy = run(provider, deadline=60)
+    assert text == "From backup"
+    assert provider.opened == ["primary", "backup"]
+    assert winners == ["backup"]
+    assert policy.get_stats()["failovers"] == 1
+    assert policy.get_stats()["fired"] == 0
+
+    # Both failing raises the last error to the caller
+    provider = Provider(
+        {
+            "primary": FakeStream([], error=ConnectionError("primary down")),
+            "backup": ConnectionError("backup down"),
+        }
+    )
+    try:
+        run(provider, deadline=60)
+    except ConnectionError as e:
+        assert str(e) == "backup down"
+    else:
+        raise AssertionError("expected ConnectionError")
+    print("   ✅ backup took over")
+
+
+def test_slow_primary_cancelled():
+    """When the backup answers first, the stalled primary is cancelled and closed"""
+    print("🧪 Testing a stalled primary")
+    primary = FakeStream([chunk("late")], gate=threading.Event())
+    backup = FakeStream([chunk("Fast "), chunk("answer")])
+    provider = Provider({"primary": primary, "backup": backup})
+    text, _, winners, policy = run(provider, deadline=0)
+    assert text == "Fast answer"
+    assert winners == ["backup"]
+    assert primary.closed.wait(WAIT), "the losing stream was not closed"
+    stats = policy.get_stats()
+    assert (stats["fired"], stats["backup_wins"], stats["primary_wins"]) == (1, 1, 0)
+    # The primary's TTFT is recorded as at least its wait so far
+    assert policy.metrics.percentile("primary", "ttft", 50) is not None
+    print("   ✅ loser closed, backup streamed")
+
+
+def test_primary_wins_after_hedge():
+    """A primary that answers after the hedge fired still wins; the backup closes"""
+    print("🧪 Testing a primary that wins the race")
+    provider = Provider({})
+    backup = FakeStream([chunk("backup")], gate=threading.Event())
+    primary_gate = threading.Event()
+    provider.streams = {
+        "primary": FakeStream([chunk("primary")], gate=primary_gate),
+        "backup": backup,
+    }
+    # Release the primary only once the backup request has been opened
+    releaser = threading.Thread(
+        target=lambda: provider.backup_opened.wait(WAIT) and primary_gate.set()
+    )
+    releaser.start()
+    text, _, winners, policy = run(provider, deadline=0)
+    releaser.join()
+    assert text == "primary"
+    assert winners == ["primary"]
+    assert backup.closed.wait(WAIT), "the losing backup was not closed"
+    stats = policy.get_stats()
+    assert (stats["fired"], stats["primary_wins"], stats["backup_wins"]) == (1, 1, 0)
+    print("   ✅ primary streamed, backup closed")
+
+
+if __name__ == "__main__":
+    test_fast_primary_not_hedged()
+    test_failed_primary_fails_over()
+    test_slow_primary_cancelled()
+    test_primary_wins_after_hedge()
+    print("\n✅ All hedging tests passed!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test the per-model streaming latency metrics
+"""
+
+from llm_integration.metrics import MetricsRegistry, RollingHistogram
+
+
+def test_histogram_percentiles():
+    """Nearest-rank percentiles over the most recent window"""
+    print("🧪 Testing rolling histogram")
+    histogram = RollingHistogram(window=100)
+    histogram.extend(range(1, 201))
+    summary = histogram.summary()
+    print(f"   {summary}")
+    assert summary["count"] == 200 and len(histogram) == 100
+    assert (summary["p50"], summary["p95"], summary["max"]) == (150, 195, 200)
+    assert RollingHistogram().summary()["p50"] is None
+    print("   ✅ window and percentiles")
+
+
+def test_finished_stream_recorded():
+    """A finished stream adds its timings under its model"""
+    print("🧪 Testing a finished stream")
+    registry = MetricsRegistry()
+    timer = registry.start("model-a")
+    timer.chunk("Hello")
+    timer.chunk(" world")
+    timer.finish()
+    summary = registry.get_summary()
+    assert list(summary) == ["model-a"]
+    assert summary["model-a"]["total"]["count"] == 1
+    assert summary["model-a"]["chars"]["max"] == 11
+    assert summary["model-a"]["errors"] == 0
+    print("   ✅ recorded")
+
+
+def test_error_only_model_listed():
+    """A model whose every stream failed still appears, with its errors"""
+    print("🧪 Testing a model that only failed")
+    registry = MetricsRegistry()
+    registry.start("model-a").fail()
+    registry.start("model-a").fail()
+    registry.start("model-b").finish()
+    summary = registry.get_summary()
+    print(f"   models: {list(summary)}")
+    assert summary["model-a"]["errors"] == 2
+    assert summary["model-a"]["total"]["count"] == 0
+    assert summary["model-a"]["ttft"]["p50"] is None
+    assert registry.get_summary("model-a")["model-a"]["errors"] == 2
+    assert summary["model-b"]["errors"] == 0
+
+    registry.reset()
+    assert registry.get_summary() == {}
+    print("   ✅ error-only model listed")
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles()
+    test_finished_stream_recorded()
+    test_error_only_model_listed()
+    print("\n✅ All metrics tests passed!")
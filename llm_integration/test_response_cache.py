@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test the two-tier exact-match response cache
+"""
+
+import os
+import tempfile
+
+from llm_integration.response_cache import ResponseCache, make_cache_key
+
+MESSAGES = [
+    {"role": "system", "content": "Ignored: the system prompt is hashed"},
+    {"role": "user", "content": "Build a webhook"},
+]
+
+
+def new_cache(**kwargs):
+    return ResponseCache(directory=tempfile.mkdtemp(), models="*", **kwargs)
+
+
+def test_cache_key():
+    """Keys ignore whitespace and line endings, nothing else"""
+    print("🧪 Testing cache keys")
+    key = make_cache_key("model-a", 0.0, 1000, "prompt", MESSAGES)
+    reformatted = [MESSAGES[0], {"role": "user", "content": " Build a webhook\r\n"}]
+    assert make_cache_key("model-a", 0.0, 1000, "prompt", reformatted) == key
+    for changed in (
+        ("model-b", 0.0, 1000, "prompt", MESSAGES),
+        ("model-a", 0.7, 1000, "prompt", MESSAGES),
+        ("model-a", 0.0, 2000, "prompt", MESSAGES),
+        ("model-a", 0.0, 1000, "other prompt", MESSAGES),
+        ("model-a", 0.0, 1000, "prompt", MESSAGES[1:] + MESSAGES[1:]),
+    ):
+        assert make_cache_key(*changed) != key, changed[:4]
+    print("   ✅ exact-match keys")
+
+
+def test_opt_in():
+    """Nothing is cached unless a model or temperature ceiling opts in"""
+    print("🧪 Testing opt-in")
+    directory = tempfile.mkdtemp()
+    cache = ResponseCache(directory=directory, models="", max_temperature=-1)
+    assert not cache.enabled and not cache.is_cacheable("model-a", 0.0)
+    cache = ResponseCache(directory=directory, models="model-a", max_temperature=-1)
+    assert cache.is_cacheable("model-a", 0.7)
+    assert not cache.is_cacheable("model-b", 0.0)
+    cache = ResponseCache(directory=directory, models="", max_temperature=0.2)
+    assert cache.is_cacheable("model-b", 0.0)
+    assert not cache.is_cacheable("model-b", 0.7)
+    print("   ✅ opt-in by model or temperature")
+
+
+def test_hit_and_miss():
+    """A stored answer replays chunk for chunk; other keys miss"""
+    print("🧪 Testing hits and misses")
+    cache = new_cache()
+    assert cache.get("a") is None
+    cache.put("a", iter(["Hel", "lo"]))
+    assert list(cache.replay(cache.get("a"))) == ["Hel", "lo"]
+    assert cache.get("b") is None
+    stats = cache.get_stats()
+    print(f"   {stats}")
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 0, 2)
+    assert stats["bytes_saved"] == 5 and stats["stores"] == 1
+    print("   ✅ hit replays, miss counted")
+
+
+def test_memory_eviction_falls_back_to_disk():
+    """The memory LRU drops its oldest entry, which is then read from disk"""
+    print("🧪 Testing memory eviction")
+    cache = new_cache(memory_items=2)
+    cache.put("a", ["A"])
+    cache.put("b", ["B"])
+    cache.get("a")  # a is now more recent than b
+    cache.put("c", ["C"])
+    assert list(cache._memory) == ["a", "c"]
+
+    assert cache.get("b") == ["B"]
+    stats = cache.get_stats()
+    assert (stats["memory_hits"], stats["disk_hits"]) == (1, 1)
+    assert list(cache._memory) == ["c", "b"], "a disk hit is promoted to memory"
+    print("   ✅ least recently used entry evicted from memory")
+
+
+def test_disk_tier_survives_restart():
+    """A new cache over the same directory serves earlier answers"""
+    print("🧪 Testing the disk tier")
+    cache = new_cache()
+    cache.put("a", ["Persisted ", "answer"])
+    restarted = ResponseCache(directory=cache.directory, models="*")
+    assert restarted.get("a") == ["Persisted ", "answer"]
+    assert restarted.get("a") == ["Persisted ", "answer"]
+    stats = restarted.get_stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+    # A damaged file is a miss, not an error
+    cache._path("b").write_text("{not json", encoding="utf-8")
+    assert restarted.get("b") is None
+    print("   ✅ answers survive a restart")
+
+
+def test_disk_eviction():
+    """Past the size limit, least recently used files are deleted"""
+    print("🧪 Testing disk eviction")
+    entry = ["x" * 1000]
+    cache = new_cache(memory_items=1)
+    cache.put("a", entry)
+    size = cache._path("a").stat().st_size
+    cache.disk_bytes = size * 2 + size // 2
+    cache.put("b", entry)
+    os.utime(cache._path("a"), (1, 1))
+    os.utime(cache._path("b"), (2, 2))
+    cache.put("c", entry)
+
+    assert not cache._path("a").exists()
+    assert cache._path("b").exists() and cache._path("c").exists()
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["disk_bytes"] <= cache.disk_bytes
+
+    cache.clear()
+    assert cache.get("c") is None
+    assert cache.get_stats()["disk_bytes"] == 0
+    print("   ✅ oldest file evicted; clear empties both tiers")
+
+
+if __name__ == "__main__":
+    test_cache_key()
+    test_opt_in()
+    test_hit_and_miss()
+    test_memory_eviction_falls_back_to_disk()
+    test_disk_tier_survives_restart()
+    test_disk_eviction()
+    print("\n✅ All response cache tests passed!")
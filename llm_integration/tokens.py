@@ -0,0 +1,51 @@
+"""
+BuildMap Token Counting - Token estimates for prompts and chat messages
+"""
+
+import math
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency; fall back to a character heuristic
+    tiktoken = None
+
+# Average characters per token for English prose and JSON in modern BPE vocabularies
+CHARS_PER_TOKEN = 4.0
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once; None if unavailable"""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Encoding files are downloaded on first use and may be unreachable
+            _encoding_failed = True
+    return _encoding
+
+
+def tokenizer_name() -> str:
+    """Name of the tokenizer used by count_tokens"""
+    return "tiktoken/cl100k_base" if _get_encoding() is not None else "heuristic"
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the tokens in `text`
+
+    Uses tiktoken when installed. Otherwise it estimates one token per
+    CHARS_PER_TOKEN characters, which is close for Claude and GPT models.
+    Results are cached by text, so repeated prompts and history messages
+    are counted once.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
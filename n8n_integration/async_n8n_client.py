@@ -0,0 +1,264 @@
+"""
+BuildMap Async n8n Client - Coroutine version of N8NClient built on httpx
+"""
+
+import asyncio
+import importlib.util
+import os
+import ssl
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from n8n_integration.n8n_client import (
+    N8N_API_KEY,
+    N8N_BASE_URL,
+    N8N_PROBE_MAX_BYTES,
+    N8NClient,
+    n8n_client,
+)
+from n8n_integration.workflow_validator import api_payload
+
+# Async connection pool configuration
+N8N_ASYNC_MAX_CONNECTIONS = int(os.environ.get("N8N_ASYNC_MAX_CONNECTIONS", "20"))
+N8N_ASYNC_MAX_KEEPALIVE = int(os.environ.get("N8N_ASYNC_MAX_KEEPALIVE", "10"))
+
+# HTTP/2 needs the optional `h2` package (installed by `httpx[http2]`)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class AsyncN8NClient:
+    """Async client for the n8n REST API
+
+    Mirrors N8NClient method for method and returns the same result dicts,
+    but every network call is a coroutine over one shared httpx.AsyncClient.
+    With HTTP/2 many concurrent reads and writes share a single connection.
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        api_key: str = None,
+        http2: bool = True,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        node_types: Any = None,
+    ):
+        """Initialize async n8n client with optional custom configuration
+
+        `node_types` is a `NodeTypeCatalog` to check node types and versions
+        against before writes, as `N8NClient.node_types` is.
+        """
+        self.base_url = (base_url or N8N_BASE_URL).rstrip("/")
+        self.api_key = api_key or N8N_API_KEY
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.max_connections = max_connections or N8N_ASYNC_MAX_CONNECTIONS
+        self.max_keepalive_connections = (
+            max_keepalive_connections or N8N_ASYNC_MAX_KEEPALIVE
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._node_types = node_types
+
+        # Validation, merging and response interpretation are shared with the
+        # sync client so both return identical result dicts
+        self._sync = N8NClient(base_url=self.base_url, api_key=self.api_key)
+
+    @property
+    def node_types(self) -> Any:
+        """Node-type catalog writes are checked against, or None
+
+        Unless one was given, this is the shared `n8n_client`'s catalog when
+        both clients talk to the same instance, looked up on each check so a
+        catalog installed after this client was created is used too.
+        """
+        if self._node_types is None and self.base_url == n8n_client.base_url:
+            return n8n_client.node_types
+        return self._node_types
+
+    @node_types.setter
+    def node_types(self, catalog: Any):
+        self._node_types = catalog
+
+    def _checker(self) -> N8NClient:
+        """The private sync client, checking against this client's catalog"""
+        self._sync.node_types = self.node_types
+        return self._sync
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared httpx.AsyncClient, created on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                headers={
+                    "X-N8N-API-KEY": self.api_key,
+                    "Content-Type": "application/json",
+                },
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+                verify=True,
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared AsyncClient and release its connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncN8NClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def test_connection(self, lightweight: bool = True) -> Dict[str, Any]:
+        """Test connection to n8n instance with detailed error reporting
+
+        Same probe modes and `latency_ms` reporting as N8NClient.test_connection.
+        """
+        if not self.api_key or not self.base_url:
+            return {
+                "connected": False,
+                "error": "N8N_BASE_URL or N8N_API_KEY not configured",
+                "details": f"Base URL: {self.base_url}, API Key: {'set' if self.api_key else 'not set'}",
+            }
+
+        try:
+            workflows_url = f"{self.base_url}/api/v1/workflows"
+            started = time.perf_counter()
+
+            if lightweight:
+                async with self.client.stream(
+                    "GET", workflows_url, params={"limit": 1}, timeout=10
+                ) as response:
+                    body = b""
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) >= N8N_PROBE_MAX_BYTES:
+                            break
+            else:
+                response = await self.client.get(workflows_url, timeout=10)
+                body = response.content
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            result = self._sync._connection_result(
+                response, workflows_url, body[:200].decode("utf-8", "replace")
+            )
+            result["probe"] = "lightweight" if lightweight else "full"
+            result["latency_ms"] = round(latency_ms, 1)
+            return result
+        except Exception as e:
+            return self._request_error(e, "connected", 10)
+
+    def validate_workflow_json(self, workflow_json: Dict[str, Any]) -> Tuple[bool, str]:
+        """Validate workflow JSON before sending to n8n"""
+        return self._checker().validate_workflow_json(workflow_json)
+
+    async def create_workflow(self, workflow_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new workflow in n8n"""
+        precheck = await self._precheck_write(workflow_json)
+        if precheck:
+            return precheck
+
+        try:
+            workflow_url = f"{self.base_url}/api/v1/workflows"
+            response = await self.client.post(
+                workflow_url, json=api_payload(workflow_json), timeout=15
+            )
+            return self._sync._create_result(response, workflow_url)
+        except Exception as e:
+            return self._request_error(e, "success", 15)
+
+    async def update_workflow(
+        self, workflow_id: str, workflow_json: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Update an existing workflow in n8n using PUT (full replacement)"""
+        precheck = await self._precheck_write(workflow_json)
+        if precheck:
+            return precheck
+
+        try:
+            response = await self.client.put(
+                f"{self.base_url}/api/v1/workflows/{workflow_id}",
+                json=api_payload(workflow_json),
+                timeout=15,
+            )
+            return self._sync._update_result(response, workflow_id)
+        except Exception as e:
+            return self._request_error(e, "success", 15)
+
+    async def get_workflow(self, workflow_id: str) -> Dict[str, Any]:
+        """Get workflow details from n8n"""
+        try:
+            response = await self.client.get(
+                f"{self.base_url}/api/v1/workflows/{workflow_id}", timeout=10
+            )
+            return self._sync._get_result(response, workflow_id)
+        except Exception as e:
+            return self._request_error(e, "success", 10)
+
+    async def get_workflows(self, workflow_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch several workflows concurrently, results in input order"""
+        return await asyncio.gather(
+            *(self.get_workflow(workflow_id) for workflow_id in workflow_ids)
+        )
+
+    def get_workflow_url(self, workflow_id: str) -> str:
+        """Generate proper URL for workflow"""
+        return self._sync.get_workflow_url(workflow_id)
+
+    def merge_workflows(
+        self, existing_workflow: Dict[str, Any], new_phase: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Merge new phase into existing workflow"""
+        return self._sync.merge_workflows(existing_workflow, new_phase)
+
+    async def _precheck_write(self, workflow_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the checks done before every write
+
+        Returns an error result dict, or an empty dict when the write may proceed.
+        An invalid workflow is refused before any request is made; as in the
+        sync client there is no connection probe.
+        """
+        report = self._checker().check_workflow(workflow_json)
+        if not report.valid:
+            return self._sync._invalid_result(report)
+        return {}
+
+    def _request_error(
+        self, error: Exception, status_key: str, timeout: int
+    ) -> Dict[str, Any]:
+        """Map an httpx exception to the same result dict N8NClient returns"""
+        if isinstance(error, httpx.TimeoutException):
+            return {
+                status_key: False,
+                "error": "Connection timeout",
+                "details": f"Server did not respond within {timeout} seconds",
+                "suggestion": "Check if n8n server is running and accessible",
+            }
+        if isinstance(error, httpx.ConnectError) and isinstance(
+            error.__context__, ssl.SSLError
+        ):
+            return {
+                status_key: False,
+                "error": "SSL certificate error",
+                "details": f"SSL verification failed: {str(error)}",
+                "suggestion": "Check SSL certificates or try verify=False for testing",
+            }
+        if isinstance(error, httpx.TransportError):
+            return {
+                status_key: False,
+                "error": "Connection error",
+                "details": f"Could not connect to server: {str(error)}",
+                "suggestion": "Check network connectivity and server URL",
+            }
+        return {
+            status_key: False,
+            "error": "Unexpected error",
+            "details": f"{type(error).__name__}: {str(error)}",
+            "suggestion": "Check async_n8n_client.py implementation",
+        }
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark workflow JSON extraction on large (50-200 KB) model outputs
+
+Compares the single-pass extractor against the previous regex + brace-scan
+implementation, and checks both agree on the extracted workflow.
+
+Run with: python -m n8n_integration.benchmark_json_extraction
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from n8n_integration.json_extractor import JsonObjectScanner, extract_workflow_json
+
+
+def legacy_extract(text):
+    """The extractor used before the single-pass scanner (reference only)"""
+    json_match = re.search(r"```json\n(.*?)\n```", text, re.DOTALL)
+    if json_match:
+        try:
+            return json.loads(json_match.group(1).strip())
+        except json.JSONDecodeError:
+            return None
+
+    for match in (
+        re.search(r"```\n(.*?)\n```", text, re.DOTALL),
+        re.search(r"```javascript\n(.*?)\n```", text, re.DOTALL),
+    ):
+        if match:
+            try:
+                return json.loads(match.group(1).strip())
+            except json.JSONDecodeError:
+                continue
+
+    stack = []
+    for i, char in enumerate(text):
+        if char == "{":
+            stack.append(i)
+        elif char == "}" and stack:
+            start = stack.pop()
+            if not stack:
+                try:
+                    workflow_json = json.loads(text[start : i + 1])
+                    if "nodes" in workflow_json and "connections" in workflow_json:
+                        return workflow_json
+                except json.JSONDecodeError:
+                    pass
+    return None
+
+
+def build_workflow(phase, node_count):
+    """Build a workflow whose parameters are full of n8n expressions"""
+    nodes = [
+        {
+            "name": f"Node {phase}-{i}",
+            "type": "n8n-nodes-base.set",
+            "typeVersion": 3,
+            "position": [250 + i * 200, 300],
+            "parameters": {
+                "value": "={{ $json.items[" + str(i) + '].name }} and "quoted" \\ text',
+                "code": "if (x) { return { a: 1 }; } else { return {}; }",
+            },
+        }
+        for i in range(node_count)
+    ]
+    connections = {
+        nodes[i]["name"]: {
+            "main": [[{"node": nodes[i + 1]["name"], "type": "main", "index": 0}]]
+        }
+        for i in range(node_count - 1)
+    }
+    return {
+        "name": f"Phase {phase}: Benchmark",
+        "nodes": nodes,
+        "connections": connections,
+    }
+
+
+PROSE = (
+    'Use {{ $json.email }} in the next node and map "First Name" to the contact. '
+    "The expression {{ $node['Webhook'].json.body }} reads the payload, and a "
+    "Code node can return { json: { ok: true } } for each item.\n"
+)
+
+
+def build_response(target_bytes, layout):
+    """Build a long answer of roughly `target_bytes`
+
+    layouts:
+      phases - several ```json phase blocks spread through the text
+      late   - long explanation first, one ```json workflow at the very end
+      bare   - long explanation, then an unfenced workflow object
+    """
+    if layout == "phases":
+        parts = []
+        phase = 1
+        while sum(len(p) for p in parts) < target_bytes:
+            parts.append(PROSE * 40)
+            workflow = json.dumps(build_workflow(phase, 25), indent=2)
+            parts.append(f"```json\n{workflow}\n```\n")
+            phase += 1
+        return "".join(parts)
+
+    workflow = json.dumps(build_workflow(1, 25), indent=2)
+    prose = PROSE * max((target_bytes - len(workflow)) // len(PROSE), 1)
+    if layout == "late":
+        return f"{prose}\n```json\n{workflow}\n```\nGood luck!"
+    return f"{prose}\nHere is the workflow:\n{workflow}\nGood luck!"
+
+
+def time_call(func, text, repeat=5):
+    """Return the best wall time of `repeat` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def stream_extract(text, chunk_size=16):
+    """Feed `text` to the incremental scanner in small chunks"""
+    scanner = JsonObjectScanner()
+    found = []
+    for i in range(0, len(text), chunk_size):
+        found.extend(scanner.feed(text[i : i + chunk_size]))
+    return found
+
+
+def main():
+    print("⏱️  Workflow JSON extraction benchmark\n")
+    ok = True
+
+    for layout in ("phases", "late", "bare"):
+        label = layout
+        for size_kb in (50, 100, 200):
+            text = build_response(size_kb * 1024, layout)
+            new = extract_workflow_json(text)
+            old = legacy_extract(text)
+            agree = new == old
+            ok = ok and agree
+
+            new_ms = time_call(extract_workflow_json, text)
+            old_ms = time_call(legacy_extract, text)
+            stream_ms = time_call(stream_extract, text, repeat=3)
+            print(
+                f"   {label:6} {len(text) / 1024:6.0f} KB | "
+                f"single-pass {new_ms:7.2f} ms | streamed {stream_ms:7.2f} ms | "
+                f"legacy {old_ms:7.2f} ms | same result: {'✅' if agree else '❌'}"
+            )
+
+    print("\n✅ Benchmark complete" if ok else "\n❌ Extractors disagree")
+    return ok
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,18 @@
+"""
+pytest collection for n8n_integration
+
+The unit tests here run offline and are collected with the rest of the
+suite. The scripts below talk to a live n8n instance or report results
+by return value; run them directly, e.g. `python -m n8n_integration.test_simple`.
+"""
+
+collect_ignore = [
+    "test_api_endpoints.py",
+    "test_error_handling.py",
+    "test_n8n_connection_detailed.py",
+    "test_n8n_integration.py",
+    "test_simple.py",
+    "test_tags_removal.py",
+    "test_validation_simple.py",
+    "test_workflow_validation.py",
+]
@@ -0,0 +1,159 @@
+"""
+BuildMap Export Catalog - Append-only index of exported workflow files
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+INDEX_FILENAME = ".export_index.jsonl"
+# Suffix of the small reference files that point at content-addressed blobs
+REF_SUFFIX = ".ref"
+
+# Rewrite the index once it holds this many superseded records
+INDEX_COMPACT_SLACK = 1000
+
+
+class ExportEntry(NamedTuple):
+    """One exported workflow, either a plain file or a reference to a blob"""
+
+    name: str
+    size: int
+    mtime: float
+    blob: Optional[str] = None  # content hash when stored in the blob store
+    codec: Optional[str] = None
+
+
+class ExportCatalog:
+    """Index of the exports directory, newest last
+
+    Every export appends one JSON line to `.export_index.jsonl`, so listing
+    the newest files never scans or stats the directory. The index is read
+    incrementally from the last offset, which also picks up exports written
+    by other processes. A missing index is rebuilt from one directory scan.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.index_path = self.directory / INDEX_FILENAME
+        self._entries: Dict[str, ExportEntry] = {}  # insertion order = age
+        self._offset = 0
+        self._records = 0  # lines in the index, including superseded ones
+        self._lock = threading.Lock()
+
+    def add(self, filepath: Path) -> ExportEntry:
+        """Record a newly written export file"""
+        filepath = Path(filepath)
+        stat = filepath.stat()
+        return self.add_entry(ExportEntry(filepath.name, stat.st_size, stat.st_mtime))
+
+    def add_entry(self, entry: ExportEntry) -> ExportEntry:
+        """Record an export described by `entry`"""
+        line = json.dumps(entry._asdict()) + "\n"
+        with self._lock:
+            self._refresh()
+            # One write on an O_APPEND file keeps lines whole across processes
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._read_new_records()
+            if self._records - len(self._entries) > INDEX_COMPACT_SLACK:
+                self._write_index()
+        return entry
+
+    def latest(self, limit: int = 5) -> List[ExportEntry]:
+        """The `limit` most recent exports, newest first"""
+        with self._lock:
+            self._refresh()
+            result = []
+            for entry in reversed(list(self._entries.values())):
+                if len(result) == limit:
+                    break
+                if self.entry_path(entry).exists():
+                    result.append(entry)
+            return result
+
+    def count(self) -> int:
+        """Number of indexed exports"""
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def get(self, name: str) -> Optional[ExportEntry]:
+        """Indexed entry for `name`, or None for unknown names"""
+        with self._lock:
+            return self._entries.get(name)
+
+    def entry_path(self, entry: ExportEntry) -> Path:
+        """The file that represents `entry` in the exports directory"""
+        if entry.blob:
+            return self.directory / (entry.name + REF_SUFFIX)
+        return self.directory / entry.name
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Load a plain export's bytes; only called when a download is requested"""
+        entry = self.get(name)
+        if entry is None or entry.blob:
+            return None
+        try:
+            return self.entry_path(entry).read_bytes()
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """Load index records appended since the last read"""
+        if not self.index_path.exists():
+            self._rebuild()
+        else:
+            self._read_new_records()
+
+    def _read_new_records(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return
+        # Only consume complete lines; a concurrent append may be in progress
+        complete = data[: data.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                entry = ExportEntry(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            self._records += 1
+            self._entries.pop(entry.name, None)
+            self._entries[entry.name] = entry
+
+    def _rebuild(self):
+        """Create the index from one scan of the exports directory"""
+        entries = []
+        if self.directory.is_dir():
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append(ExportEntry(path.name, stat.st_size, stat.st_mtime))
+            for path in self.directory.glob("*" + REF_SUFFIX):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entries.append(ExportEntry(**json.load(f)))
+                except (OSError, ValueError, TypeError):
+                    continue
+        entries.sort(key=lambda entry: entry.mtime)
+        self._entries = {entry.name: entry for entry in entries}
+        self._write_index()
+
+    def _write_index(self):
+        """Rewrite the index with one record per export"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry._asdict()) + "\n")
+        os.replace(temp_path, self.index_path)
+        self._offset = self.index_path.stat().st_size
+        self._records = len(self._entries)
@@ -0,0 +1,169 @@
+"""
+BuildMap Export Store - Compressed, content-addressed storage for workflow exports
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set
+
+from n8n_integration.export_catalog import REF_SUFFIX, ExportCatalog, ExportEntry
+
+# Codec used for new blobs; existing blobs keep the codec they were written with
+EXPORT_CODEC = os.environ.get("BUILDMAP_EXPORT_CODEC", "gzip")
+
+BLOBS_DIRNAME = "blobs"
+
+logger = logging.getLogger(__name__)
+
+
+class Codec(NamedTuple):
+    """A compression format for blobs"""
+
+    name: str
+    suffix: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """Make a codec available to export stores (e.g. zstd or brotli)"""
+    CODECS[codec.name] = codec
+
+
+register_codec(
+    Codec(
+        "gzip",
+        ".gz",
+        # mtime=0 keeps identical content byte-identical on disk
+        lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+        gzip.decompress,
+    )
+)
+register_codec(Codec("none", "", lambda data: data, lambda data: data))
+
+
+def _fsync_path(path: Path, flags: int):
+    """fsync a file or directory, ignoring platforms that cannot"""
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def canonical_json(workflow_json: Dict[str, Any]) -> bytes:
+    """Canonical encoding: sorted keys, no insignificant whitespace"""
+    return json.dumps(
+        workflow_json, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+class ExportStore:
+    """Stores each distinct workflow once, compressed and named by its hash
+
+    Blobs live in `blobs/<hash[:2]>/<hash>.json<codec suffix>`. Every export
+    keeps its timestamped name as a small `.ref` file and a catalog entry
+    pointing at the blob, so re-exporting an identical workflow costs one
+    reference instead of another copy.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        codec: str = None,
+        catalog: Optional[ExportCatalog] = None,
+    ):
+        self.directory = Path(directory)
+        self.codec = CODECS[codec or EXPORT_CODEC]
+        self.catalog = catalog or ExportCatalog(self.directory)
+        self._unsynced: Set[Path] = set()
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest: str, codec: Codec) -> Path:
+        return (
+            self.directory / BLOBS_DIRNAME / digest[:2] / f"{digest}.json{codec.suffix}"
+        )
+
+    def save(self, workflow_json: Dict[str, Any], name: str) -> ExportEntry:
+        """Store `workflow_json` under the reference `name`"""
+        return self.save_canonical(canonical_json(workflow_json), name)
+
+    def save_canonical(self, data: bytes, name: str) -> ExportEntry:
+        """Store already canonicalized workflow bytes under `name`
+
+        Files are not fsynced here; call sync() to make a batch durable.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest, self.codec)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(
+                f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(temp_path, "wb") as f:
+                f.write(self.codec.compress(data))
+            os.replace(temp_path, path)
+
+        entry = ExportEntry(name, len(data), time.time(), digest, self.codec.name)
+        ref_path = self.directory / (name + REF_SUFFIX)
+        with open(ref_path, "w", encoding="utf-8") as f:
+            json.dump(entry._asdict(), f)
+        self.catalog.add_entry(entry)
+        with self._lock:
+            self._unsynced.update((path, ref_path, self.catalog.index_path))
+        return entry
+
+    def sync(self):
+        """fsync every file written since the last sync, then their directories"""
+        with self._lock:
+            paths, self._unsynced = self._unsynced, set()
+        directories = set()
+        for path in paths:
+            directories.add(path.parent)
+            _fsync_path(path, os.O_RDONLY)
+        for directory in directories:
+            # Makes the new directory entries (renames, creates) durable
+            _fsync_path(directory, getattr(os, "O_DIRECTORY", os.O_RDONLY))
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Export bytes as pretty-printed JSON, decompressed on demand
+
+        Returns None when the export is unknown or its blob is missing,
+        truncated or corrupt.
+        """
+        entry = self.catalog.get(name)
+        if entry is None:
+            return None
+        if not entry.blob:
+            # Plain file written before the store existed
+            return self.catalog.read(name)
+        codec = CODECS.get(entry.codec)
+        if codec is None:
+            return None
+        path = self.blob_path(entry.blob, codec)
+        try:
+            with open(path, "rb") as f:
+                workflow_json = json.loads(codec.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, zlib.error) as e:
+            # gzip raises EOFError when truncated, BadGzipFile or zlib.error
+            # when corrupt; a damaged blob must not break the export list
+            logger.warning("Cannot read export %s from %s: %s", name, path, e)
+            return None
+        return json.dumps(workflow_json, indent=2, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,147 @@
+"""
+BuildMap Export Writer - Write-behind workflow exports on a background thread
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from n8n_integration.export_store import ExportStore, canonical_json
+
+# Write-behind configuration
+EXPORT_QUEUE_SIZE = int(os.environ.get("BUILDMAP_EXPORT_QUEUE_SIZE", "256"))
+EXPORT_BATCH_SIZE = int(os.environ.get("BUILDMAP_EXPORT_BATCH_SIZE", "32"))
+# Seconds a batch may stay open waiting for more writes before it is synced
+EXPORT_BATCH_INTERVAL = float(os.environ.get("BUILDMAP_EXPORT_BATCH_INTERVAL", "1.0"))
+
+_STOP = object()
+
+
+class ExportWriter:
+    """Queues export writes and performs them on one background thread
+
+    `submit()` never blocks: it snapshots the workflow and enqueues it, and
+    drops the write (counting it) if the bounded queue is full. The writer
+    thread stores a batch of exports, then fsyncs the whole batch once.
+    Pending writes are flushed at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        store: ExportStore,
+        max_queue: int = None,
+        batch_size: int = None,
+        batch_interval: float = None,
+    ):
+        self.store = store
+        self.batch_size = batch_size or EXPORT_BATCH_SIZE
+        self.batch_interval = (
+            EXPORT_BATCH_INTERVAL if batch_interval is None else batch_interval
+        )
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue or EXPORT_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "errors": 0,
+        }
+        atexit.register(self.close)
+
+    def submit(self, workflow_json: Dict[str, Any], name: str) -> bool:
+        """Queue an export of `workflow_json` as `name`; False if dropped"""
+        # Serialize now: the caller may keep mutating the dict after this
+        data = canonical_json(workflow_json)
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((data, name))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued export is written and synced"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Flush pending exports and stop the writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = dict(self.stats)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="export-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        """Write exports in batches; sync once per batch"""
+        running = True
+        while running:
+            item = self._queue.get()
+            batch_deadline = time.monotonic() + self.batch_interval
+            waiters = []
+            written = 0
+            while True:
+                if item is _STOP:
+                    running = False
+                    break
+                if isinstance(item, threading.Event):
+                    # A flush marker closes the batch early
+                    waiters.append(item)
+                    break
+                self._write(*item)
+                written += 1
+                if written >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(
+                        timeout=max(batch_deadline - time.monotonic(), 0)
+                    )
+                except queue.Empty:
+                    break
+
+            if written:
+                try:
+                    self.store.sync()
+                except OSError:
+                    self.stats["errors"] += 1
+                self.stats["batches"] += 1
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, data: bytes, name: str):
+        try:
+            self.store.save_canonical(data, name)
+            self.stats["written"] += 1
+        except Exception:
+            # An export must never take the writer down; the count shows it
+            self.stats["errors"] += 1
@@ -0,0 +1,124 @@
+"""
+BuildMap n8n Health Monitor - Probes n8n in the background and caches the result
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from n8n_integration.n8n_client import N8NClient, n8n_client
+
+# Health monitor configuration
+N8N_HEALTH_INTERVAL = float(os.environ.get("N8N_HEALTH_INTERVAL", "30"))
+N8N_HEALTH_TTL = float(os.environ.get("N8N_HEALTH_TTL", "90"))
+
+
+class HealthMonitor:
+    """Keeps the last n8n connection status fresh without blocking callers
+
+    A daemon thread calls `client.test_connection()` every `interval` seconds.
+    `get_status()` returns the cached result immediately; results older than
+    `ttl` seconds are flagged as stale and trigger an early probe.
+    """
+
+    def __init__(
+        self,
+        client: N8NClient = None,
+        interval: float = None,
+        ttl: float = None,
+    ):
+        """Initialize the monitor; the probe thread starts on first use"""
+        self.client = client or n8n_client
+        self.interval = interval or N8N_HEALTH_INTERVAL
+        self.ttl = ttl or N8N_HEALTH_TTL
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+
+    def start(self):
+        """Start the background probe thread if it is not running yet"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="n8n-health-monitor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the background probe thread"""
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def get_status(self, wait: float = 0.0) -> Dict[str, Any]:
+        """Return the cached connection status without any network I/O
+
+        Before the first probe completes, waits at most `wait` seconds for it.
+        """
+        self.start()
+        if wait > 0:
+            self._ready.wait(wait)
+
+        with self._lock:
+            status = self._status
+            checked_at = self._checked_at
+
+        if status is None:
+            return {
+                "connected": False,
+                "pending": True,
+                "error": "Checking connection...",
+                "details": "The first n8n health probe has not finished yet",
+            }
+
+        age = time.time() - checked_at
+        if age > self.ttl:
+            # Result is too old to trust; ask the prober to run now
+            self._wake.set()
+
+        return {**status, "checked_at": checked_at, "age": age, "stale": age > self.ttl}
+
+    def refresh(self) -> Dict[str, Any]:
+        """Probe synchronously and update the cache (e.g. for a manual retry)"""
+        self._probe()
+        return self.get_status()
+
+    def _probe(self):
+        """Run one connection test and store its result"""
+        status = self.client.test_connection()
+        with self._lock:
+            self._status = status
+            self._checked_at = time.time()
+        self._ready.set()
+
+    def _run(self):
+        """Background loop: probe, then sleep until the interval or a wake-up"""
+        while not self._stop.is_set():
+            try:
+                self._probe()
+            except Exception as e:
+                with self._lock:
+                    self._status = {
+                        "connected": False,
+                        "error": "Health probe failed",
+                        "details": f"{type(e).__name__}: {str(e)}",
+                    }
+                    self._checked_at = time.time()
+                self._ready.set()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+# Singleton monitor instance
+health_monitor = HealthMonitor()
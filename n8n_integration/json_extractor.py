@@ -0,0 +1,324 @@
+"""
+BuildMap JSON Extractor - Single-pass, linear-time extraction of workflow JSON
+from AI response text
+"""
+
+import json
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+# Tokens the scanner reacts to in each state; everything else is skipped in C
+_PROSE_TOKEN_RE = re.compile(r"```|\{")
+_OBJECT_TOKEN_RE = re.compile(r'```|[{}"]')
+_STRING_TOKEN_RE = re.compile(r'["\\]')
+# An object that can be valid JSON starts with a key or is empty
+_OBJECT_OPENING_RE = re.compile(r"\{\s*")
+_DECODER = json.JSONDecoder()
+
+# Fence languages whose blocks are preferred, in priority order
+JSON_FENCES = ("json",)
+OTHER_FENCES = ("", "javascript", "js")
+
+# Slice size used when scanning a complete response
+SCAN_SLICE_SIZE = 32 * 1024
+
+
+class JsonCandidate:
+    """A top-level JSON object found in the text"""
+
+    __slots__ = ("value", "fence", "start", "end")
+
+    def __init__(
+        self, value: Dict[str, Any], fence: Optional[str], start: int, end: int
+    ):
+        self.value = value
+        self.fence = fence  # fence language, "" for a bare ``` block, None if unfenced
+        self.start = start
+        self.end = end
+
+
+class JsonObjectScanner:
+    """Incremental scanner that finds top-level JSON objects in prose
+
+    Understands ``` fences, JSON strings and backslash escapes, so braces in
+    string values (e.g. n8n expressions like `{{ $json.x }}`) never create
+    bogus candidates. A complete object is decoded in one `raw_decode` call
+    and skipped; only invalid or still-arriving objects are walked token by
+    token and then decoded once. Each character is therefore visited a
+    bounded number of times, so total work is O(n) no matter how the text
+    is chunked. Only the text of the object currently open is kept in memory.
+    """
+
+    def __init__(self):
+        self._chunks: Deque[str] = deque()  # retained text from _chunks_start
+        self._chunks_start = 0
+        self._length = 0  # characters fed so far
+        self._tail = ""  # last characters of the previous chunk, for split ```
+        self._pos = 0  # next absolute offset to tokenize
+        self._skip_until = 0  # absolute offset after an escaped character
+        self._in_string = False
+        self._depth = 0
+        self._object_start = -1
+        self._fence_open_at: Optional[int] = None  # offset just after opening ```
+        self._fence_language: Optional[str] = None
+        self._object_may_be_json = False
+        # json builds error positions in O(offset); cap that work at O(n) total
+        self._failed_decode_cost = 0
+
+    def feed(self, chunk: str) -> List[JsonCandidate]:
+        """Append `chunk` and return the objects it completed, in order"""
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        window = self._tail + chunk
+        window_start = self._length - len(window)
+        found: List[JsonCandidate] = []
+        offset = self._pos - window_start
+
+        while True:
+            if self._in_string:
+                pattern = _STRING_TOKEN_RE
+            elif self._depth:
+                pattern = _OBJECT_TOKEN_RE
+            else:
+                pattern = _PROSE_TOKEN_RE
+            match = pattern.search(window, offset)
+            if match is None:
+                break
+            offset = match.end()
+            position = window_start + match.start()
+            if position < self._skip_until:
+                continue
+            token = match.group()
+
+            if self._in_string:
+                if token == "\\":
+                    self._skip_until = position + 2
+                elif token == '"':
+                    self._in_string = False
+            elif token == "```":
+                # A fence always ends whatever object was open before it
+                self._depth = 0
+                if self._fence_open_at is None:
+                    self._fence_open_at = window_start + offset
+                    self._fence_language = None
+                else:
+                    self._fence_open_at = None
+            elif self._depth:
+                if token == '"':
+                    self._in_string = True
+                elif token == "{":
+                    self._depth += 1
+                elif token == "}":
+                    self._depth -= 1
+                    if not self._depth:
+                        if self._object_may_be_json:
+                            candidate = self._decode(self._object_start, position + 1)
+                            if candidate is not None:
+                                found.append(candidate)
+            elif token == "{":
+                if self._fence_open_at is not None and self._fence_language is None:
+                    self._fence_language = self._read_fence_language(position)
+                # Prose braces like {{ $json.x }} can never be JSON: skip decoding
+                self._object_may_be_json = self._may_be_json(window, match.start())
+                self._depth = 1
+                self._object_start = position
+                if not self._object_may_be_json or not self._within_budget(
+                    match.start()
+                ):
+                    # Walk it token by token (and decode once it closes if needed)
+                    continue
+                # Fast path: decode the complete object in C and jump past it
+                try:
+                    value, end = _DECODER.raw_decode(window, match.start())
+                except (ValueError, RecursionError):
+                    # Invalid or too deeply nested JSON, or an object still arriving
+                    self._failed_decode_cost += match.start()
+                    continue
+                self._depth = 0
+                if isinstance(value, dict):
+                    found.append(
+                        JsonCandidate(
+                            value, self._current_fence(), position, window_start + end
+                        )
+                    )
+                offset = end
+
+        # A ``` token may still be arriving; re-examine at most the last two chars
+        self._pos = max(window_start + offset, self._length - 2)
+        self._tail = window[-2:]
+        self._trim()
+        return found
+
+    @property
+    def fence(self) -> Optional[str]:
+        """Language of the open fence once its first object began, else None"""
+        return self._current_fence()
+
+    def _may_be_json(self, window: str, offset: int) -> bool:
+        """Whether the object opening at `offset` can be a JSON object"""
+        opening_end = _OBJECT_OPENING_RE.match(window, offset).end()
+        # Unknown until more text arrives, so keep it as a candidate
+        return opening_end == len(window) or window[opening_end] in '"}'
+
+    def _within_budget(self, offset: int) -> bool:
+        """Whether a failed fast-path decode at `offset` keeps total work O(n)"""
+        return self._failed_decode_cost + offset <= 2 * self._length
+
+    def _text(self, start: int, end: int) -> str:
+        """Return text[start:end] from the retained chunks"""
+        if len(self._chunks) > 1:
+            self._chunks = deque(["".join(self._chunks)])
+        offset = self._chunks_start
+        return self._chunks[0][start - offset : end - offset]
+
+    def _trim(self):
+        """Drop retained text that no future object or fence tag can need"""
+        keep_from = self._length - 2
+        if self._depth:
+            keep_from = min(keep_from, self._object_start)
+        if self._fence_open_at is not None and self._fence_language is None:
+            keep_from = min(keep_from, self._fence_open_at)
+
+        while self._chunks and self._chunks_start + len(self._chunks[0]) <= keep_from:
+            self._chunks_start += len(self._chunks.popleft())
+
+    def _read_fence_language(self, limit: int) -> str:
+        """Language tag of the open fence (the text up to its first newline)"""
+        header = self._text(self._fence_open_at, limit)
+        newline_at = header.find("\n")
+        if newline_at < 0:
+            return ""
+        return header[:newline_at].strip().lower()
+
+    def _decode(self, start: int, end: int) -> Optional[JsonCandidate]:
+        """Decode the balanced region text[start:end]"""
+        region = self._text(start, end)
+        try:
+            value, decoded_end = _DECODER.raw_decode(region)
+        except (ValueError, RecursionError):
+            return None
+        if decoded_end != len(region) or not isinstance(value, dict):
+            return None
+        return JsonCandidate(value, self._current_fence(), start, end)
+
+    def _current_fence(self) -> Optional[str]:
+        """Language of the fence the scanner is inside, None outside fences"""
+        return None if self._fence_open_at is None else self._fence_language
+
+
+def is_workflow_shaped(value: Any, require_connections: bool = False) -> bool:
+    """True if `value` looks like an n8n workflow object"""
+    if not isinstance(value, dict) or not isinstance(value.get("nodes"), list):
+        return False
+    return not require_connections or "connections" in value
+
+
+def is_workflow_candidate(candidate: JsonCandidate) -> bool:
+    """True if a scanned object should be treated as a workflow block
+
+    Fenced objects only need a node list; bare objects in prose must also
+    carry connections, as in the historical extractor.
+    """
+    bare = candidate.fence is None
+    return is_workflow_shaped(candidate.value, require_connections=bare)
+
+
+def iter_json_candidates(text: str) -> Iterator[JsonCandidate]:
+    """Yield every top-level JSON object in `text`, in order
+
+    The text is scanned in slices so callers that stop early (e.g. at the
+    first ```json workflow) never scan the rest of a long response.
+    """
+    scanner = JsonObjectScanner()
+    for start in range(0, len(text), SCAN_SLICE_SIZE):
+        yield from scanner.feed(text[start : start + SCAN_SLICE_SIZE])
+
+
+def iter_workflow_candidates(text: str) -> Iterator[JsonCandidate]:
+    """Yield the workflow candidates in a complete `text`, in order
+
+    The fast path for finished answers: fences are found with `str.find`
+    and a fenced block is decoded with one `json.loads`, and text that
+    cannot hold a workflow (no `"nodes"` key) is never scanned. From the
+    first segment that is not a single fenced object, e.g. a bare workflow
+    in prose or a block that fails to parse, the scanner takes over. The
+    result matches filtering `iter_json_candidates`, except that a ``` inside
+    a JSON string outside any workflow closes the fence, as in Markdown.
+    """
+    resume_at = None
+    position = 0
+    while position < len(text):
+        open_at = text.find("```", position)
+        prose_end = len(text) if open_at < 0 else open_at
+        if text.find('"nodes"', position, prose_end) >= 0:
+            resume_at = position
+            break
+        if open_at < 0:
+            break
+
+        close_at = text.find("```", open_at + 3)
+        block_end = len(text) if close_at < 0 else close_at
+        if text.find('"nodes"', open_at, block_end) >= 0:
+            candidate = _decode_fenced_block(text, open_at + 3, block_end)
+            if candidate is None:
+                resume_at = open_at
+                break
+            if is_workflow_candidate(candidate):
+                yield candidate
+        if close_at < 0:
+            break
+        position = close_at + 3
+
+    if resume_at is not None:
+        for candidate in iter_json_candidates(text):
+            if candidate.start >= resume_at and is_workflow_candidate(candidate):
+                yield candidate
+
+
+def _decode_fenced_block(text: str, start: int, end: int) -> Optional[JsonCandidate]:
+    """The object filling the fenced block text[start:end], if it is just one"""
+    header_end = text.find("\n", start, end)
+    if header_end < 0 or text.find("{", start, header_end) >= 0:
+        return None
+    body = text[header_end + 1 : end]
+    try:
+        value = json.loads(body)
+    except (ValueError, RecursionError):
+        return None
+    if not isinstance(value, dict):
+        return None
+    body_start = header_end + 1 + len(body) - len(body.lstrip())
+    body_end = header_end + 1 + len(body.rstrip())
+    language = text[start:header_end].strip().lower()
+    return JsonCandidate(value, language, body_start, body_end)
+
+
+def select_workflow(candidates: Iterable[JsonCandidate]) -> Optional[Dict[str, Any]]:
+    """Pick the workflow a response is about
+
+    Priority matches the historical extractor: ```json blocks first, then
+    generic/javascript blocks, then bare objects with nodes and connections.
+    """
+    other_fenced = bare = None
+    for candidate in candidates:
+        if not is_workflow_candidate(candidate):
+            continue
+        elif candidate.fence is None:
+            if bare is None:
+                bare = candidate.value
+        elif candidate.fence in JSON_FENCES:
+            return candidate.value
+        elif other_fenced is None and candidate.fence in OTHER_FENCES:
+            other_fenced = candidate.value
+    return other_fenced if other_fenced is not None else bare
+
+
+def extract_workflow_json(text: str) -> Optional[Dict[str, Any]]:
+    """Extract the workflow JSON from AI response text in one linear pass"""
+    return select_workflow(iter_workflow_candidates(text))
+
+
+def extract_all_workflow_jsons(text: str) -> List[Dict[str, Any]]:
+    """Extract every workflow-shaped object in the response, in order"""
+    return [candidate.value for candidate in iter_workflow_candidates(text)]
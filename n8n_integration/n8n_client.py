@@ -3,11 +3,23 @@ BuildMap n8n Client - Handles all communication with n8n API
 """
 
 import os
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple, Union
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from n8n_integration.tracing import traced, tracer
+from n8n_integration.workflow_graph import WorkflowGraph
+from n8n_integration.workflow_merge import MergeResult, merge_workflows
+from n8n_integration.workflow_validator import (
+    ValidationReport,
+    api_payload,
+    get_validator,
+)
 
 # Load environment variables
 load_dotenv()
@@ -16,17 +28,144 @@ load_dotenv()
 N8N_BASE_URL = os.environ.get("N8N_BASE_URL", "http://localhost:5678")
 N8N_API_KEY = os.environ.get("N8N_API_KEY", "")
 
+# Connection pool configuration
+N8N_POOL_CONNECTIONS = int(os.environ.get("N8N_POOL_CONNECTIONS", "4"))
+N8N_POOL_MAXSIZE = int(os.environ.get("N8N_POOL_MAXSIZE", "10"))
+N8N_MAX_RETRIES = int(os.environ.get("N8N_MAX_RETRIES", "2"))
+N8N_KEEP_ALIVE = os.environ.get("N8N_KEEP_ALIVE", "true").lower() != "false"
+
+# Upper bound on how much of a health-probe response body is ever read
+N8N_PROBE_MAX_BYTES = int(os.environ.get("N8N_PROBE_MAX_BYTES", "4096"))
+
 
 class N8NClient:
     """Client for interacting with n8n REST API"""
 
-    def __init__(self, base_url: str = None, api_key: str = None):
+    def __init__(
+        self,
+        base_url: str = None,
+        api_key: str = None,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        max_retries: int = None,
+        keep_alive: bool = None,
+    ):
         """Initialize n8n client with optional custom configuration"""
         self.base_url = (base_url or N8N_BASE_URL).rstrip("/")  # Remove trailing slash
         self.api_key = api_key or N8N_API_KEY
+        self.pool_connections = pool_connections or N8N_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or N8N_POOL_MAXSIZE
+        self.max_retries = N8N_MAX_RETRIES if max_retries is None else max_retries
+        self.keep_alive = N8N_KEEP_ALIVE if keep_alive is None else keep_alive
+        self._session: Optional[requests.Session] = None
+        self._probe_session: Optional[requests.Session] = None
+        # Optional NodeTypeCatalog; when it holds the instance's node types,
+        # check_workflow() also verifies each node's type and typeVersion
+        self.node_types = None
+
+    @property
+    def session(self) -> requests.Session:
+        """Persistent HTTP session shared by every request of this client
+
+        The session keeps TCP/TLS connections alive between calls, so the
+        requests of successive phases reuse one connection instead of each
+        paying for a handshake.
+        """
+        if self._session is None:
+            self._session = self._build_session()
+        return self._session
+
+    @property
+    def probe_session(self) -> requests.Session:
+        """Kept-alive session for connection probes, without transport retries
 
-    def test_connection(self) -> Dict[str, Any]:
-        """Test connection to n8n instance with detailed error reporting"""
+        A probe has to answer within its own timeout; retrying a down or
+        slow server would multiply that and delay the reported status.
+        """
+        if self._probe_session is None:
+            self._probe_session = self._build_session(retries=False)
+        return self._probe_session
+
+    def _build_session(self, retries: bool = True) -> requests.Session:
+        """Create a session with a pooled transport, retrying unless `retries` is off"""
+        # Retry connection failures and gateway errors at the transport level.
+        # POST is excluded from status retries so a workflow is never created twice.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "PUT", "DELETE"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry if retries else Retry(0, read=False),
+        )
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(
+            {
+                "X-N8N-API-KEY": self.api_key,
+                "Content-Type": "application/json",
+                "Connection": "keep-alive" if self.keep_alive else "close",
+            }
+        )
+        return session
+
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Return connection pool counters (hits reuse a kept-alive connection)
+
+        The counters come from urllib3's connection pools, which requests
+        does not expose publicly; adapters or pools without them are skipped.
+        """
+        stats = {"requests": 0, "pool_hits": 0, "pool_misses": 0, "pools": 0}
+        sessions = [s for s in (self._session, self._probe_session) if s is not None]
+
+        seen = set()
+        adapters = [a for session in sessions for a in session.adapters.values()]
+        for adapter in adapters:
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                requests_made = getattr(pool, "num_requests", None)
+                connections = getattr(pool, "num_connections", None)
+                if requests_made is None or connections is None:
+                    continue
+                stats["pools"] += 1
+                stats["requests"] += requests_made
+                stats["pool_misses"] += connections
+
+        stats["pool_hits"] = max(stats["requests"] - stats["pool_misses"], 0)
+        return stats
+
+    def close(self):
+        """Close the pooled session and release its connections"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._probe_session is not None:
+            self._probe_session.close()
+            self._probe_session = None
+
+    def test_connection(self, lightweight: bool = True) -> Dict[str, Any]:
+        """Test connection to n8n instance with detailed error reporting
+
+        The default lightweight probe requests a single workflow and reads at
+        most N8N_PROBE_MAX_BYTES of the body, so its cost does not depend on how
+        many workflows the instance holds. `lightweight=False` downloads the
+        full workflow list. The probe round-trip time is reported as `latency_ms`.
+        """
         if not self.api_key or not self.base_url:
             return {
                 "connected": False,
@@ -35,48 +174,32 @@ class N8NClient:
             }
 
         try:
-            headers = {
-                "X-N8N-API-KEY": self.api_key,
-                "Content-Type": "application/json",
-            }
-
             # Test the workflows endpoint first (more reliable across n8n versions)
             workflows_url = f"{self.base_url}/api/v1/workflows"
-            response = requests.get(
-                workflows_url, headers=headers, timeout=10, verify=True
-            )
-
-            if response.status_code == 200:
-                return {
-                    "connected": True,
-                    "base_url": self.base_url,
-                    "message": "Successfully connected to n8n REST API",
-                    "endpoint": "workflows",
-                }
-            elif response.status_code == 401:
-                return {
-                    "connected": False,
-                    "error": "Authentication failed",
-                    "details": "Check your N8N_API_KEY - it may be invalid or expired",
-                    "status_code": 401,
-                    "suggestion": "Create a new API key in n8n UI (Settings → API)",
-                }
-            elif response.status_code == 404:
-                return {
-                    "connected": False,
-                    "error": "API endpoint not found",
-                    "details": f"Tried to access {workflows_url} - endpoint may not be exposed",
-                    "status_code": 404,
-                    "suggestion": "Check if REST API is enabled in n8n configuration",
-                }
+            started = time.perf_counter()
+
+            if lightweight:
+                response = self.probe_session.get(
+                    workflows_url,
+                    params={"limit": 1},
+                    timeout=10,
+                    verify=True,
+                    stream=True,
+                )
+                body = self._read_bounded(response, N8N_PROBE_MAX_BYTES)
             else:
-                return {
-                    "connected": False,
-                    "error": f"API error: {response.status_code}",
-                    "details": response.text[:200],
-                    "status_code": response.status_code,
-                    "suggestion": "Check n8n logs for more details",
-                }
+                response = self.probe_session.get(
+                    workflows_url, timeout=10, verify=True
+                )
+                body = response.content
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            result = self._connection_result(
+                response, workflows_url, body[:200].decode("utf-8", "replace")
+            )
+            result["probe"] = "lightweight" if lightweight else "full"
+            result["latency_ms"] = round(latency_ms, 1)
+            return result
 
         except requests.exceptions.SSLError as e:
             return {
@@ -107,149 +230,72 @@ class N8NClient:
                 "suggestion": "Check n8n_client.py implementation",
             }
 
-    def validate_workflow_json(self, workflow_json: Dict[str, Any]) -> Tuple[bool, str]:
-        """Validate workflow JSON before sending to n8n"""
-        required_fields = ["name", "nodes"]  # connections may be optional
-
-        # Check required fields with more detailed error messages
-        for field in required_fields:
-            if field not in workflow_json:
-                return (
-                    False,
-                    f"Missing required field: '{field}'. Workflow JSON must contain: {required_fields}",
-                )
-            if field == "name" and (
-                not workflow_json["name"] or not str(workflow_json["name"]).strip()
-            ):
-                return (
-                    False,
-                    "Workflow name is empty or invalid. Please provide a valid workflow name.",
-                )
+    @traced("n8n.validate_workflow")
+    def check_workflow(self, workflow_json: Dict[str, Any]) -> ValidationReport:
+        """Report every structural and referential error; never mutates"""
+        catalog = self.node_types
+        report = get_validator().validate(
+            workflow_json,
+            node_types=(
+                catalog if catalog is not None and catalog.authoritative else None
+            ),
+        )
+        tracer.current_span().set(errors=len(report.errors))
+        return report
+
+    def check_phase(self, new_phase: Dict[str, Any]) -> ValidationReport:
+        """Structural errors of a phase before it is merged; never mutates
+
+        References and node types are checked on the merged workflow.
+        """
+        return get_validator().validate(new_phase, phase=True)
 
-        if not workflow_json["nodes"] or len(workflow_json["nodes"]) == 0:
-            return (
-                False,
-                f"Workflow must have at least one node. Current nodes: {workflow_json.get('nodes', [])}",
-            )
+    def validate_workflow_json(self, workflow_json: Dict[str, Any]) -> Tuple[bool, str]:
+        """Validate workflow JSON and clean it up in place for the API
 
-        # Check node structure
-        for node in workflow_json["nodes"]:
-            if "name" not in node or "type" not in node:
-                return False, f"Node missing required fields (name/type): {node}"
-
-        # Remove read-only fields that cause issues in some n8n versions
-        # These fields cannot be set when creating/updating workflows via API
-        read_only_fields = [
-            "active",
-            "tags",
-            "version",
-            "createdAt",
-            "updatedAt",
-            "id",
-            "versionId",
-        ]
-        for field in read_only_fields:
-            if field in workflow_json:
-                del workflow_json[field]
-
-        # Ensure settings field exists (required by some n8n versions)
-        if "settings" not in workflow_json:
-            workflow_json["settings"] = {}
-
-        # Ensure connections field exists
-        if "connections" not in workflow_json:
-            workflow_json["connections"] = {}
+        Kept for existing callers: on success, read-only fields are removed
+        and `settings`/`connections` are added. Writes use `check_workflow()`
+        and `api_payload()`, which leave the workflow untouched.
+        """
+        report = self.check_workflow(workflow_json)
+        if not report.valid:
+            return False, report.summary()
 
+        payload = api_payload(workflow_json)
+        workflow_json.clear()
+        workflow_json.update(payload)
         return True, "Valid workflow"
 
+    def _invalid_result(self, report: ValidationReport) -> Dict[str, Any]:
+        """Result dict for a write refused before any request was made"""
+        return {
+            "success": False,
+            "error": f"Invalid workflow: {report.errors[0]}",
+            "details": report.summary(),
+            "validation_errors": [str(issue) for issue in report.errors],
+            "suggestion": "Check workflow JSON structure",
+        }
+
+    @traced("n8n.create_workflow")
     def create_workflow(self, workflow_json: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new workflow in n8n with enhanced error handling"""
-        # Validate connection
-        connection_test = self.test_connection()
-        if not connection_test["connected"]:
-            return {
-                "success": False,
-                "error": f"Cannot connect to n8n: {connection_test.get('error', 'Unknown error')}",
-                "details": connection_test.get("details", ""),
-                "suggestion": connection_test.get(
-                    "suggestion", "Check connection settings"
-                ),
-            }
-
-        # Validate workflow JSON
-        is_valid, validation_msg = self.validate_workflow_json(workflow_json)
-        if not is_valid:
-            return {
-                "success": False,
-                "error": f"Invalid workflow: {validation_msg}",
-                "suggestion": "Check workflow JSON structure",
-            }
+        # Validate first: a workflow known to be invalid costs no round trip.
+        # There is no connection probe; the write itself reports an
+        # unreachable server, and the health monitor tracks status.
+        report = self.check_workflow(workflow_json)
+        if not report.valid:
+            return self._invalid_result(report)
 
         try:
-            headers = {
-                "X-N8N-API-KEY": self.api_key,
-                "Content-Type": "application/json",
-            }
-
             workflow_url = f"{self.base_url}/api/v1/workflows"
-            response = requests.post(
+            response = self.session.post(
                 workflow_url,
-                headers=headers,
-                json=workflow_json,
+                json=api_payload(workflow_json),
                 timeout=15,
                 verify=True,
             )
 
-            # Handle various response scenarios
-            if response.status_code == 200:
-                workflow = response.json()
-                return {
-                    "success": True,
-                    "id": workflow["id"],
-                    "name": workflow["name"],
-                    "url": self.get_workflow_url(workflow["id"]),
-                    "message": "Workflow created successfully",
-                }
-            elif response.status_code == 401:
-                return {
-                    "success": False,
-                    "error": "Authentication failed",
-                    "details": "Check N8N_API_KEY - it may be invalid or expired",
-                    "status_code": 401,
-                    "suggestion": "Create a new API key in n8n UI (Settings → API)",
-                }
-            elif response.status_code == 403:
-                return {
-                    "success": False,
-                    "error": "Access denied",
-                    "details": "API key may not have sufficient permissions",
-                    "status_code": 403,
-                    "suggestion": "Check API key permissions in n8n",
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "API endpoint not found",
-                    "details": f"Endpoint {workflow_url} not found",
-                    "status_code": 404,
-                    "suggestion": "Check N8N_BASE_URL and API endpoint configuration",
-                }
-            elif response.status_code == 400:
-                return {
-                    "success": False,
-                    "error": "Bad request",
-                    "details": f"Invalid workflow data: {response.text[:200]}",
-                    "status_code": 400,
-                    "suggestion": "Validate workflow JSON structure",
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"n8n API error {response.status_code}",
-                    "details": response.text[:200],
-                    "status_code": response.status_code,
-                    "suggestion": "Check n8n logs for more details",
-                }
+            return self._create_result(response, workflow_url)
 
         except requests.exceptions.SSLError as e:
             return {
@@ -280,6 +326,7 @@ class N8NClient:
                 "suggestion": "Check n8n_client.py implementation",
             }
 
+    @traced("n8n.update_workflow")
     def update_workflow(
         self, workflow_id: str, workflow_json: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -288,108 +335,23 @@ class N8NClient:
         Note: n8n API uses PUT for workflow updates, not PATCH.
         This requires sending the complete workflow object.
         """
-        # Validate connection
-        connection_test = self.test_connection()
-        if not connection_test["connected"]:
-            return {
-                "success": False,
-                "error": f"Cannot connect to n8n: {connection_test.get('error', 'Unknown error')}",
-                "details": connection_test.get("details", ""),
-                "suggestion": connection_test.get(
-                    "suggestion", "Check connection settings"
-                ),
-            }
-
-        # Validate workflow JSON
-        is_valid, validation_msg = self.validate_workflow_json(workflow_json)
-        if not is_valid:
-            return {
-                "success": False,
-                "error": f"Invalid workflow: {validation_msg}",
-                "suggestion": "Check workflow JSON structure",
-            }
+        # Validate first: a workflow known to be invalid costs no round trip.
+        # There is no connection probe; the write itself reports an
+        # unreachable server, and the health monitor tracks status.
+        report = self.check_workflow(workflow_json)
+        if not report.valid:
+            return self._invalid_result(report)
 
         try:
-            headers = {
-                "X-N8N-API-KEY": self.api_key,
-                "Content-Type": "application/json",
-            }
-
             # n8n API uses PUT for workflow updates (full replacement)
-            response = requests.put(
+            response = self.session.put(
                 f"{self.base_url}/api/v1/workflows/{workflow_id}",
-                headers=headers,
-                json=workflow_json,
+                json=api_payload(workflow_json),
                 timeout=15,
                 verify=True,
             )
 
-            # Handle various response scenarios
-            if response.status_code == 200:
-                workflow = response.json()
-                return {
-                    "success": True,
-                    "id": workflow["id"],
-                    "name": workflow["name"],
-                    "url": self.get_workflow_url(workflow["id"]),
-                    "message": "Workflow updated successfully",
-                }
-            elif response.status_code == 401:
-                return {
-                    "success": False,
-                    "error": "Authentication failed",
-                    "details": "Check N8N_API_KEY - it may be invalid or expired",
-                    "status_code": 401,
-                    "suggestion": "Create a new API key in n8n UI (Settings → API)",
-                }
-            elif response.status_code == 403:
-                return {
-                    "success": False,
-                    "error": "Access denied",
-                    "details": "API key may not have sufficient permissions",
-                    "status_code": 403,
-                    "suggestion": "Check API key permissions in n8n",
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": f"Workflow {workflow_id} not found",
-                    "details": "The workflow may have been deleted or the ID is incorrect",
-                    "status_code": 404,
-                    "suggestion": "Verify workflow ID exists in n8n",
-                }
-            elif response.status_code == 405:
-                return {
-                    "success": False,
-                    "error": "Method not allowed",
-                    "details": "This error occurred because PATCH was attempted on an endpoint that requires PUT",
-                    "status_code": 405,
-                    "suggestion": "This should not happen with current implementation - check n8n_client.py",
-                }
-            elif response.status_code == 400:
-                return {
-                    "success": False,
-                    "error": "Bad request",
-                    "details": f"Invalid workflow data: {response.text[:200]}",
-                    "status_code": 400,
-                    "suggestion": "Validate workflow JSON structure and ensure all required fields are present",
-                }
-            elif response.status_code == 409:
-                return {
-                    "success": False,
-                    "error": "Conflict",
-                    "details": f"Node ID or name conflict: {response.text[:200]}",
-                    "status_code": 409,
-                    "suggestion": "Check for duplicate node IDs or names in merged workflow",
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"n8n API error {response.status_code}",
-                    "details": response.text[:200],
-                    "status_code": response.status_code,
-                    "suggestion": "Check n8n logs for more details",
-                }
+            return self._update_result(response, workflow_id)
 
         except requests.exceptions.SSLError as e:
             return {
@@ -420,55 +382,17 @@ class N8NClient:
                 "suggestion": "Check n8n_client.py implementation",
             }
 
+    @traced("n8n.get_workflow")
     def get_workflow(self, workflow_id: str) -> Dict[str, Any]:
         """Get workflow details from n8n with enhanced error handling"""
         try:
-            headers = {
-                "X-N8N-API-KEY": self.api_key,
-                "Content-Type": "application/json",
-            }
-
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v1/workflows/{workflow_id}",
-                headers=headers,
                 timeout=10,
                 verify=True,
             )
 
-            if response.status_code == 200:
-                return {"success": True, "workflow": response.json()}
-            elif response.status_code == 401:
-                return {
-                    "success": False,
-                    "error": "Authentication failed",
-                    "details": "Check N8N_API_KEY - it may be invalid or expired",
-                    "status_code": 401,
-                    "suggestion": "Create a new API key in n8n UI (Settings → API)",
-                }
-            elif response.status_code == 403:
-                return {
-                    "success": False,
-                    "error": "Access denied",
-                    "details": "API key may not have sufficient permissions to view this workflow",
-                    "status_code": 403,
-                    "suggestion": "Check API key permissions in n8n",
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "Workflow not found",
-                    "details": f"Workflow {workflow_id} does not exist or has been deleted",
-                    "status_code": 404,
-                    "suggestion": "Verify workflow ID is correct",
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"n8n API error {response.status_code}",
-                    "details": response.text[:200],
-                    "status_code": response.status_code,
-                    "suggestion": "Check n8n logs for more details",
-                }
+            return self._get_result(response, workflow_id)
 
         except requests.exceptions.SSLError as e:
             return {
@@ -499,37 +423,299 @@ class N8NClient:
                 "suggestion": "Check n8n_client.py implementation",
             }
 
+    @traced("n8n.get_node_types")
+    def get_node_types(self) -> Dict[str, Any]:
+        """Fetch the node type descriptions the instance's editor uses
+
+        n8n serves them as a static file next to the editor, so no API key
+        is needed. The file is large (several MB); callers should cache it.
+        """
+        types_url = f"{self._editor_base_url()}/types/nodes.json"
+        try:
+            response = self.session.get(types_url, timeout=30, verify=True)
+            if response.status_code != 200:
+                return {
+                    "success": False,
+                    "error": f"n8n node types unavailable ({response.status_code})",
+                    "details": f"GET {types_url} returned {response.status_code}",
+                    "status_code": response.status_code,
+                    "suggestion": "Check N8N_BASE_URL points at the n8n editor",
+                }
+            node_types = response.json()
+            if not isinstance(node_types, list):
+                return {
+                    "success": False,
+                    "error": "Unexpected node types format",
+                    "details": f"{types_url} did not return a list",
+                    "suggestion": "Check the n8n version",
+                }
+            return {"success": True, "node_types": node_types}
+
+        except requests.exceptions.Timeout:
+            return {
+                "success": False,
+                "error": "Connection timeout",
+                "details": "Server did not respond within 30 seconds",
+                "suggestion": "Check if n8n server is running and accessible",
+            }
+        except requests.exceptions.ConnectionError as e:
+            return {
+                "success": False,
+                "error": "Connection error",
+                "details": f"Could not connect to server: {str(e)}",
+                "suggestion": "Check network connectivity and server URL",
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": "Unexpected error",
+                "details": f"{type(e).__name__}: {str(e)}",
+                "suggestion": "Check n8n_client.py implementation",
+            }
+
+    def _read_bounded(self, response: requests.Response, max_bytes: int) -> bytes:
+        """Read at most `max_bytes` of a streamed body, then release the response
+
+        A body that fits is drained completely so the connection goes back to
+        the pool; anything larger is cut off and its connection discarded.
+        """
+        try:
+            body = response.raw.read(max_bytes + 1, decode_content=True) or b""
+            if len(body) <= max_bytes:
+                response.raw.release_conn()
+        finally:
+            response.close()
+        return body[:max_bytes]
+
+    def _connection_result(
+        self, response: Any, workflows_url: str, body_text: str = None
+    ) -> Dict[str, Any]:
+        """Interpret the response of a connection probe
+
+        `body_text` replaces `response.text` for probes that only read part of
+        the body.
+        """
+        if response.status_code == 200:
+            return {
+                "connected": True,
+                "base_url": self.base_url,
+                "message": "Successfully connected to n8n REST API",
+                "endpoint": "workflows",
+            }
+        elif response.status_code == 401:
+            return {
+                "connected": False,
+                "error": "Authentication failed",
+                "details": "Check your N8N_API_KEY - it may be invalid or expired",
+                "status_code": 401,
+                "suggestion": "Create a new API key in n8n UI (Settings → API)",
+            }
+        elif response.status_code == 404:
+            return {
+                "connected": False,
+                "error": "API endpoint not found",
+                "details": f"Tried to access {workflows_url} - endpoint may not be exposed",
+                "status_code": 404,
+                "suggestion": "Check if REST API is enabled in n8n configuration",
+            }
+        else:
+            return {
+                "connected": False,
+                "error": f"API error: {response.status_code}",
+                "details": (
+                    response.text[:200] if body_text is None else body_text[:200]
+                ),
+                "status_code": response.status_code,
+                "suggestion": "Check n8n logs for more details",
+            }
+
+    def _create_result(self, response: Any, workflow_url: str) -> Dict[str, Any]:
+        """Interpret the response of a workflow create call"""
+        if response.status_code == 200:
+            workflow = response.json()
+            return {
+                "success": True,
+                "id": workflow["id"],
+                "name": workflow["name"],
+                "url": self.get_workflow_url(workflow["id"]),
+                "message": "Workflow created successfully",
+                "workflow": workflow,
+            }
+        elif response.status_code == 401:
+            return {
+                "success": False,
+                "error": "Authentication failed",
+                "details": "Check N8N_API_KEY - it may be invalid or expired",
+                "status_code": 401,
+                "suggestion": "Create a new API key in n8n UI (Settings → API)",
+            }
+        elif response.status_code == 403:
+            return {
+                "success": False,
+                "error": "Access denied",
+                "details": "API key may not have sufficient permissions",
+                "status_code": 403,
+                "suggestion": "Check API key permissions in n8n",
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": "API endpoint not found",
+                "details": f"Endpoint {workflow_url} not found",
+                "status_code": 404,
+                "suggestion": "Check N8N_BASE_URL and API endpoint configuration",
+            }
+        elif response.status_code == 400:
+            return {
+                "success": False,
+                "error": "Bad request",
+                "details": f"Invalid workflow data: {response.text[:200]}",
+                "status_code": 400,
+                "suggestion": "Validate workflow JSON structure",
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"n8n API error {response.status_code}",
+                "details": response.text[:200],
+                "status_code": response.status_code,
+                "suggestion": "Check n8n logs for more details",
+            }
+
+    def _update_result(self, response: Any, workflow_id: str) -> Dict[str, Any]:
+        """Interpret the response of a workflow update call"""
+        if response.status_code == 200:
+            workflow = response.json()
+            return {
+                "success": True,
+                "id": workflow["id"],
+                "name": workflow["name"],
+                "url": self.get_workflow_url(workflow["id"]),
+                "message": "Workflow updated successfully",
+                "workflow": workflow,
+            }
+        elif response.status_code == 401:
+            return {
+                "success": False,
+                "error": "Authentication failed",
+                "details": "Check N8N_API_KEY - it may be invalid or expired",
+                "status_code": 401,
+                "suggestion": "Create a new API key in n8n UI (Settings → API)",
+            }
+        elif response.status_code == 403:
+            return {
+                "success": False,
+                "error": "Access denied",
+                "details": "API key may not have sufficient permissions",
+                "status_code": 403,
+                "suggestion": "Check API key permissions in n8n",
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": f"Workflow {workflow_id} not found",
+                "details": "The workflow may have been deleted or the ID is incorrect",
+                "status_code": 404,
+                "suggestion": "Verify workflow ID exists in n8n",
+            }
+        elif response.status_code == 405:
+            return {
+                "success": False,
+                "error": "Method not allowed",
+                "details": "This error occurred because PATCH was attempted on an endpoint that requires PUT",
+                "status_code": 405,
+                "suggestion": "This should not happen with current implementation - check n8n_client.py",
+            }
+        elif response.status_code == 400:
+            return {
+                "success": False,
+                "error": "Bad request",
+                "details": f"Invalid workflow data: {response.text[:200]}",
+                "status_code": 400,
+                "suggestion": "Validate workflow JSON structure and ensure all required fields are present",
+            }
+        elif response.status_code == 409:
+            return {
+                "success": False,
+                "error": "Conflict",
+                "details": f"Node ID or name conflict: {response.text[:200]}",
+                "status_code": 409,
+                "suggestion": "Check for duplicate node IDs or names in merged workflow",
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"n8n API error {response.status_code}",
+                "details": response.text[:200],
+                "status_code": response.status_code,
+                "suggestion": "Check n8n logs for more details",
+            }
+
+    def _get_result(self, response: Any, workflow_id: str) -> Dict[str, Any]:
+        """Interpret the response of a workflow fetch call"""
+        if response.status_code == 200:
+            return {"success": True, "workflow": response.json()}
+        elif response.status_code == 401:
+            return {
+                "success": False,
+                "error": "Authentication failed",
+                "details": "Check N8N_API_KEY - it may be invalid or expired",
+                "status_code": 401,
+                "suggestion": "Create a new API key in n8n UI (Settings → API)",
+            }
+        elif response.status_code == 403:
+            return {
+                "success": False,
+                "error": "Access denied",
+                "details": "API key may not have sufficient permissions to view this workflow",
+                "status_code": 403,
+                "suggestion": "Check API key permissions in n8n",
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": "Workflow not found",
+                "details": f"Workflow {workflow_id} does not exist or has been deleted",
+                "status_code": 404,
+                "suggestion": "Verify workflow ID is correct",
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"n8n API error {response.status_code}",
+                "details": response.text[:200],
+                "status_code": response.status_code,
+                "suggestion": "Check n8n logs for more details",
+            }
+
     def get_workflow_url(self, workflow_id: str) -> str:
         """Generate proper URL for workflow"""
         # For workflow URLs, we need the full editor URL, not the API URL
-        editor_base_url = self.base_url.replace("/api/v1", "").replace("/rest", "")
-        return f"{editor_base_url.rstrip('/')}/workflow/{workflow_id}"
+        return f"{self._editor_base_url()}/workflow/{workflow_id}"
+
+    def _editor_base_url(self) -> str:
+        return self.base_url.replace("/api/v1", "").replace("/rest", "").rstrip("/")
 
     def merge_workflows(
         self, existing_workflow: Dict[str, Any], new_phase: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Merge new phase into existing workflow"""
-        merged = existing_workflow.copy()
-
-        # Merge nodes (avoid duplicates by name)
-        existing_node_names = {
-            node.get("name", "") for node in existing_workflow.get("nodes", [])
-        }
-        new_nodes = [
-            node
-            for node in new_phase.get("nodes", [])
-            if node.get("name", "") not in existing_node_names
-        ]
-
-        merged["nodes"] = existing_workflow.get("nodes", []) + new_nodes
-
-        # Merge connections
-        merged["connections"] = {
-            **existing_workflow.get("connections", {}),
-            **new_phase.get("connections", {}),
-        }
-
-        return merged
+        return self.merge_workflows_with_summary(existing_workflow, new_phase).workflow
+
+    @traced("n8n.merge_workflows")
+    def merge_workflows_with_summary(
+        self,
+        existing_workflow: Union[Dict[str, Any], WorkflowGraph],
+        new_phase: Dict[str, Any],
+    ) -> MergeResult:
+        """Merge new phase into existing workflow and report what changed
+
+        Connections are merged per source node, output type and output
+        index; see `workflow_merge.merge_workflows`.
+        """
+        result = merge_workflows(existing_workflow, new_phase)
+        tracer.current_span().set(**result.summary._asdict())
+        return result
 
 
 # Singleton client instance
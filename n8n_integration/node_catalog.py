@@ -0,0 +1,242 @@
+"""
+BuildMap Node Catalog - Cached list of the node types the n8n instance provides
+"""
+
+import json
+import numbers
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from n8n_integration.n8n_client import N8NClient, n8n_client
+from n8n_integration.node_types_snapshot import BUNDLED_NODE_TYPES
+
+N8N_NODE_CATALOG_FILE = Path(
+    os.environ.get(
+        "N8N_NODE_CATALOG_FILE",
+        Path(__file__).parent.parent / ".cache" / "n8n_node_types.json",
+    )
+)
+# Seconds before the catalog is refreshed from the instance
+N8N_NODE_CATALOG_TTL = float(os.environ.get("N8N_NODE_CATALOG_TTL", "86400"))
+# Seconds between refresh attempts while the instance is unreachable
+N8N_NODE_CATALOG_RETRY = float(os.environ.get("N8N_NODE_CATALOG_RETRY", "300"))
+
+# Node types listed in the system prompt when the instance has them
+PROMPT_NODE_TYPES = tuple(description["name"] for description in BUNDLED_NODE_TYPES)
+
+
+class NodeType(NamedTuple):
+    name: str
+    display_name: str
+    versions: Tuple[float, ...]  # ascending
+
+    @property
+    def latest(self) -> float:
+        return self.versions[-1]
+
+
+def parse_node_types(descriptions: List[Dict[str, Any]]) -> Dict[str, NodeType]:
+    """Index n8n node descriptions by type name
+
+    A versioned node appears once per description; its versions are merged.
+    """
+    versions: Dict[str, set] = {}
+    display_names: Dict[str, str] = {}
+    for description in descriptions:
+        if not isinstance(description, dict) or not description.get("name"):
+            continue
+        name = description["name"]
+        version = description.get("version", 1)
+        for value in version if isinstance(version, list) else [version]:
+            if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                versions.setdefault(name, set()).add(value)
+        display_names.setdefault(name, description.get("displayName") or name)
+    return {
+        name: NodeType(name, display_names[name], tuple(sorted(type_versions)))
+        for name, type_versions in versions.items()
+    }
+
+
+class NodeTypeCatalog:
+    """Node types and versions of the connected instance, looked up in O(1)
+
+    Loaded on first use from the on-disk cache, or from the bundled
+    snapshot when there is none. The instance's `/types/nodes.json` is
+    fetched on a background thread whenever the loaded data is older than
+    the TTL, so lookups and prompts never wait on the network. Only
+    instance data (fresh or cached) is `authoritative` enough to validate
+    workflows against; the snapshot is incomplete.
+    """
+
+    def __init__(self, client: N8NClient = None, path: Path = None, ttl: float = None):
+        self.client = client or n8n_client
+        self.path = Path(path or N8N_NODE_CATALOG_FILE)
+        self.ttl = N8N_NODE_CATALOG_TTL if ttl is None else ttl
+        self._types: Dict[str, NodeType] = {}
+        self._source: Optional[str] = None
+        self.fetched_at = 0.0
+        self._prompt_section = ""
+        self._loaded = False
+        self._refreshing = False
+        self._last_attempt = 0.0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def source(self) -> str:
+        """Where the catalog came from: instance, cache or snapshot"""
+        self._ensure_loaded()
+        return self._source
+
+    @property
+    def authoritative(self) -> bool:
+        return self.source in ("instance", "cache")
+
+    def get(self, name: str) -> Optional[NodeType]:
+        """The node type called `name`, or None if the instance lacks it"""
+        self._ensure_loaded()
+        return self._types.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._types)
+
+    def prompt_section(self) -> str:
+        """System prompt text listing common node types and latest versions"""
+        self._ensure_loaded()
+        return self._prompt_section
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if not self._load_cache():
+                        self._install(
+                            parse_node_types(BUNDLED_NODE_TYPES), "snapshot", 0.0
+                        )
+                    self._loaded = True
+        if time.time() - self.fetched_at > self.ttl:
+            self.refresh_in_background()
+
+    def _load_cache(self) -> bool:
+        """Install the on-disk catalog if it belongs to this instance"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("base_url") != self.client.base_url:
+                return False
+            types = {
+                name: NodeType(name, display_name, tuple(versions))
+                for name, (display_name, versions) in data["types"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self._install(types, "cache", float(data.get("fetched_at", 0.0)))
+        return True
+
+    def _install(self, types: Dict[str, NodeType], source: str, fetched_at: float):
+        # One reference swap; readers see either the old or the new catalog
+        self._types = types
+        self._source = source
+        self.fetched_at = fetched_at
+        self._prompt_section = self._build_prompt_section()
+
+    def _build_prompt_section(self) -> str:
+        lines = []
+        for name in PROMPT_NODE_TYPES:
+            node_type = self._types.get(name)
+            if node_type is not None:
+                lines.append(
+                    f"- {name} ({node_type.display_name}): "
+                    f"typeVersion {node_type.latest:g}"
+                )
+        if not lines:
+            return ""
+        if self._source == "snapshot":
+            heading = (
+                "## Common n8n node types\n"
+                "The n8n instance could not be reached; versions may differ."
+            )
+        else:
+            heading = (
+                "## Node types on the connected n8n instance\n"
+                "Use these `type` values with the latest `typeVersion` shown."
+            )
+        return "\n\n" + heading + "\n" + "\n".join(lines)
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fetch the node types from the instance now and cache them on disk"""
+        self._last_attempt = time.time()
+        result = self.client.get_node_types()
+        if not result["success"]:
+            self.last_error = result.get("error")
+            return result
+
+        types = parse_node_types(result["node_types"])
+        if not types:
+            self.last_error = "Instance returned no node types"
+            return {"success": False, "error": self.last_error}
+        fetched_at = time.time()
+        with self._lock:
+            self._install(types, "instance", fetched_at)
+            self._loaded = True
+        self.last_error = None
+        self._save_cache(types, fetched_at)
+        return {"success": True, "count": len(types)}
+
+    def _save_cache(self, types: Dict[str, NodeType], fetched_at: float):
+        data = {
+            "base_url": self.client.base_url,
+            "fetched_at": fetched_at,
+            "types": {
+                name: [node_type.display_name, list(node_type.versions)]
+                for name, node_type in types.items()
+            },
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except OSError:
+            # The in-memory catalog is still current; the next run refetches
+            pass
+
+    def refresh_in_background(self):
+        """Start one background refresh unless one is running or just failed"""
+        with self._lock:
+            if (
+                self._refreshing
+                or time.time() - self._last_attempt < N8N_NODE_CATALOG_RETRY
+            ):
+                return
+            self._refreshing = True
+            self._last_attempt = time.time()
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="node-catalog-refresh", daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {
+            "source": self._source,
+            "types": len(self._types),
+            "age": time.time() - self.fetched_at if self.fetched_at else None,
+            "error": self.last_error,
+        }
+
+
+# Singleton catalog for the configured n8n instance
+node_catalog = NodeTypeCatalog()
@@ -0,0 +1,125 @@
+"""
+BuildMap Node Types Snapshot - Bundled fallback for the node-type catalog
+
+Common core node types and their type versions as shipped with n8n 1.x,
+in the shape of n8n's `/types/nodes.json`. Used only when neither the
+instance nor the on-disk cache is available; it is not a complete list,
+so workflows are not validated against it.
+"""
+
+BUNDLED_NODE_TYPES = [
+    {
+        "name": "n8n-nodes-base.manualTrigger",
+        "displayName": "Manual Trigger",
+        "version": 1,
+    },
+    {
+        "name": "n8n-nodes-base.scheduleTrigger",
+        "displayName": "Schedule Trigger",
+        "version": [1, 1.1, 1.2],
+    },
+    {
+        "name": "n8n-nodes-base.webhook",
+        "displayName": "Webhook",
+        "version": [1, 1.1, 2],
+    },
+    {
+        "name": "n8n-nodes-base.respondToWebhook",
+        "displayName": "Respond to Webhook",
+        "version": [1, 1.1],
+    },
+    {
+        "name": "n8n-nodes-base.formTrigger",
+        "displayName": "n8n Form Trigger",
+        "version": [1, 2, 2.1],
+    },
+    {
+        "name": "n8n-nodes-base.httpRequest",
+        "displayName": "HTTP Request",
+        "version": [1, 2, 3, 4, 4.1, 4.2],
+    },
+    {
+        "name": "n8n-nodes-base.set",
+        "displayName": "Edit Fields (Set)",
+        "version": [1, 2, 3, 3.1, 3.2, 3.3, 3.4],
+    },
+    {"name": "n8n-nodes-base.code", "displayName": "Code", "version": [1, 2]},
+    {"name": "n8n-nodes-base.if", "displayName": "If", "version": [1, 2, 2.1, 2.2]},
+    {
+        "name": "n8n-nodes-base.switch",
+        "displayName": "Switch",
+        "version": [1, 2, 3, 3.1, 3.2],
+    },
+    {"name": "n8n-nodes-base.filter", "displayName": "Filter", "version": [1, 2]},
+    {"name": "n8n-nodes-base.merge", "displayName": "Merge", "version": [1, 2, 2.1, 3]},
+    {
+        "name": "n8n-nodes-base.splitInBatches",
+        "displayName": "Loop Over Items (Split in Batches)",
+        "version": [1, 2, 3],
+    },
+    {"name": "n8n-nodes-base.splitOut", "displayName": "Split Out", "version": 1},
+    {"name": "n8n-nodes-base.aggregate", "displayName": "Aggregate", "version": 1},
+    {
+        "name": "n8n-nodes-base.dateTime",
+        "displayName": "Date & Time",
+        "version": [1, 2],
+    },
+    {"name": "n8n-nodes-base.wait", "displayName": "Wait", "version": [1, 1.1]},
+    {
+        "name": "n8n-nodes-base.noOp",
+        "displayName": "No Operation, do nothing",
+        "version": 1,
+    },
+    {
+        "name": "n8n-nodes-base.executeWorkflow",
+        "displayName": "Execute Workflow",
+        "version": [1, 1.1],
+    },
+    {
+        "name": "n8n-nodes-base.executeWorkflowTrigger",
+        "displayName": "Execute Workflow Trigger",
+        "version": [1, 1.1],
+    },
+    {
+        "name": "n8n-nodes-base.emailSend",
+        "displayName": "Send Email",
+        "version": [1, 2, 2.1],
+    },
+    {"name": "n8n-nodes-base.gmail", "displayName": "Gmail", "version": [1, 2, 2.1]},
+    {
+        "name": "n8n-nodes-base.slack",
+        "displayName": "Slack",
+        "version": [1, 2, 2.1, 2.2],
+    },
+    {
+        "name": "n8n-nodes-base.telegram",
+        "displayName": "Telegram",
+        "version": [1, 1.1, 1.2],
+    },
+    {
+        "name": "n8n-nodes-base.googleSheets",
+        "displayName": "Google Sheets",
+        "version": [1, 2, 3, 4, 4.1, 4.2, 4.3, 4.4, 4.5],
+    },
+    {
+        "name": "n8n-nodes-base.airtable",
+        "displayName": "Airtable",
+        "version": [1, 2, 2.1],
+    },
+    {
+        "name": "n8n-nodes-base.notion",
+        "displayName": "Notion",
+        "version": [1, 2, 2.1, 2.2],
+    },
+    {
+        "name": "n8n-nodes-base.postgres",
+        "displayName": "Postgres",
+        "version": [1, 2, 2.1, 2.2, 2.3, 2.4, 2.5],
+    },
+    {
+        "name": "n8n-nodes-base.rssFeedRead",
+        "displayName": "RSS Read",
+        "version": [1, 1.1],
+    },
+    {"name": "n8n-nodes-base.stickyNote", "displayName": "Sticky Note", "version": 1},
+]
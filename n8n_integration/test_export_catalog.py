@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test the append-only index of exported workflow files
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from n8n_integration import export_catalog
+from n8n_integration.export_catalog import ExportCatalog, ExportEntry
+
+
+def write_export(directory, name, mtime):
+    path = Path(directory) / name
+    path.write_text(json.dumps({"name": name}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def index_lines(catalog):
+    with open(catalog.index_path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["name"] for line in f]
+
+
+def test_latest_newest_first():
+    """latest() lists recorded exports newest first, skipping deleted files"""
+    print("🧪 Testing latest exports")
+    directory = tempfile.mkdtemp()
+    catalog = ExportCatalog(directory)
+    assert catalog.latest() == []
+    for number in range(1, 5):
+        catalog.add(write_export(directory, f"workflow_{number}.json", number))
+    assert [e.name for e in catalog.latest(limit=2)] == [
+        "workflow_4.json",
+        "workflow_3.json",
+    ]
+    assert catalog.count() == 4
+    assert catalog.get("workflow_1.json").size > 0
+    assert catalog.read("workflow_2.json") == b'{"name": "workflow_2.json"}'
+
+    os.remove(Path(directory) / "workflow_4.json")
+    assert [e.name for e in catalog.latest(limit=2)] == [
+        "workflow_3.json",
+        "workflow_2.json",
+    ]
+    assert catalog.read("unknown.json") is None
+    print("   ✅ newest first")
+
+
+def test_missing_index_rebuilt():
+    """Without an index, one directory scan recreates it in mtime order"""
+    print("🧪 Testing index rebuild")
+    directory = tempfile.mkdtemp()
+    write_export(directory, "workflow_b.json", 200)
+    write_export(directory, "workflow_a.json", 100)
+    ref = ExportEntry("workflow_c.json", 10, 300, blob="abc", codec="gzip")
+    (Path(directory) / "workflow_c.json.ref").write_text(
+        json.dumps(ref._asdict()), encoding="utf-8"
+    )
+    (Path(directory) / "broken.json.ref").write_text("{", encoding="utf-8")
+
+    catalog = ExportCatalog(directory)
+    assert [e.name for e in catalog.latest()] == [
+        "workflow_c.json",
+        "workflow_b.json",
+        "workflow_a.json",
+    ]
+    assert catalog.get("workflow_c.json") == ref
+    assert catalog.read("workflow_c.json") is None, "blob exports are not plain"
+    assert index_lines(catalog) == [
+        "workflow_a.json",
+        "workflow_b.json",
+        "workflow_c.json",
+    ]
+    print("   ✅ index recreated from the directory")
+
+
+def test_other_instance_appends_picked_up():
+    """Records appended by another catalog are read incrementally"""
+    print("🧪 Testing exports from another process")
+    directory = tempfile.mkdtemp()
+    first = ExportCatalog(directory)
+    second = ExportCatalog(directory)
+    first.add(write_export(directory, "workflow_1.json", 1))
+    assert second.count() == 1
+    second.add(write_export(directory, "workflow_2.json", 2))
+    assert [e.name for e in first.latest()] == ["workflow_2.json", "workflow_1.json"]
+
+    # A partially written line is left for the next read
+    offset = first._offset
+    with open(first.index_path, "a", encoding="utf-8") as f:
+        f.write('{"name": "workflow_3.json"')
+    assert first.count() == 2
+    assert first._offset == offset
+    print("   ✅ new records read, partial line skipped")
+
+
+def test_superseded_name_moves_to_newest():
+    """Exporting a name again replaces its entry and makes it the newest"""
+    print("🧪 Testing a re-exported name")
+    directory = tempfile.mkdtemp()
+    catalog = ExportCatalog(directory)
+    catalog.add(write_export(directory, "workflow_a.json", 1))
+    catalog.add(write_export(directory, "workflow_b.json", 2))
+    path = write_export(directory, "workflow_a.json", 3)
+    path.write_text('{"name": "workflow_a.json", "v": 2}', encoding="utf-8")
+    catalog.add(path)
+
+    assert [e.name for e in catalog.latest()] == ["workflow_a.json", "workflow_b.json"]
+    assert catalog.count() == 2
+    assert catalog.get("workflow_a.json").size == path.stat().st_size
+    reopened = ExportCatalog(directory)
+    assert [e.name for e in reopened.latest()] == ["workflow_a.json", "workflow_b.json"]
+    print("   ✅ one entry per name")
+
+
+def test_index_compacted():
+    """Past the slack limit, the index is rewritten with one line per export"""
+    print("🧪 Testing index compaction")
+    directory = tempfile.mkdtemp()
+    catalog = ExportCatalog(directory)
+    saved = export_catalog.INDEX_COMPACT_SLACK
+    export_catalog.INDEX_COMPACT_SLACK = 2
+    try:
+        for mtime in range(1, 4):
+            catalog.add(write_export(directory, "workflow_a.json", mtime))
+            catalog.add(write_export(directory, "workflow_b.json", mtime))
+        lines = index_lines(catalog)
+    finally:
+        export_catalog.INDEX_COMPACT_SLACK = saved
+    print(f"   {len(lines)} lines after 6 exports of 2 names")
+    assert len(lines) < 6
+    assert catalog._records == len(lines)
+    assert catalog._offset == catalog.index_path.stat().st_size
+    reopened = ExportCatalog(directory)
+    assert [e.name for e in reopened.latest()] == ["workflow_b.json", "workflow_a.json"]
+    assert reopened.get("workflow_a.json").mtime == 3
+    print("   ✅ superseded records dropped")
+
+
+if __name__ == "__main__":
+    test_latest_newest_first()
+    test_missing_index_rebuilt()
+    test_other_instance_appends_picked_up()
+    test_superseded_name_moves_to_newest()
+    test_index_compacted()
+    print("\n✅ All export catalog tests passed!")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the compressed, content-addressed export store
+"""
+
+import json
+import tempfile
+
+from n8n_integration.export_store import ExportStore
+
+
+def workflow(name="Phase 1: Intake"):
+    return {
+        "name": name,
+        "nodes": [{"name": "Webhook", "type": "n8n-nodes-base.webhook"}],
+        "connections": {},
+    }
+
+
+def test_round_trip_and_dedup():
+    """Identical exports share one blob and read back as pretty JSON"""
+    print("🧪 Testing export round trip")
+    store = ExportStore(tempfile.mkdtemp())
+    first = store.save(workflow(), "workflow_a.json")
+    second = store.save(workflow(), "workflow_b.json")
+    third = store.save(workflow("Phase 2: Enrich"), "workflow_c.json")
+    assert first.blob == second.blob != third.blob
+    assert len(list((store.directory / "blobs").rglob("*.gz"))) == 2
+
+    data = store.read("workflow_b.json")
+    assert json.loads(data) == workflow()
+    assert data.startswith(b'{\n  "connections"'), data[:20]
+    assert store.read("missing.json") is None
+    print("   ✅ one blob per distinct workflow")
+
+
+def test_damaged_blob_reads_as_none():
+    """A truncated, corrupt or missing blob is reported as unreadable"""
+    print("🧪 Testing damaged blobs")
+    store = ExportStore(tempfile.mkdtemp())
+    entry = store.save(workflow(), "workflow_a.json")
+    path = store.blob_path(entry.blob, store.codec)
+    blob = path.read_bytes()
+
+    damages = {
+        "truncated": blob[: len(blob) // 2],
+        "corrupt": blob[:10] + bytes(len(blob) - 10),
+        "not gzip": b"plain text",
+        "empty": b"",
+    }
+    for damage, data in damages.items():
+        path.write_bytes(data)
+        assert store.read("workflow_a.json") is None, damage
+        print(f"   ✅ {damage}")
+
+    path.unlink()
+    assert store.read("workflow_a.json") is None
+    print("   ✅ missing")
+
+    # Valid gzip holding something that is not JSON
+    store = ExportStore(tempfile.mkdtemp())
+    entry = store.save(workflow(), "workflow_a.json")
+    store.blob_path(entry.blob, store.codec).write_bytes(
+        store.codec.compress(b"\xff not json")
+    )
+    assert store.read("workflow_a.json") is None
+    print("   ✅ undecodable content")
+
+
+if __name__ == "__main__":
+    test_round_trip_and_dedup()
+    test_damaged_blob_reads_as_none()
+    print("\n✅ All export store tests passed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test checking writes against the instance's node-type catalog
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from n8n_integration.async_n8n_client import AsyncN8NClient
+from n8n_integration.n8n_client import N8NClient, n8n_client
+from n8n_integration.node_catalog import NodeTypeCatalog
+
+BASE_URL = "http://n8n.invalid"
+
+
+def cached_catalog(types):
+    """A catalog loaded from an on-disk cache of `types`, never refreshed"""
+    client = N8NClient(base_url=BASE_URL, api_key="key")
+    path = os.path.join(tempfile.mkdtemp(), "n8n_node_types.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"base_url": BASE_URL, "fetched_at": time.time(), "types": types}, f)
+    return NodeTypeCatalog(client, path=path, ttl=float("inf"))
+
+
+def catalog():
+    return cached_catalog({"n8n-nodes-base.set": ["Edit Fields", [3, 3.4]]})
+
+
+def workflow(node_type="n8n-nodes-base.set", type_version=3.4):
+    return {
+        "name": "Phase 1: Intake",
+        "nodes": [
+            {
+                "id": "id-set",
+                "name": "Set",
+                "type": node_type,
+                "typeVersion": type_version,
+                "position": [250, 300],
+                "parameters": {},
+            }
+        ],
+        "connections": {},
+        "settings": {"executionOrder": "v1"},
+    }
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeAsyncClient:
+    """Stands in for httpx.AsyncClient, recording every write"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def post(self, url, json=None, **kwargs):
+        self.requests.append(("POST", json))
+        return FakeResponse({**json, "id": "wf-1"})
+
+    async def put(self, url, json=None, **kwargs):
+        self.requests.append(("PUT", json))
+        return FakeResponse({**json, "id": "wf-1"})
+
+    async def aclose(self):
+        pass
+
+
+def async_client(**kwargs):
+    client = AsyncN8NClient(base_url=BASE_URL, api_key="key", **kwargs)
+    client._client = FakeAsyncClient()
+    return client
+
+
+def test_catalog_sources():
+    """Only instance data is authoritative; the bundled snapshot is not"""
+    print("🧪 Testing catalog sources")
+    types = catalog()
+    assert types.source == "cache" and types.authoritative
+    assert "n8n-nodes-base.set" in types and "n8n-nodes-base.nope" not in types
+    assert types.get("n8n-nodes-base.set").latest == 3.4
+
+    client = N8NClient(base_url=BASE_URL, api_key="key")
+    missing = os.path.join(tempfile.mkdtemp(), "missing.json")
+    snapshot = NodeTypeCatalog(client, path=missing, ttl=float("inf"))
+    assert snapshot.source == "snapshot" and not snapshot.authoritative
+    client.node_types = snapshot
+    assert client.check_workflow(workflow("n8n-nodes-base.nope")).valid
+    print("   ✅ cache authoritative, snapshot not")
+
+
+def test_sync_write_rejected():
+    """Unknown types and versions are refused with their error paths"""
+    print("🧪 Testing the sync client")
+    client = N8NClient(base_url=BASE_URL, api_key="key")
+    client.node_types = catalog()
+    assert client.check_workflow(workflow()).valid
+    report = client.check_workflow(workflow("n8n-nodes-base.nope"))
+    assert [issue.path for issue in report.errors] == ["$.nodes[0].type"]
+    report = client.check_workflow(workflow(type_version=9))
+    assert [issue.path for issue in report.errors] == ["$.nodes[0].typeVersion"]
+    print("   ✅ type and version checked")
+
+
+def test_async_write_rejected_before_request():
+    """The async client refuses an unknown node type without a request"""
+    print("🧪 Testing the async client")
+    client = async_client(node_types=catalog())
+
+    async def writes():
+        return (
+            await client.create_workflow(workflow("n8n-nodes-base.nope")),
+            await client.update_workflow("wf-1", workflow(type_version=9)),
+            await client.update_workflow("wf-1", workflow()),
+        )
+
+    created, updated, valid = asyncio.run(writes())
+    print(f"   {created['error']}")
+    assert not created["success"]
+    assert created["validation_errors"][0].startswith("$.nodes[0].type:")
+    assert not updated["success"]
+    assert updated["validation_errors"][0].startswith("$.nodes[0].typeVersion:")
+    assert valid["success"], valid
+    assert [method for method, _ in client._client.requests] == ["PUT"]
+    print("   ✅ only the valid write was sent")
+
+
+def test_async_uses_shared_catalog():
+    """Without its own catalog, the async client uses n8n_client's, read per check"""
+    print("🧪 Testing the shared catalog")
+    client = AsyncN8NClient(base_url=n8n_client.base_url, api_key="key")
+    client._client = FakeAsyncClient()
+    saved = n8n_client.node_types
+    n8n_client.node_types = catalog()
+    try:
+        result = asyncio.run(client.create_workflow(workflow("n8n-nodes-base.nope")))
+    finally:
+        n8n_client.node_types = saved
+    assert not result["success"]
+    assert client._client.requests == []
+
+    # A client for another instance does not borrow the shared catalog
+    assert async_client().node_types is None
+    print("   ✅ catalog installed after the client was created is used")
+
+
+if __name__ == "__main__":
+    test_catalog_sources()
+    test_sync_write_rejected()
+    test_async_write_rejected_before_request()
+    test_async_uses_shared_catalog()
+    print("\n✅ All node catalog tests passed!")
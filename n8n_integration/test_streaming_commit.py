@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test committing the workflow blocks of a streamed answer
+"""
+
+import json
+import tempfile
+
+import streamlit as st
+
+from n8n_integration.n8n_client import N8NClient
+from n8n_integration.version_store import WorkflowVersionStore
+from n8n_integration.workflow_manager import WorkflowManager
+from n8n_integration.workflow_mirror import WorkflowMirror
+
+
+def node(name):
+    return {
+        "id": f"id-{name}",
+        "name": name,
+        "type": "n8n-nodes-base.set",
+        "typeVersion": 3,
+        "position": [250, 300],
+        "parameters": {},
+    }
+
+
+def link(target):
+    return {"node": target, "type": "main", "index": 0}
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers writes like n8n does and records them"""
+
+    def __init__(self):
+        self.writes = []
+
+    def post(self, url, json=None, **kwargs):
+        self.writes.append(("POST", json))
+        return FakeResponse(200, {**json, "id": "wf-1", "versionId": "v1"})
+
+    def put(self, url, json=None, **kwargs):
+        self.writes.append(("PUT", json))
+        return FakeResponse(200, {**json, "id": "wf-1", "versionId": "v2"})
+
+    def get(self, url, **kwargs):
+        raise AssertionError(f"unexpected GET {url}")
+
+
+def new_manager(workflow_id=None):
+    manager = WorkflowManager(
+        version_store=WorkflowVersionStore(tempfile.mkdtemp()),
+        mirror=WorkflowMirror(),
+    )
+    manager.client = N8NClient(base_url="http://n8n.invalid", api_key="key")
+    manager.client._session = FakeSession()
+    for key in list(st.session_state):
+        del st.session_state[key]
+    manager.initialize_session_state()
+    if workflow_id:
+        manager.mirror.store(
+            workflow_id,
+            {
+                "id": workflow_id,
+                "versionId": "v1",
+                "name": "Phase 1: Intake",
+                "nodes": [node("Trigger")],
+                "connections": {},
+            },
+        )
+        st.session_state.current_workflow_id = workflow_id
+    return manager
+
+
+def stream(manager, answer, chunk_size=7):
+    """Feed `answer` in small chunks and finish, as the chat loop does"""
+    commit = manager.start_streaming_commit()
+    for start in range(0, len(answer), chunk_size):
+        commit.feed(answer[start : start + chunk_size])
+    return commit.finish(answer)
+
+
+def block(workflow, fence="json"):
+    return f"```{fence}\n{json.dumps(workflow, indent=2)}\n```"
+
+
+def test_blocks_written_once():
+    """Every block of a multi-block answer goes into one write"""
+    print("🧪 Testing a multi-block answer")
+    manager = new_manager("wf-1")
+    answer = "\n\n".join(
+        [
+            "Here is the next phase.",
+            block(
+                {
+                    "name": "Phase 2: Enrich",
+                    "nodes": [node("Enrich")],
+                    "connections": {"Trigger": {"main": [[link("Enrich")]]}},
+                }
+            ),
+            "And the notification step:",
+            block(
+                {
+                    "name": "Phase 3: Notify",
+                    "nodes": [node("Notify")],
+                    "connections": {"Enrich": {"main": [[link("Notify")]]}},
+                }
+            ),
+        ]
+    )
+    response = stream(manager, answer)
+    writes = manager.client._session.writes
+    assert [method for method, _ in writes] == ["PUT"], writes
+    names = [n["name"] for n in writes[0][1]["nodes"]]
+    assert names == ["Trigger", "Enrich", "Notify"], names
+    assert len(st.session_state.workflow_phase_history) == 1
+    assert st.session_state.current_phase == 3
+    assert response.count("added to workflow") == 1
+    print("   ✅ one PUT, one history entry, one message")
+
+
+def test_document_order():
+    """A workflow in a non-json fence before the json block is merged first"""
+    print("🧪 Testing document order")
+    manager = new_manager()
+    answer = "\n\n".join(
+        [
+            block(
+                {
+                    "name": "Phase 1: Intake",
+                    "nodes": [node("Trigger")],
+                    "connections": {},
+                },
+                fence="javascript",
+            ),
+            block(
+                {
+                    "name": "Phase 2: Enrich",
+                    "nodes": [node("Enrich")],
+                    "connections": {"Trigger": {"main": [[link("Enrich")]]}},
+                }
+            ),
+        ]
+    )
+    stream(manager, answer)
+    writes = manager.client._session.writes
+    assert [method for method, _ in writes] == ["POST"], writes
+    workflow = writes[0][1]
+    assert [n["name"] for n in workflow["nodes"]] == ["Trigger", "Enrich"]
+    assert workflow["name"] == "Phase 2: Enrich"
+    assert st.session_state.current_phase == 2
+    print("   ✅ blocks folded in the order they appear")
+
+
+def test_skipped_blocks_reported():
+    """When a malformed block stops the write, the answer says what was skipped"""
+    print("🧪 Testing skipped blocks")
+    manager = new_manager("wf-1")
+    answer = "\n\n".join(
+        [
+            block({"name": "Phase 2: Enrich", "nodes": [node("Enrich")]}),
+            block({"name": "Phase 3: Broken", "nodes": ["Notify"]}),
+            block({"name": "Phase 4: Done", "nodes": [node("Done")]}),
+        ]
+    )
+    response = stream(manager, answer)
+    print("   " + response[len(answer) :].strip().replace("\n", "\n   "))
+    assert manager.client._session.writes == []
+    assert "$.nodes[0]: node must be an object" in response
+    assert "2 other workflow blocks not written" in response
+    assert st.session_state.workflow_phase_history == []
+    print("   ✅ error and skipped blocks reported, nothing written")
+
+
+def test_matches_process_ai_response():
+    """Streaming and the regular path render the same response"""
+    print("🧪 Testing streaming matches the regular path")
+    answer = "\n\n".join(
+        [
+            "Phase one:",
+            block({"name": "Phase 1: Intake", "nodes": [node("Trigger")]}),
+        ]
+    )
+    streamed = stream(new_manager(), answer)
+    regular = new_manager().process_ai_response(answer)
+    assert streamed == regular
+    assert stream(new_manager(), "No workflow this time.") == "No workflow this time."
+    print("   ✅ same response")
+
+
+if __name__ == "__main__":
+    test_blocks_written_once()
+    test_document_order()
+    test_skipped_blocks_reported()
+    test_matches_process_ai_response()
+    print("\n✅ All streaming commit tests passed!")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test per-turn tracing and its JSONL export
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from n8n_integration import tracing
+from n8n_integration.tracing import NOOP_SPAN, Tracer, traced
+
+
+def new_tracer(sample_rate=1.0):
+    path = os.path.join(tempfile.mkdtemp(), "trace.jsonl")
+    return Tracer(path=path, sample_rate=sample_rate)
+
+
+def read_spans(tracer):
+    if not os.path.exists(tracer.path):
+        return []
+    with open(tracer.path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_disabled_and_unsampled():
+    """Without a file or a sample, spans are the shared no-op"""
+    print("🧪 Testing disabled tracing")
+    assert Tracer(path="").turn() is NOOP_SPAN
+    tracer = new_tracer(sample_rate=0.0)
+    assert not tracer.enabled
+    with tracer.turn(model="m") as turn:
+        assert turn is NOOP_SPAN
+        assert tracer.span("child") is NOOP_SPAN
+        assert tracer.current_span() is NOOP_SPAN
+    assert tracer.span("outside") is NOOP_SPAN
+    assert read_spans(tracer) == []
+    print("   ✅ nothing recorded")
+
+
+def test_nested_spans_exported():
+    """Spans nest under the turn and are written as they close"""
+    print("🧪 Testing nested spans")
+    tracer = new_tracer()
+    with tracer.turn(model="m") as turn:
+        with tracer.span("llm.respond", tokens=10) as respond:
+            with tracer.span("llm.stream") as stream:
+                stream.set(chunks=3)
+        with tracer.span("workflow.finish"):
+            pass
+    spans = read_spans(tracer)
+    print(f"   {[s['name'] for s in spans]}")
+    assert [s["name"] for s in spans] == [
+        "llm.stream",
+        "llm.respond",
+        "workflow.finish",
+        "turn",
+    ]
+    by_name = {s["name"]: s for s in spans}
+    assert {s["traceId"] for s in spans} == {turn.trace_id}
+    assert by_name["turn"]["parentSpanId"] is None
+    assert by_name["llm.respond"]["parentSpanId"] == turn.span_id
+    assert by_name["llm.stream"]["parentSpanId"] == respond.span_id
+    assert by_name["workflow.finish"]["parentSpanId"] == turn.span_id
+    assert by_name["llm.stream"]["attributes"] == {"chunks": 3}
+    assert by_name["turn"]["attributes"] == {"model": "m"}
+    for span in spans:
+        assert span["status"] == "OK"
+        assert span["endTimeUnixNano"] >= span["startTimeUnixNano"]
+        assert span["durationMs"] >= 0
+    assert tracer.current_span() is NOOP_SPAN, "the turn must not stay current"
+    print("   ✅ one trace, correct parents")
+
+
+def test_error_recorded():
+    """An exception marks the span as failed and still propagates"""
+    print("🧪 Testing a failing span")
+    tracer = new_tracer()
+    try:
+        with tracer.turn():
+            with tracer.span("n8n.update_workflow"):
+                raise ConnectionError("n8n down")
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("the exception was swallowed")
+    spans = read_spans(tracer)
+    assert [s["status"] for s in spans] == ["ERROR", "ERROR"]
+    assert spans[0]["attributes"]["error"] == "ConnectionError: n8n down"
+    print("   ✅ status ERROR with the exception")
+
+
+def test_spans_nest_across_threads():
+    """wrap() carries the current span into a worker thread"""
+    print("🧪 Testing spans across threads")
+    tracer = new_tracer()
+
+    def work():
+        with tracer.span("worker"):
+            pass
+
+    with tracer.turn() as turn:
+        thread = threading.Thread(target=tracer.wrap(work))
+        thread.start()
+        thread.join()
+        # An unwrapped thread starts without a current span
+        bare = threading.Thread(target=work)
+        bare.start()
+        bare.join()
+    worker = [s for s in read_spans(tracer) if s["name"] == "worker"]
+    assert len(worker) == 1
+    assert worker[0]["parentSpanId"] == turn.span_id
+    assert tracer.wrap(work) is work, "outside a turn wrap() is a no-op"
+    print("   ✅ worker span nested under the turn")
+
+
+def test_record_span():
+    """Finished spans can be recorded after the fact, with children"""
+    print("🧪 Testing recorded spans")
+    tracer = new_tracer()
+    assert tracer.record_span("orphan", 0, 1) is NOOP_SPAN
+    with tracer.turn() as turn:
+        start = time.time_ns()
+        stream = tracer.record_span("llm.stream", start, start + 2_000_000, chunks=5)
+        tracer.record_span("llm.ttft", start, start + 1_000_000, parent=stream)
+    spans = {s["name"]: s for s in read_spans(tracer)}
+    assert spans["llm.stream"]["parentSpanId"] == turn.span_id
+    assert spans["llm.stream"]["durationMs"] == 2.0
+    assert spans["llm.ttft"]["parentSpanId"] == spans["llm.stream"]["spanId"]
+    print("   ✅ recorded with the given times")
+
+
+def test_traced_decorator():
+    """@traced records result dicts' success and status code"""
+    print("🧪 Testing @traced")
+
+    @traced("n8n.get_workflow")
+    def get_workflow():
+        return {"success": False, "status_code": 404}
+
+    assert get_workflow() == {"success": False, "status_code": 404}
+
+    tracer = tracing.tracer
+    saved = tracer.path, tracer.sample_rate
+    tracer.path = new_tracer().path
+    tracer.sample_rate = 1.0
+    try:
+        with tracer.turn():
+            get_workflow()
+    finally:
+        path = tracer.path
+        tracer.path, tracer.sample_rate = saved
+    with open(path, "r", encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f]
+    assert spans[0]["name"] == "n8n.get_workflow"
+    assert spans[0]["attributes"] == {"success": False, "status_code": 404}
+    print("   ✅ result recorded on the span")
+
+
+if __name__ == "__main__":
+    test_disabled_and_unsampled()
+    test_nested_spans_exported()
+    test_error_recorded()
+    test_spans_nest_across_threads()
+    test_record_span()
+    test_traced_decorator()
+    print("\n✅ All tracing tests passed!")
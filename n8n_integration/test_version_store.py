@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Test the local workflow version store: deltas, keyframes and rollback
+"""
+
+import copy
+import json
+import tempfile
+
+from n8n_integration.version_store import (
+    WorkflowVersionStore,
+    apply_delta,
+    diff_workflows,
+)
+
+
+def build_versions():
+    """Successive versions exercising every kind of change a delta records"""
+    v1 = {
+        "name": "Phase 1: Intake",
+        "nodes": [
+            {"name": "Webhook", "type": "n8n-nodes-base.webhook", "parameters": {}},
+            {"name": "Set", "type": "n8n-nodes-base.set", "parameters": {"x": 1}},
+        ],
+        "connections": {"Webhook": {"main": [[{"node": "Set", "index": 0}]]}},
+        "settings": {},
+        "pinData": {"Webhook": [{"json": {"a": 1}}]},
+    }
+
+    # Node added, node parameter changed, connection added
+    v2 = copy.deepcopy(v1)
+    v2["name"] = "Phase 2: Enrich"
+    v2["nodes"][1]["parameters"]["x"] = 2
+    v2["nodes"].append({"name": "HTTP", "type": "n8n-nodes-base.httpRequest"})
+    v2["connections"]["Set"] = {"main": [[{"node": "HTTP", "index": 0}]]}
+
+    # Top-level field removed, another changed, nodes reordered
+    v3 = copy.deepcopy(v2)
+    del v3["pinData"]
+    v3["settings"] = {"executionOrder": "v1"}
+    v3["nodes"] = [v3["nodes"][2], v3["nodes"][0], v3["nodes"][1]]
+
+    # Node and its connections removed
+    v4 = copy.deepcopy(v3)
+    v4["nodes"] = [node for node in v4["nodes"] if node["name"] != "HTTP"]
+    del v4["connections"]["Set"]
+
+    # Connection rewired, field added back, field added with a null value
+    v5 = copy.deepcopy(v4)
+    v5["connections"]["Webhook"] = {"main": [[], [{"node": "Set", "index": 0}]]}
+    v5["pinData"] = {}
+    v5["staticData"] = None
+
+    # Duplicate node names cannot key a delta
+    v6 = copy.deepcopy(v5)
+    v6["nodes"].append(copy.deepcopy(v6["nodes"][0]))
+
+    v7 = copy.deepcopy(v5)
+    v7["name"] = "Phase 3: Done"
+    return [v1, v2, v3, v4, v5, v6, v7]
+
+
+def test_delta_round_trip():
+    """apply_delta(old, diff_workflows(old, new)) rebuilds new exactly"""
+    print("🧪 Testing delta round trip")
+    versions = build_versions()
+    for old, new in zip(versions, versions[1:]):
+        old_copy, new_copy = copy.deepcopy(old), copy.deepcopy(new)
+        delta = diff_workflows(old, new)
+        if any(
+            node["name"] == other["name"]
+            for i, node in enumerate(new["nodes"])
+            for other in new["nodes"][i + 1 :]
+        ) or any(
+            node["name"] == other["name"]
+            for i, node in enumerate(old["nodes"])
+            for other in old["nodes"][i + 1 :]
+        ):
+            assert delta is None, "duplicate names must fall back to a snapshot"
+            continue
+        rebuilt = apply_delta(old, delta)
+        assert rebuilt == new, f"round trip failed for {new['name']}"
+        assert [n["name"] for n in rebuilt["nodes"]] == [
+            n["name"] for n in new["nodes"]
+        ]
+        assert old == old_copy and new == new_copy, "inputs must not be mutated"
+        # The delta survives a JSON round trip, as it does on disk
+        assert apply_delta(old, json.loads(json.dumps(delta))) == new
+    print("   ✅ every change kind round-trips; inputs untouched")
+
+
+def test_store_keyframes_and_reload():
+    """Every version restores exactly, from memory and after a reload"""
+    print("🧪 Testing version store keyframes")
+    versions = build_versions()
+    directory = tempfile.mkdtemp()
+    store = WorkflowVersionStore(directory, keyframe_interval=3)
+    for number, workflow in enumerate(versions, 1):
+        entry = store.record("wf-1", workflow, "create" if number == 1 else "update")
+        assert entry.version == number
+        assert entry.name == workflow["name"]
+
+    with open(f"{directory}/wf-1.jsonl", "r", encoding="utf-8") as f:
+        kinds = [json.loads(line)["kind"] for line in f]
+    print(f"   Record kinds: {kinds}")
+    assert kinds[0] == "full" and kinds[3] == "full" and kinds[6] == "full"
+    assert kinds[5] == "full", "duplicate node names are stored as a snapshot"
+    assert "delta" in kinds
+
+    reloaded = WorkflowVersionStore(directory, keyframe_interval=3)
+    for number, workflow in enumerate(versions, 1):
+        assert store.get("wf-1", number) == workflow, f"version {number} differs"
+        assert reloaded.get("wf-1", number) == workflow, f"reload {number} differs"
+    assert [v.action for v in reloaded.versions("wf-1")][:2] == ["create", "update"]
+    assert store.get("wf-1", 0) is None and store.get("wf-1", 99) is None
+
+    # Returned workflows are copies
+    store.get("wf-1", 2)["nodes"].clear()
+    store.get("wf-1", len(versions))["nodes"].clear()
+    assert store.get("wf-1", 2) == versions[1]
+    assert store.get("wf-1", len(versions)) == versions[-1]
+    print("   ✅ all versions restore from memory and from disk")
+
+
+def test_torn_last_line():
+    """A half-written last record is skipped on reload"""
+    print("🧪 Testing interrupted write")
+    directory = tempfile.mkdtemp()
+    store = WorkflowVersionStore(directory)
+    versions = build_versions()
+    store.record("wf-2", versions[0], "create")
+    store.record("wf-2", versions[1], "update")
+    with open(f"{directory}/wf-2.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"version": 3, "kind": "del')
+
+    reloaded = WorkflowVersionStore(directory)
+    assert len(reloaded.versions("wf-2")) == 2
+    assert reloaded.get("wf-2", 2) == versions[1]
+    print("   ✅ torn record ignored")
+
+
+def test_append_after_torn_line():
+    """A version recorded after a crash is readable after the next reload"""
+    print("🧪 Testing append after an interrupted write")
+    directory = tempfile.mkdtemp()
+    path = f"{directory}/wf-4.jsonl"
+    store = WorkflowVersionStore(directory)
+    versions = build_versions()
+    store.record("wf-4", versions[0], "create")
+    store.record("wf-4", versions[1], "update")
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-20])  # the crash cut the second record short
+
+    store = WorkflowVersionStore(directory)
+    assert store.record("wf-4", versions[2], "update").version == 2
+    assert store.record("wf-4", versions[3], "update").version == 3
+    with open(path, "rb") as f:
+        assert f.read().endswith(b"}\n")
+
+    reloaded = WorkflowVersionStore(directory)
+    assert [v.version for v in reloaded.versions("wf-4")] == [1, 2, 3]
+    assert reloaded.get("wf-4", 1) == versions[0]
+    assert reloaded.get("wf-4", 2) == versions[2]
+    assert reloaded.get("wf-4", 3) == versions[3]
+    print("   ✅ broken tail truncated; new versions survive a reload")
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Records requests and answers PUTs like n8n does"""
+
+    def __init__(self):
+        self.requests = []
+
+    def put(self, url, json=None, **kwargs):
+        self.requests.append(("PUT", url))
+        return FakeResponse(200, {**json, "id": "wf-3", "versionId": "v2"})
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", url))
+        return FakeResponse(500, {})
+
+    def post(self, url, **kwargs):
+        self.requests.append(("POST", url))
+        return FakeResponse(500, {})
+
+
+def test_rollback_is_one_put():
+    """Rolling back restores the stored version with a single PUT"""
+    print("🧪 Testing rollback")
+    import streamlit as st
+
+    from n8n_integration.n8n_client import N8NClient
+    from n8n_integration.workflow_manager import WorkflowManager
+    from n8n_integration.workflow_mirror import WorkflowMirror
+
+    store = WorkflowVersionStore(tempfile.mkdtemp())
+    manager = WorkflowManager(version_store=store, mirror=WorkflowMirror())
+    manager.client = N8NClient(base_url="http://n8n.invalid", api_key="key")
+    session = FakeSession()
+    manager.client._session = session
+
+    versions = build_versions()
+    manager.initialize_session_state()
+    st.session_state.current_workflow_id = "wf-3"
+    st.session_state.workflow_phase_history = []
+    for number, workflow in enumerate(versions[:3], 1):
+        store.record("wf-3", workflow, "update")
+        st.session_state.workflow_phase_history.append(
+            {"phase": number, "workflow_id": "wf-3", "version": number}
+        )
+
+    result = manager.rollback_to_version(2)
+    print(f"   Requests: {session.requests}")
+    assert result["success"], result
+    assert session.requests == [("PUT", "http://n8n.invalid/api/v1/workflows/wf-3")]
+    assert result["version"] == 4
+    assert store.get("wf-3", 4) == versions[1]
+    assert [h["phase"] for h in st.session_state.workflow_phase_history] == [1, 2]
+    assert st.session_state.current_phase == 2
+    print("   ✅ one PUT, history cut back, rollback recorded as a version")
+
+
+if __name__ == "__main__":
+    test_delta_round_trip()
+    test_store_keyframes_and_reload()
+    test_torn_last_line()
+    test_append_after_torn_line()
+    test_rollback_is_one_put()
+    print("\n✅ All version store tests passed!")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test loading malformed model JSON into a workflow graph
+"""
+
+import copy
+import json
+import tempfile
+
+from n8n_integration.workflow_graph import WorkflowGraph
+
+
+def node(name):
+    return {"name": name, "type": "n8n-nodes-base.set", "parameters": {}}
+
+
+def link(target):
+    return {"node": target, "type": "main", "index": 0}
+
+
+def load(workflow):
+    """Load `workflow`, check it dumps back unchanged, and return the graph"""
+    before = copy.deepcopy(workflow)
+    graph = WorkflowGraph.from_json(workflow)
+    assert workflow == before, "loading mutated the workflow"
+    assert graph.to_json() == workflow, graph.to_json()
+    assert graph.copy().to_json() == workflow
+    return graph
+
+
+def test_well_formed_connections_indexed():
+    """Slot lists of edges with a string target are indexed"""
+    print("🧪 Testing well-formed connections")
+    graph = load(
+        {
+            "nodes": [node("A"), node("B"), node("C")],
+            "connections": {"A": {"main": [[link("B")], [], [link("C")]]}},
+        }
+    )
+    assert list(graph.successors("A")) == ["B", "C"]
+    assert list(graph.predecessors("C")) == ["A"]
+    assert not graph._raw_connections
+    print("   ✅ indexed")
+
+
+def test_malformed_slots_kept_raw():
+    """A single-level slot or a string edge is kept as written, not indexed"""
+    print("🧪 Testing malformed slots")
+    cases = {
+        "single-level slot": {"main": [link("B")]},
+        "string edge": {"main": [["B"]]},
+        "string slot": {"main": ["B"]},
+        "missing target": {"main": [[{"type": "main", "index": 0}]]},
+        "non-string target": {"main": [[{"node": ["B"]}]]},
+        "dict target": {"main": [[{"node": {"name": "B"}}]]},
+        "non-list outputs": {"main": "B"},
+    }
+    for case, outputs in cases.items():
+        graph = load(
+            {
+                "nodes": [node("A"), node("B")],
+                "connections": {"A": outputs, "B": {"main": [[link("A")]]}},
+            }
+        )
+        assert graph._raw_connections == {"A": outputs}, case
+        assert "A" not in graph.outgoing and list(graph.successors("B")) == ["A"]
+        assert graph.source_connections_json("A") == outputs, case
+        assert graph.connection_sources() == ["B", "A"], case
+        print(f"   ✅ {case}")
+
+
+def test_non_dict_nodes():
+    """A node that is not an object holds its place as an empty node"""
+    print("🧪 Testing non-object nodes")
+    workflow = {
+        "nodes": ["A", node("B"), None, ["C"]],
+        "connections": {},
+    }
+    graph = WorkflowGraph.from_json(workflow)
+    assert len(graph.nodes) == 4
+    assert list(graph.by_name) == ["B"]
+    assert graph.to_json()["nodes"] == [{}, node("B"), {}, {}]
+
+    for nodes in ("A", {"name": "A"}, None):
+        graph = WorkflowGraph.from_json({"nodes": nodes, "connections": "A"})
+        assert graph.nodes == [] and graph.connections_json() == {}
+    print("   ✅ non-objects load as empty nodes")
+
+
+def test_merge_with_malformed_phase():
+    """Merging a phase with malformed entries keeps its indexable edges"""
+    print("🧪 Testing merge of a malformed phase")
+    existing = WorkflowGraph.from_json(
+        {"nodes": [node("A"), node("B")], "connections": {"A": {"main": [[]]}}}
+    )
+    phase = WorkflowGraph.from_json(
+        {
+            "nodes": ["bad", node("C")],
+            "connections": {
+                "A": {"main": [link("C")]},
+                "B": {"main": [[link("C")]]},
+            },
+        }
+    )
+    summary = existing.merge(phase)
+    assert summary.connections_added == 1
+    assert existing.to_json()["connections"] == {
+        "A": {"main": [[]]},
+        "B": {"main": [[link("C")]]},
+    }
+    print(f"   ✅ {summary}")
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers PUTs like n8n does; any other request fails the test"""
+
+    def __init__(self):
+        self.puts = []
+
+    def put(self, url, json=None, **kwargs):
+        self.puts.append(json)
+        return FakeResponse(200, {**json, "id": "wf-1", "versionId": "v2"})
+
+    def get(self, url, **kwargs):
+        raise AssertionError(f"unexpected GET {url}")
+
+    def post(self, url, **kwargs):
+        raise AssertionError(f"unexpected POST {url}")
+
+
+def test_commit_against_mirror():
+    """A malformed phase committed against a mirrored workflow is refused"""
+    print("🧪 Testing commit of a malformed phase against the mirror")
+    from n8n_integration.n8n_client import N8NClient
+    from n8n_integration.version_store import WorkflowVersionStore
+    from n8n_integration.workflow_manager import WorkflowManager
+    from n8n_integration.workflow_mirror import WorkflowMirror
+
+    mirror = WorkflowMirror()
+    store = WorkflowVersionStore(tempfile.mkdtemp())
+    manager = WorkflowManager(version_store=store, mirror=mirror)
+    manager.client = N8NClient(base_url="http://n8n.invalid", api_key="key")
+    session = FakeSession()
+    manager.client._session = session
+    mirror.store(
+        "wf-1",
+        {
+            "id": "wf-1",
+            "versionId": "v1",
+            "name": "Phase 1: Intake",
+            "nodes": [node("A"), node("B")],
+            "connections": {"A": {"main": [[link("B")]]}},
+        },
+    )
+
+    for connections in (
+        {"B": {"main": [link("C")]}},
+        {"B": {"main": [["C"]]}},
+        {"B": {"main": [[{"node": ["C"]}]]}},
+    ):
+        phase = {
+            "name": "Phase 2",
+            "nodes": ["C", node("C")],
+            "connections": connections,
+        }
+        result = manager.commit_workflow(phase, "wf-1")
+        assert result["action"] == "update"
+        assert not result["update_result"]["success"]
+    assert session.puts == []
+    print("   ✅ refused without raising or writing")
+
+
+if __name__ == "__main__":
+    test_well_formed_connections_indexed()
+    test_malformed_slots_kept_raw()
+    test_non_dict_nodes()
+    test_merge_with_malformed_phase()
+    test_commit_against_mirror()
+    print("\n✅ All workflow graph tests passed!")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Test merging a new phase into an existing workflow
+"""
+
+import copy
+import json
+import tempfile
+
+from n8n_integration.workflow_merge import merge_workflows
+
+
+def node(name, node_id, position=(250, 300)):
+    return {
+        "id": node_id,
+        "name": name,
+        "type": "n8n-nodes-base.set",
+        "typeVersion": 3,
+        "position": list(position),
+        "parameters": {},
+    }
+
+
+def link(target, index=0):
+    return {"node": target, "type": "main", "index": index}
+
+
+def existing_workflow():
+    return {
+        "name": "Phase 1: Intake",
+        "nodes": [
+            node("Trigger", "id-trigger"),
+            node("IF", "id-if"),
+            node("Yes", "id-yes"),
+        ],
+        "connections": {
+            "Trigger": {"main": [[link("IF")]]},
+            "IF": {"main": [[link("Yes")]]},
+        },
+        "settings": {"executionOrder": "v1"},
+    }
+
+
+def test_existing_node_gains_output():
+    """A phase wiring a new output of an existing node keeps its old outputs"""
+    print("🧪 Testing new output on an existing node")
+    new_phase = {
+        "name": "Phase 2: Branch",
+        "nodes": [node("IF", "id-if"), node("No", "id-no")],
+        "connections": {"IF": {"main": [[], [link("No")]]}},
+    }
+
+    result = merge_workflows(existing_workflow(), new_phase)
+    connections = result.workflow["connections"]
+    print(f"   IF outputs: {connections['IF']['main']}")
+    assert connections["IF"]["main"] == [[link("Yes")], [link("No")]]
+    assert connections["Trigger"]["main"] == [[link("IF")]]
+    assert [n["name"] for n in result.workflow["nodes"]] == [
+        "Trigger",
+        "IF",
+        "Yes",
+        "No",
+    ]
+    assert result.workflow["name"] == "Phase 1: Intake"
+    assert result.workflow["settings"] == {"executionOrder": "v1"}
+    assert result.summary.nodes_added == 1
+    assert result.summary.nodes_skipped == 1
+    assert result.summary.connections_added == 1
+    print("   ✅ both outputs kept")
+
+
+def test_duplicate_edges_skipped():
+    """Edges already in the workflow, or repeated in the phase, are added once
+
+    Repeats within the phase collapse when it is loaded, so only the edge
+    the workflow already has counts as skipped.
+    """
+    print("🧪 Testing duplicate edges")
+    new_phase = {
+        "nodes": [node("Notify", "id-notify")],
+        "connections": {
+            "Trigger": {"main": [[link("IF"), link("IF")]]},
+            "Yes": {"main": [[link("Notify"), link("Notify")]]},
+        },
+    }
+
+    result = merge_workflows(existing_workflow(), new_phase)
+    connections = result.workflow["connections"]
+    assert connections["Trigger"]["main"] == [[link("IF")]]
+    assert connections["Yes"]["main"] == [[link("Notify")]]
+    assert result.summary.connections_added == 1
+    assert result.summary.connections_skipped == 1
+    print(f"   ✅ {result.summary}")
+
+
+def test_id_collision_reassigned():
+    """A new node whose id is taken gets a fresh, unique id"""
+    print("🧪 Testing id collision")
+    new_phase = {
+        "nodes": [node("Send Email", "id-yes")],
+        "connections": {"Yes": {"main": [[link("Send Email")]]}},
+    }
+
+    result = merge_workflows(existing_workflow(), new_phase)
+    nodes = {n["name"]: n for n in result.workflow["nodes"]}
+    assert nodes["Yes"]["id"] == "id-yes"
+    assert nodes["Send Email"]["id"] not in ("id-yes", "", None)
+    assert len({n["id"] for n in result.workflow["nodes"]}) == len(nodes)
+    assert result.summary.ids_reassigned == 1
+    assert result.workflow["connections"]["Yes"]["main"] == [[link("Send Email")]]
+    print(f"   ✅ reassigned to {nodes['Send Email']['id']}")
+
+
+def test_inputs_not_mutated():
+    """Neither input changes, and the result has its own node and edge lists"""
+    print("🧪 Testing inputs are not mutated")
+    existing = existing_workflow()
+    new_phase = {
+        "nodes": [node("IF", "id-if"), node("No", "id-yes")],
+        "connections": {"IF": {"main": [[], [link("No")]]}},
+    }
+    existing_before = copy.deepcopy(existing)
+    new_phase_before = copy.deepcopy(new_phase)
+
+    result = merge_workflows(existing, new_phase)
+    assert existing == existing_before, "existing workflow was mutated"
+    assert new_phase == new_phase_before, "new phase was mutated"
+
+    # The colliding id is reassigned on a copy of the phase's node
+    merged_no = next(n for n in result.workflow["nodes"] if n["name"] == "No")
+    assert merged_no["id"] != "id-yes"
+    assert new_phase["nodes"][1]["id"] == "id-yes"
+    assert result.workflow["nodes"] is not existing["nodes"]
+    assert result.workflow["connections"]["IF"] is not existing["connections"]["IF"]
+    print("   ✅ inputs untouched")
+
+
+# Phases a model may write, and the first error each is refused with
+MALFORMED_PHASES = [
+    (
+        {"nodes": [node("No", "id-no")], "connections": {"IF": {"main": [link("No")]}}},
+        "$.connections.IF.main[0]: must be an array",
+    ),
+    (
+        {"nodes": [node("No", "id-no")], "connections": {"IF": {"main": [["No"]]}}},
+        "$.connections.IF.main[0][0]: connection must be an object",
+    ),
+    (
+        {"nodes": ["No", node("No", "id-no")]},
+        "$.nodes[0]: node must be an object",
+    ),
+    (
+        {
+            "nodes": [node("No", "id-no")],
+            "connections": {"IF": {"main": [[{"node": ["No"]}]]}},
+        },
+        "$.connections.IF.main[0][0].node: is required",
+    ),
+    ({"nodes": {"No": node("No", "id-no")}}, "$.nodes: must be array, got dict"),
+]
+
+
+def test_phase_checks_structure_only():
+    """A phase may wire existing nodes and omit its name; malformed ones fail"""
+    print("🧪 Testing phase validation")
+    from n8n_integration.n8n_client import N8NClient
+
+    client = N8NClient(base_url="http://n8n.invalid", api_key="key")
+    wiring_only = {"connections": {"Yes": {"main": [[link("IF")]]}}}
+    assert client.check_phase(wiring_only).valid
+    assert not client.check_workflow(wiring_only).valid
+    for phase, error in MALFORMED_PHASES:
+        report = client.check_phase(phase)
+        assert str(report.errors[0]) == error, report.summary()
+    print("   ✅ structure checked, references left to the merged workflow")
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers PUTs like n8n does; a GET or POST fails the test"""
+
+    def __init__(self):
+        self.puts = []
+
+    def put(self, url, json=None, **kwargs):
+        self.puts.append(json)
+        return FakeResponse(200, {**json, "id": "wf-1", "versionId": "v2"})
+
+    def get(self, url, **kwargs):
+        raise AssertionError(f"unexpected GET {url}")
+
+    def post(self, url, **kwargs):
+        raise AssertionError(f"unexpected POST {url}")
+
+
+def mirrored_manager():
+    from n8n_integration.n8n_client import N8NClient
+    from n8n_integration.version_store import WorkflowVersionStore
+    from n8n_integration.workflow_manager import WorkflowManager
+    from n8n_integration.workflow_mirror import WorkflowMirror
+
+    manager = WorkflowManager(
+        version_store=WorkflowVersionStore(tempfile.mkdtemp()),
+        mirror=WorkflowMirror(),
+    )
+    manager.client = N8NClient(base_url="http://n8n.invalid", api_key="key")
+    manager.client._session = FakeSession()
+    manager.mirror.store("wf-1", {**existing_workflow(), "versionId": "v1"})
+    return manager
+
+
+def test_malformed_phase_refused_before_merge():
+    """A malformed phase is refused with its own error paths and no request"""
+    print("🧪 Testing malformed phases against the mirror")
+    manager = mirrored_manager()
+    for phase, error in MALFORMED_PHASES:
+        result = manager.commit_workflow(phase, "wf-1")["update_result"]
+        assert not result["success"]
+        assert result["validation_errors"][0] == error, result["details"]
+    assert manager.client._session.puts == []
+    assert manager.mirror.get("wf-1").graph.to_json() == {
+        **existing_workflow(),
+        "versionId": "v1",
+    }
+
+    # A well-formed phase still merges and writes once
+    phase = {
+        "nodes": [node("No", "id-no")],
+        "connections": {"IF": {"main": [[], [link("No")]]}},
+    }
+    result = manager.commit_workflow(phase, "wf-1")["update_result"]
+    assert result["success"], result
+    assert len(manager.client._session.puts) == 1
+    print("   ✅ refused before merging; a valid phase still writes")
+
+
+def test_fold_stops_at_malformed_block():
+    """Folding returns a malformed block on its own instead of merging it"""
+    print("🧪 Testing fold of malformed blocks")
+    manager = mirrored_manager()
+    first = {"name": "Phase 2: Branch", "nodes": [node("No", "id-no")]}
+    for phase, error in MALFORMED_PHASES:
+        assert manager.fold_workflows([first, phase]) is phase
+        result = manager.commit_workflow(manager.fold_workflows([first, phase]), "wf-1")
+        assert result["update_result"]["validation_errors"][0] == error
+    second = {
+        "name": "Phase 3: Notify",
+        "connections": {"No": {"main": [[link("IF")]]}},
+    }
+    folded = manager.fold_workflows([first, second])
+    assert folded["name"] == "Phase 3: Notify"
+    assert folded["connections"] == {"No": {"main": [[link("IF")]]}}
+    assert manager.client._session.puts == []
+    print("   ✅ malformed blocks are reported, not merged")
+
+
+def test_malformed_existing_workflow_kept():
+    """Malformed connections already in the workflow survive a merge as written"""
+    print("🧪 Testing merge into a workflow with malformed connections")
+    existing = existing_workflow()
+    existing["nodes"].append("stray")
+    existing["connections"]["Yes"] = {"main": [link("IF")]}
+    new_phase = {
+        "nodes": [node("No", "id-no")],
+        "connections": {"IF": {"main": [[], [link("No")]]}},
+    }
+
+    result = merge_workflows(existing, new_phase)
+    assert result.workflow["connections"]["Yes"] == {"main": [link("IF")]}
+    assert result.workflow["connections"]["IF"]["main"] == [[link("Yes")], [link("No")]]
+    assert result.workflow["nodes"][3] == {}
+    print("   ✅ existing malformed entries left for n8n's validation to report")
+
+
+if __name__ == "__main__":
+    test_existing_node_gains_output()
+    test_duplicate_edges_skipped()
+    test_id_collision_reassigned()
+    test_inputs_not_mutated()
+    test_phase_checks_structure_only()
+    test_malformed_phase_refused_before_merge()
+    test_fold_stops_at_malformed_block()
+    test_malformed_existing_workflow_kept()
+    print("\n✅ All workflow merge tests passed!")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test keeping the local mirror of n8n workflows fresh
+"""
+
+import json
+import tempfile
+from concurrent.futures import Future
+
+from n8n_integration.workflow_mirror import WorkflowMirror
+
+
+def node(name):
+    return {
+        "id": f"id-{name.lower()}",
+        "name": name,
+        "type": "n8n-nodes-base.set",
+        "typeVersion": 3,
+        "position": [250, 300],
+        "parameters": {},
+    }
+
+
+def workflow(version_id, *names):
+    return {
+        "id": "wf-1",
+        "name": "Phase 1: Intake",
+        "nodes": [node(name) for name in names],
+        "connections": {},
+        "settings": {"executionOrder": "v1"},
+        "versionId": version_id,
+    }
+
+
+def resolved(result):
+    """A finished freshness check returning a get_workflow result"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def node_names(entry):
+    return [n["name"] for n in entry.graph.to_json()["nodes"]]
+
+
+def test_changed_version_replaces_entry():
+    """A check that sees a new versionId replaces the entry and counts as stale"""
+    print("🧪 Testing a workflow edited in n8n")
+    mirror = WorkflowMirror()
+    mirror.store("wf-1", workflow("v1", "Trigger"))
+    edited = workflow("v2", "Trigger", "Added in UI")
+    mirror.start_check("wf-1", resolved({"success": True, "workflow": edited}))
+    entry = mirror.get("wf-1")
+    assert entry.version_id == "v2"
+    assert node_names(entry) == ["Trigger", "Added in UI"]
+    stats = mirror.get_stats()
+    assert (stats["checks"], stats["stale"], stats["hits"]) == (1, 1, 1)
+
+    # A workflow first seen by its check is stored, not counted as stale
+    mirror.start_check("wf-2", resolved({"success": True, "workflow": edited}))
+    assert mirror.get("wf-2").version_id == "v2"
+    assert mirror.get_stats()["stale"] == 1
+    print("   ✅ stale copy replaced")
+
+
+def test_same_version_keeps_entry():
+    """A check that sees the mirrored versionId leaves the entry untouched"""
+    print("🧪 Testing an unchanged workflow")
+    mirror = WorkflowMirror()
+    stored = mirror.store("wf-1", workflow("v1", "Trigger"))
+    mirror.start_check(
+        "wf-1", resolved({"success": True, "workflow": workflow("v1", "Trigger")})
+    )
+    assert mirror.get("wf-1") is stored
+    assert mirror.get("wf-1") is stored, "a check is applied only once"
+    assert mirror.get_stats()["stale"] == 0
+    print("   ✅ entry kept")
+
+
+def test_failed_checks():
+    """A deleted or forbidden workflow is dropped; a transient error keeps it"""
+    print("🧪 Testing failed checks")
+    for status_code, kept in ((404, False), (403, False), (500, True), (None, True)):
+        mirror = WorkflowMirror()
+        mirror.store("wf-1", workflow("v1", "Trigger"))
+        result = {"success": False, "error": "failed"}
+        if status_code is not None:
+            result["status_code"] = status_code
+        mirror.start_check("wf-1", resolved(result))
+        assert (mirror.get("wf-1") is not None) == kept, status_code
+        assert mirror.has("wf-1") == kept
+        print(f"   ✅ {status_code or 'connection error'}: kept={kept}")
+
+    # A check that raised, or did not finish in time, cannot vouch for the copy
+    mirror = WorkflowMirror()
+    mirror.store("wf-1", workflow("v1", "Trigger"))
+    failed = Future()
+    failed.set_exception(ConnectionError("n8n down"))
+    mirror.start_check("wf-1", failed)
+    assert mirror.get("wf-1") is None
+    mirror.store("wf-1", workflow("v1", "Trigger"))
+    mirror.start_check("wf-1", Future())
+    assert mirror.get("wf-1", timeout=0) is None
+    assert mirror.get_stats()["misses"] == 2
+    print("   ✅ raised or unfinished check: dropped")
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Replays scripted n8n answers and records every request"""
+
+    def __init__(self, gets=(), puts=()):
+        self.gets = list(gets)
+        self.puts = list(puts)
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", None))
+        return self.gets.pop(0)
+
+    def put(self, url, json=None, **kwargs):
+        self.requests.append(("PUT", json))
+        status_code, version_id = self.puts.pop(0)
+        return FakeResponse(
+            status_code, {**json, "id": "wf-1", "versionId": version_id}
+        )
+
+    def post(self, url, **kwargs):
+        raise AssertionError(f"unexpected POST {url}")
+
+
+def manager_with(session):
+    from n8n_integration.n8n_client import N8NClient
+    from n8n_integration.version_store import WorkflowVersionStore
+    from n8n_integration.workflow_manager import WorkflowManager
+
+    manager = WorkflowManager(
+        version_store=WorkflowVersionStore(tempfile.mkdtemp()),
+        mirror=WorkflowMirror(),
+    )
+    manager.client = N8NClient(base_url="http://n8n.invalid", api_key="key")
+    manager.client._session = session
+    manager.mirror.store("wf-1", workflow("v1", "Trigger"))
+    return manager
+
+
+def phase():
+    return {"name": "Phase 2: Enrich", "nodes": [node("Enrich")], "connections": {}}
+
+
+def test_commit_merges_against_checked_copy():
+    """After a stale check, the commit merges into n8n's copy with one PUT"""
+    print("🧪 Testing a commit after a freshness check")
+    edited = workflow("v2", "Trigger", "Added in UI")
+    session = FakeSession(gets=[FakeResponse(200, edited)], puts=[(200, "v3")])
+    manager = manager_with(session)
+    manager.start_mirror_check("wf-1")
+    result = manager.commit_workflow(phase(), "wf-1")["update_result"]
+    assert result["success"], result
+    assert [method for method, _ in session.requests] == ["GET", "PUT"]
+    put = session.requests[1][1]
+    assert [n["name"] for n in put["nodes"]] == ["Trigger", "Added in UI", "Enrich"]
+    assert manager.mirror.get("wf-1").version_id == "v3"
+    assert manager.mirror.get_stats()["stale"] == 1
+    print("   ✅ the UI edit survived the merge")
+
+
+def test_conflict_refetches():
+    """A write rejected against the mirror is retried once on n8n's copy"""
+    print("🧪 Testing a conflicting write")
+    edited = workflow("v2", "Trigger", "Added in UI")
+    session = FakeSession(
+        gets=[FakeResponse(200, edited)], puts=[(409, "v1"), (200, "v3")]
+    )
+    manager = manager_with(session)
+    result = manager.commit_workflow(phase(), "wf-1")["update_result"]
+    assert result["success"], result
+    assert [method for method, _ in session.requests] == ["PUT", "GET", "PUT"]
+    assert [n["name"] for n in session.requests[0][1]["nodes"]] == ["Trigger", "Enrich"]
+    assert [n["name"] for n in session.requests[2][1]["nodes"]] == [
+        "Trigger",
+        "Added in UI",
+        "Enrich",
+    ]
+    assert manager.mirror.get_stats()["conflicts"] == 1
+    assert manager.mirror.get("wf-1").version_id == "v3"
+
+    # A second rejection is reported, not retried again
+    session = FakeSession(
+        gets=[FakeResponse(200, edited)], puts=[(409, "v1"), (409, "v2")]
+    )
+    manager = manager_with(session)
+    result = manager.commit_workflow(phase(), "wf-1")["update_result"]
+    assert result["status_code"] == 409
+    assert [method for method, _ in session.requests] == ["PUT", "GET", "PUT"]
+    assert manager.mirror.get("wf-1").version_id == "v2"
+    print("   ✅ refetched and retried once")
+
+
+if __name__ == "__main__":
+    test_changed_version_replaces_entry()
+    test_same_version_keeps_entry()
+    test_failed_checks()
+    test_commit_merges_against_checked_copy()
+    test_conflict_refetches()
+    print("\n✅ All workflow mirror tests passed!")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Test the pre-flight workflow validator and its JSON error paths
+"""
+
+import copy
+
+from n8n_integration.node_catalog import NodeType
+from n8n_integration.workflow_validator import api_payload, get_validator
+
+
+def node(name, node_id=None, **fields):
+    data = {
+        "name": name,
+        "type": "n8n-nodes-base.set",
+        "typeVersion": 3,
+        "position": [250, 300],
+        "parameters": {},
+    }
+    if node_id is not None:
+        data["id"] = node_id
+    data.update(fields)
+    return data
+
+
+def link(target, **fields):
+    return {"node": target, "type": "main", "index": 0, **fields}
+
+
+def errors_of(workflow, node_types=None):
+    report = get_validator().validate(workflow, node_types=node_types)
+    return [str(issue) for issue in report.errors]
+
+
+def test_valid_workflow():
+    """A well-formed workflow has no errors and is left untouched"""
+    print("🧪 Testing valid workflow")
+    workflow = {
+        "name": "Phase 1: Intake",
+        "nodes": [node("Trigger", "a"), node("Set", "b")],
+        "connections": {"Trigger": {"main": [[link("Set")], None]}},
+        "settings": {},
+    }
+    before = copy.deepcopy(workflow)
+    report = get_validator().validate(workflow)
+    assert report.valid, report.summary()
+    assert workflow == before
+    print("   ✅ valid")
+
+
+def test_duplicate_names_and_ids():
+    """Every repeat is reported once, pointing at the first occurrence"""
+    print("🧪 Testing duplicate names and ids")
+    workflow = {
+        "name": "Duplicates",
+        "nodes": [
+            node("Set", "a"),
+            node("Set", "b"),
+            node("Other", "a"),
+            node("Set", "a"),
+        ],
+    }
+    errors = errors_of(workflow)
+    print("   " + "\n   ".join(errors))
+    assert errors == [
+        "$.nodes[1].name: duplicate node name 'Set' (also $.nodes[0])",
+        "$.nodes[2].id: duplicate node id 'a' (also $.nodes[0])",
+        "$.nodes[3].name: duplicate node name 'Set' (also $.nodes[0])",
+        "$.nodes[3].id: duplicate node id 'a' (also $.nodes[0])",
+    ]
+
+
+def test_empty_names_are_not_duplicates():
+    """Empty names are reported as empty, not as duplicates of each other"""
+    print("🧪 Testing empty names")
+    workflow = {"name": "Empty", "nodes": [node(""), node("  ")]}
+    assert errors_of(workflow) == [
+        "$.nodes[0].name: is empty",
+        "$.nodes[1].name: is empty",
+    ]
+    print("   ✅ empty names")
+
+
+def test_dangling_connections():
+    """Connections from or to missing nodes are located by their JSON path"""
+    print("🧪 Testing dangling sources and targets")
+    workflow = {
+        "name": "Dangling",
+        "nodes": [node("Trigger"), node("Set")],
+        "connections": {
+            "Trigger": {"main": [[link("Set"), link("Missing")]]},
+            "Ghost": {"main": [[link("Set")]]},
+            "Set Data": {"main": [[], [link("Nowhere")]]},
+        },
+    }
+    errors = errors_of(workflow)
+    print("   " + "\n   ".join(errors))
+    assert errors == [
+        "$.connections.Trigger.main[0][1].node: target node 'Missing' does not exist",
+        "$.connections.Ghost: source node 'Ghost' does not exist",
+        "$.connections['Set Data']: source node 'Set Data' does not exist",
+        "$.connections['Set Data'].main[1][0].node: "
+        "target node 'Nowhere' does not exist",
+    ]
+
+
+def test_malformed_connections():
+    """Malformed connection entries are reported instead of raising"""
+    print("🧪 Testing malformed connections")
+    workflow = {
+        "name": "Malformed",
+        "nodes": [node("Trigger"), node("Set")],
+        "connections": {
+            "Trigger": {"main": [[link("Set", index=-1), "Set", link(None)]]},
+            "Set": {"main": "Trigger"},
+        },
+    }
+    assert errors_of(workflow) == [
+        "$.connections.Trigger.main[0][0].index: must be a non-negative integer",
+        "$.connections.Trigger.main[0][1]: connection must be an object",
+        "$.connections.Trigger.main[0][2].node: is required",
+        "$.connections.Set.main: must be an array",
+    ]
+    print("   ✅ malformed connections")
+
+
+def test_type_version_and_position():
+    """typeVersion must be a number of at least 1; position two numbers"""
+    print("🧪 Testing typeVersion and position")
+    workflow = {
+        "name": "Fields",
+        "nodes": [
+            node("A", typeVersion=0),
+            node("B", typeVersion="2"),
+            node("C", typeVersion=True),
+            node("D", position=[1]),
+            node("E", position=[1, "2"]),
+            node("F", position="1,2"),
+            node("G", typeVersion=1.5, position=[0.5, -3]),
+        ],
+    }
+    errors = errors_of(workflow)
+    print("   " + "\n   ".join(errors))
+    assert errors == [
+        "$.nodes[0].typeVersion: must be 1 or greater",
+        "$.nodes[1].typeVersion: must be number, got str",
+        "$.nodes[2].typeVersion: must be number, got bool",
+        "$.nodes[3].position: must be two numbers [x, y]",
+        "$.nodes[4].position: must be two numbers [x, y]",
+        "$.nodes[5].position: must be array, got str",
+    ]
+
+
+def test_structure_errors():
+    """Missing and mistyped fields, at the workflow and node level"""
+    print("🧪 Testing structural errors")
+    assert errors_of([]) == ["$: workflow must be an object"]
+    assert errors_of({"nodes": []}) == [
+        "$.name: is required",
+        "$.nodes: must contain at least one node",
+    ]
+    workflow = {
+        "name": "Structure",
+        "nodes": ["Trigger", {"name": "Set"}, node("Code", parameters=[])],
+        "connections": [],
+        "settings": None,
+    }
+    errors = errors_of(workflow)
+    print("   " + "\n   ".join(errors))
+    assert errors == [
+        "$.connections: must be object, got list",
+        "$.settings: must be object, got NoneType",
+        "$.nodes[0]: node must be an object",
+        "$.nodes[1].type: is required",
+        "$.nodes[2].parameters: must be object, got list",
+    ]
+
+
+def test_node_type_catalog():
+    """With a catalog, node types and versions must exist on the instance"""
+    print("🧪 Testing node types against a catalog")
+    catalog = {
+        "n8n-nodes-base.set": NodeType("n8n-nodes-base.set", "Set", (1, 2, 3, 3.4))
+    }
+    workflow = {
+        "name": "Catalog",
+        "nodes": [
+            node("A"),
+            node("B", typeVersion=9),
+            node("C", type="n8n-nodes-base.unknown"),
+        ],
+    }
+    assert errors_of(workflow) == []
+    errors = errors_of(workflow, node_types=catalog)
+    print("   " + "\n   ".join(errors))
+    assert errors == [
+        "$.nodes[1].typeVersion: version 9 of 'n8n-nodes-base.set' is not "
+        "available (available: 1, 2, 3, 3.4)",
+        "$.nodes[2].type: node type 'n8n-nodes-base.unknown' is not installed "
+        "on the n8n instance",
+    ]
+
+
+def test_input_not_mutated():
+    """Validation and api_payload leave the workflow as it was"""
+    print("🧪 Testing the input is not mutated")
+    workflow = {
+        "name": "Untouched",
+        "id": "wf-1",
+        "active": True,
+        "tags": [{"name": "x"}],
+        "nodes": [node("Set", "a"), node("Set", "a", typeVersion=0), "bad"],
+        "connections": {"Set": {"main": [[link("Missing")]]}},
+    }
+    before = copy.deepcopy(workflow)
+    assert not get_validator().validate(workflow).valid
+    payload = api_payload(workflow)
+    assert workflow == before, "validation or api_payload mutated the workflow"
+    assert "id" not in payload and "active" not in payload and "tags" not in payload
+    assert payload["settings"] == {} and payload["nodes"] is workflow["nodes"]
+    print("   ✅ input untouched")
+
+
+if __name__ == "__main__":
+    test_valid_workflow()
+    test_duplicate_names_and_ids()
+    test_empty_names_are_not_duplicates()
+    test_dangling_connections()
+    test_malformed_connections()
+    test_type_version_and_position()
+    test_structure_errors()
+    test_node_type_catalog()
+    test_input_not_mutated()
+    print("\n✅ All workflow validator tests passed!")
@@ -0,0 +1,209 @@
+"""
+BuildMap Tracing - Lightweight nested spans per chat turn, exported as JSONL
+
+Spans use OTLP-style field names (traceId, spanId, parentSpanId,
+startTimeUnixNano, ...) so the file can be converted for any OTLP viewer.
+Standard library only, so both integration packages can import it.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Tracing is off unless a file is configured
+TRACE_FILE = os.environ.get("BUILDMAP_TRACE_FILE", "")
+# Fraction of turns traced, 0.0-1.0
+TRACE_SAMPLE_RATE = float(os.environ.get("BUILDMAP_TRACE_SAMPLE_RATE", "1.0"))
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar(
+    "buildmap_current_span", default=None
+)
+
+
+class _NoopSpan:
+    """Returned when the turn is not traced; every operation does nothing"""
+
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed operation inside a traced turn"""
+
+    __slots__ = (
+        "tracer",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_ns",
+        "status",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        trace_id: str,
+        parent_id: Optional[str],
+        name: str,
+        attributes: Dict[str, Any],
+    ):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.status = "OK"
+        self._token = None
+
+    def set(self, **attributes):
+        """Add attributes to the span"""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.status = "ERROR"
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._export(self, time.time_ns())
+        return False
+
+
+class Tracer:
+    """Creates spans for sampled turns and appends them to a JSONL file
+
+    `turn()` opens the root span and decides sampling once per turn; spans
+    opened inside it nest through a context variable. When tracing is off
+    or the turn is not sampled, `span()` returns a shared no-op object, so
+    instrumented code pays one context-variable lookup.
+    """
+
+    def __init__(self, path: str = None, sample_rate: float = None):
+        self.path = TRACE_FILE if path is None else path
+        self.sample_rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.sample_rate > 0
+
+    def turn(self, name: str = "turn", **attributes):
+        """Root span of one chat turn (a new trace), or a no-op if unsampled"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        return Span(self, secrets.token_hex(16), None, name, attributes)
+
+    def span(self, name: str, **attributes):
+        """Child of the current span, or a no-op outside a traced turn"""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, parent.trace_id, parent.span_id, name, attributes)
+
+    def record_span(
+        self, name: str, start_ns: int, end_ns: int, parent=None, **attributes
+    ):
+        """Record an already finished span and return it (or the no-op span)
+
+        Useful inside generators, where a `with` block would leave the span
+        current while the generator is suspended. Pass the returned span as
+        `parent` to record its children.
+        """
+        parent = parent or _current_span.get()
+        if parent is None or parent.span_id is None:
+            return NOOP_SPAN
+        span = Span(self, parent.trace_id, parent.span_id, name, attributes)
+        span.start_ns = start_ns
+        self._export(span, end_ns)
+        return span
+
+    def current_span(self):
+        """The innermost open span, or the no-op span"""
+        return _current_span.get() or NOOP_SPAN
+
+    def wrap(self, func: Callable) -> Callable:
+        """Bind `func` to the current context so spans nest across threads"""
+        if _current_span.get() is None:
+            return func
+        context = contextvars.copy_context()
+
+        def run(*args, **kwargs):
+            return context.run(func, *args, **kwargs)
+
+        return run
+
+    def _export(self, span: Span, end_ns: int):
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id,
+            "name": span.name,
+            "startTimeUnixNano": span.start_ns,
+            "endTimeUnixNano": end_ns,
+            "durationMs": round((end_ns - span.start_ns) / 1e6, 3),
+            "status": span.status,
+            "attributes": span.attributes,
+        }
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError:
+                # Tracing must never break a turn
+                pass
+
+
+# Singleton tracer shared by all sessions
+tracer = Tracer()
+
+
+def traced(name: str) -> Callable:
+    """Decorator that runs the function inside a span named `name`
+
+    Result dicts get their `success` and `status_code` recorded on the span.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name) as span:
+                result = func(*args, **kwargs)
+                if isinstance(result, dict) and "success" in result:
+                    span.set(
+                        success=result["success"],
+                        status_code=result.get("status_code"),
+                    )
+                return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,235 @@
+"""
+BuildMap Version Store - Local per-phase workflow snapshots stored as deltas
+"""
+
+import copy
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from n8n_integration.workflow_graph import WorkflowGraph
+
+VERSION_STORE_DIR = Path(
+    os.environ.get(
+        "BUILDMAP_VERSION_DIR",
+        Path(__file__).parent.parent / ".cache" / "versions",
+    )
+)
+# Store a full snapshot at least every N versions so a restore replays few deltas
+VERSION_KEYFRAME_INTERVAL = int(
+    os.environ.get("BUILDMAP_VERSION_KEYFRAME_INTERVAL", "10")
+)
+
+_MISSING = object()
+
+
+class WorkflowVersion(NamedTuple):
+    """One stored version of a workflow"""
+
+    version: int
+    name: str
+    action: str  # "create", "update" or "rollback"
+    created: float
+
+
+def _graph(workflow: Union[Dict[str, Any], WorkflowGraph]) -> WorkflowGraph:
+    if isinstance(workflow, WorkflowGraph):
+        return workflow
+    return WorkflowGraph.from_json(workflow)
+
+
+def diff_workflows(
+    old: Union[Dict[str, Any], WorkflowGraph],
+    new: Union[Dict[str, Any], WorkflowGraph],
+) -> Optional[Dict]:
+    """Delta that turns `old` into `new`, or None if only a snapshot will do
+
+    Runs on `WorkflowGraph`s; JSON arguments are loaded into one first.
+    Nodes are keyed by name through the graph's name index (as
+    `merge_workflows` does), connections by source node, and every other
+    top-level field by key. Unnamed or duplicate-named nodes cannot key a
+    delta.
+    """
+    old, new = _graph(old), _graph(new)
+    if len(old.by_name) != len(old.nodes) or len(new.by_name) != len(new.nodes):
+        return None
+
+    new_sources = new.connection_sources()
+    kept_sources = set(new_sources)
+    return {
+        "fields": {
+            key: value
+            for key, value in new.fields.items()
+            if old.fields.get(key, _MISSING) != value
+        },
+        "removed": [key for key in old.fields if key not in new.fields],
+        "nodes": [
+            node.to_json() for node in new.nodes if old.by_name.get(node.name) != node
+        ],
+        "order": [node.name for node in new.nodes],
+        "connections": {
+            source: new.source_connections_json(source)
+            for source in new_sources
+            if not new.same_connections(old, source)
+        },
+        "disconnected": [
+            source for source in old.connection_sources() if source not in kept_sources
+        ],
+    }
+
+
+def apply_delta(old: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a `diff_workflows` delta to a copy of `old`"""
+    removed, disconnected = set(delta["removed"]), set(delta["disconnected"])
+    workflow = {key: value for key, value in old.items() if key not in removed}
+    workflow.update(copy.deepcopy(delta["fields"]))
+
+    nodes = {node["name"]: node for node in old.get("nodes", [])}
+    nodes.update({node["name"]: node for node in copy.deepcopy(delta["nodes"])})
+    workflow["nodes"] = [nodes[name] for name in delta["order"]]
+
+    connections = {
+        source: value
+        for source, value in old.get("connections", {}).items()
+        if source not in disconnected
+    }
+    connections.update(copy.deepcopy(delta["connections"]))
+    workflow["connections"] = connections
+    return workflow
+
+
+class WorkflowVersionStore:
+    """Every committed version of each workflow, kept locally for rollback
+
+    Each workflow has an append-only `<workflow id>.jsonl` file. A version
+    is stored as a delta against the previous one, with a full snapshot as
+    the first record, every `keyframe_interval` versions, and whenever the
+    delta would not be smaller. Restoring a version replays at most one
+    keyframe interval of deltas and needs no request to n8n. The newest
+    version of each workflow is held as a `WorkflowGraph` to diff the next
+    one against.
+    """
+
+    def __init__(self, directory: Path = None, keyframe_interval: int = None):
+        self.directory = Path(directory or VERSION_STORE_DIR)
+        self.keyframe_interval = keyframe_interval or VERSION_KEYFRAME_INTERVAL
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        self._latest: Dict[str, WorkflowGraph] = {}  # newest version, materialized
+        self._lock = threading.Lock()
+
+    def _path(self, workflow_id: str) -> Path:
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", str(workflow_id))
+        return self.directory / f"{safe_id}.jsonl"
+
+    def _load(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """Records of `workflow_id`, read from disk on first use
+
+        A last line without its newline was cut short by an interrupted
+        write; it is truncated away so the next record starts a line of its
+        own instead of being glued onto the broken one.
+        """
+        if workflow_id not in self._records:
+            records = []
+            path = self._path(workflow_id)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = b""
+            lines = data.split(b"\n")
+            tail = lines.pop()  # empty when the file ends with a newline
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+            if tail:
+                try:
+                    with open(path, "r+b") as f:
+                        f.truncate(len(data) - len(tail))
+                except OSError:
+                    pass
+            self._records[workflow_id] = records
+            if records:
+                self._latest[workflow_id] = WorkflowGraph.from_json(
+                    self._materialize(records, len(records))
+                )
+        return self._records[workflow_id]
+
+    def _materialize(
+        self, records: List[Dict[str, Any]], version: int
+    ) -> Dict[str, Any]:
+        """Rebuild version `version` (1-based) from the nearest keyframe"""
+        start = version - 1
+        while records[start]["kind"] != "full":
+            start -= 1
+        workflow = copy.deepcopy(records[start]["data"])
+        for record in records[start + 1 : version]:
+            workflow = apply_delta(workflow, record["data"])
+        return workflow
+
+    def record(
+        self, workflow_id: str, workflow_json: Dict[str, Any], action: str
+    ) -> WorkflowVersion:
+        """Store `workflow_json` as the next version of `workflow_id`
+
+        The workflow is serialized once; the stored copy is parsed back from
+        that text, and the text is written as is when no smaller delta exists.
+        """
+        snapshot_json = json.dumps(workflow_json, ensure_ascii=False)
+        snapshot = json.loads(snapshot_json)
+        graph = WorkflowGraph.from_json(snapshot)
+        with self._lock:
+            records = self._load(workflow_id)
+            version = len(records) + 1
+
+            kind, data, data_json = "full", snapshot, snapshot_json
+            if records and (version - 1) % self.keyframe_interval:
+                delta = diff_workflows(self._latest[workflow_id], graph)
+                if delta is not None:
+                    delta_json = json.dumps(delta, ensure_ascii=False)
+                    if len(delta_json) < len(snapshot_json):
+                        kind, data, data_json = "delta", delta, delta_json
+
+            entry = WorkflowVersion(
+                version, snapshot.get("name", "Unnamed"), action, time.time()
+            )
+            header = json.dumps({**entry._asdict(), "kind": kind}, ensure_ascii=False)
+            record = {**entry._asdict(), "kind": kind, "data": data}
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(workflow_id), "a", encoding="utf-8") as f:
+                f.write(f'{header[:-1]}, "data": {data_json}}}\n')
+            records.append(record)
+            self._latest[workflow_id] = graph
+        return entry
+
+    def versions(self, workflow_id: str) -> List[WorkflowVersion]:
+        """All stored versions of `workflow_id`, oldest first"""
+        with self._lock:
+            return [
+                WorkflowVersion(
+                    record["version"],
+                    record["name"],
+                    record["action"],
+                    record["created"],
+                )
+                for record in self._load(workflow_id)
+            ]
+
+    def get(self, workflow_id: str, version: int) -> Optional[Dict[str, Any]]:
+        """Full workflow JSON of `version`, or None if it was never stored"""
+        with self._lock:
+            records = self._load(workflow_id)
+            if not 1 <= version <= len(records):
+                return None
+            if version == len(records):
+                return copy.deepcopy(self._latest[workflow_id].to_json())
+            return self._materialize(records, version)
+
+
+# Singleton store shared by all sessions
+workflow_versions = WorkflowVersionStore()
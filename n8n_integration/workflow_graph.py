@@ -0,0 +1,446 @@
+"""
+BuildMap Workflow Graph - Compact indexed model of an n8n workflow
+"""
+
+import uuid
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# Marks a node field that was absent in the JSON, so dumps stay lossless
+_ABSENT = object()
+
+_NODE_FIELDS = (
+    ("name", "name"),
+    ("id", "id"),
+    ("type", "type"),
+    ("type_version", "typeVersion"),
+    ("position", "position"),
+    ("parameters", "parameters"),
+)
+_NODE_JSON_KEYS = tuple(key for _, key in _NODE_FIELDS)
+_NODE_KEYS = frozenset(_NODE_JSON_KEYS)
+_EDGE_KEYS = ("node", "type", "index")
+
+
+class MergeSummary(NamedTuple):
+    """What a merge changed"""
+
+    nodes_added: int
+    nodes_skipped: int  # same name as an existing node; the existing one is kept
+    ids_reassigned: int  # new nodes whose id was already taken
+    connections_added: int
+    connections_skipped: int  # already present
+
+
+class Node:
+    """One workflow node; keys other than the common ones live in `extra`"""
+
+    __slots__ = (
+        "name",
+        "id",
+        "type",
+        "type_version",
+        "position",
+        "parameters",
+        "extra",
+    )
+
+    def __init__(self, data: Dict[str, Any]):
+        get = data.get
+        self.name = get("name", _ABSENT)
+        self.id = get("id", _ABSENT)
+        self.type = get("type", _ABSENT)
+        self.type_version = get("typeVersion", _ABSENT)
+        self.position = get("position", _ABSENT)
+        self.parameters = get("parameters", _ABSENT)
+        self.extra = None
+        if not _NODE_KEYS.issuperset(data):
+            self.extra = {key: data[key] for key in data if key not in _NODE_KEYS}
+
+    def get(self, attribute: str, default: Any = None) -> Any:
+        value = getattr(self, attribute)
+        return default if value is _ABSENT else value
+
+    def to_json(self) -> Dict[str, Any]:
+        values = (
+            self.name,
+            self.id,
+            self.type,
+            self.type_version,
+            self.position,
+            self.parameters,
+        )
+        data = {
+            key: value
+            for key, value in zip(_NODE_JSON_KEYS, values)
+            if value is not _ABSENT
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self) -> "Node":
+        node = Node.__new__(Node)
+        for attribute in Node.__slots__:
+            setattr(node, attribute, getattr(self, attribute))
+        return node
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return _node_values(self) == _node_values(other)
+
+    __hash__ = None
+
+
+class Edge:
+    """A connection from one output slot of `source` to an input of `target`"""
+
+    __slots__ = (
+        "source",
+        "output_type",
+        "output_index",
+        "target",
+        "input_type",
+        "input_index",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        output_type: str,
+        output_index: int,
+        target: Optional[str],
+        input_type: Any = _ABSENT,
+        input_index: Any = _ABSENT,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.source = source
+        self.output_type = output_type
+        self.output_index = output_index
+        self.target = target
+        self.input_type = input_type
+        self.input_index = input_index
+        self.extra = extra
+
+    @classmethod
+    def from_json(
+        cls, source: str, output_type: str, output_index: int, data: Dict[str, Any]
+    ) -> "Edge":
+        extra = {key: value for key, value in data.items() if key not in _EDGE_KEYS}
+        return cls(
+            source,
+            output_type,
+            output_index,
+            data.get("node"),
+            data.get("type", _ABSENT),
+            data.get("index", _ABSENT),
+            extra or None,
+        )
+
+    @property
+    def key(self) -> Tuple:
+        """Identity of the edge; a graph holds each key once"""
+        return (
+            self.source,
+            self.output_type,
+            self.output_index,
+            self.target,
+            self.input_type if self.input_type is not _ABSENT else None,
+            self.input_index if self.input_index is not _ABSENT else None,
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Edge):
+            return NotImplemented
+        return _edge_values(self) == _edge_values(other)
+
+    __hash__ = None
+
+    def to_json(self) -> Dict[str, Any]:
+        data = {"node": self.target}
+        if self.input_type is not _ABSENT:
+            data["type"] = self.input_type
+        if self.input_index is not _ABSENT:
+            data["index"] = self.input_index
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+_node_values = attrgetter(*Node.__slots__)
+_edge_values = attrgetter(*Edge.__slots__)
+
+
+def _indexable(outputs: Any) -> bool:
+    """Whether a source's outputs are slot lists of edges with a string target"""
+    return isinstance(outputs, dict) and all(
+        isinstance(slots, list)
+        and all(
+            edges is None
+            or isinstance(edges, list)
+            and all(
+                isinstance(edge, dict) and isinstance(edge.get("node"), str)
+                for edge in edges
+            )
+            for edges in slots
+        )
+        for slots in outputs.values()
+    )
+
+
+class WorkflowGraph:
+    """An n8n workflow as slotted node and edge records with indexes
+
+    Nodes are indexed by name and id; edges by source (forward adjacency)
+    and by target (reverse adjacency). `from_json()` and `to_json()` round
+    trip n8n workflow JSON: `to_json(from_json(w)) == w`, with null output
+    slots written back as empty lists. Nested values such as node
+    parameters are shared with the JSON they came from and are treated as
+    read-only. Loading, dumping, merging and diffing are linear in graph
+    size; duplicate edges are found through a per-source key set.
+    """
+
+    __slots__ = (
+        "fields",
+        "nodes",
+        "by_name",
+        "by_id",
+        "edges",
+        "outgoing",
+        "incoming",
+        "duplicate_names",
+        "duplicate_ids",
+        "_edge_keys",
+        "_slot_counts",
+        "_raw_connections",
+        "_has_connections",
+    )
+
+    def __init__(self, fields: Dict[str, Any] = None):
+        self.fields: Dict[str, Any] = dict(fields or {})  # other top-level keys
+        self.nodes: List[Node] = []
+        self.by_name: Dict[str, Node] = {}
+        self.by_id: Dict[str, Node] = {}
+        self.edges: List[Edge] = []
+        self.outgoing: Dict[str, List[Edge]] = {}
+        self.incoming: Dict[str, List[Edge]] = {}
+        self.duplicate_names: Set[str] = set()
+        self.duplicate_ids: Set[str] = set()
+        # Keys of each source's outgoing edges, for O(1) duplicate checks
+        self._edge_keys: Dict[str, Set[Tuple]] = {}
+        # Output slots per source and type, so empty slots survive a dump
+        self._slot_counts: Dict[str, Dict[str, int]] = {}
+        # Connection entries that are not {type: [[edge, ...], ...]}, kept as is
+        self._raw_connections: Dict[str, Any] = {}
+        self._has_connections = False
+
+    @classmethod
+    def from_json(cls, workflow: Dict[str, Any]) -> "WorkflowGraph":
+        graph = cls(
+            {
+                key: value
+                for key, value in workflow.items()
+                if key not in ("nodes", "connections")
+            }
+        )
+        nodes = workflow.get("nodes")
+        for data in nodes if isinstance(nodes, list) else ():
+            # A non-object holds its place, as in the validator
+            graph.add_node(Node(data if isinstance(data, dict) else {}))
+
+        graph._has_connections = "connections" in workflow
+        connections = workflow.get("connections")
+        if not isinstance(connections, dict):
+            return graph
+        for source, outputs in connections.items():
+            if not _indexable(outputs):
+                # Kept as written, for the validator to report
+                graph._raw_connections[source] = outputs
+                continue
+            graph._slot_counts[source] = {}
+            for output_type, slots in outputs.items():
+                graph._add_slots(source, output_type, len(slots))
+                for index, edges in enumerate(slots):
+                    for data in edges or []:
+                        graph.add_edge(Edge.from_json(source, output_type, index, data))
+        return graph
+
+    def to_json(self) -> Dict[str, Any]:
+        workflow = dict(self.fields)
+        workflow["nodes"] = [node.to_json() for node in self.nodes]
+        if self._has_connections or self.edges or self._raw_connections:
+            workflow["connections"] = self.connections_json()
+        return workflow
+
+    def connections_json(self) -> Dict[str, Any]:
+        """The `connections` object of `to_json()`"""
+        connections: Dict[str, Any] = {}
+        for source, counts in self._slot_counts.items():
+            connections[source] = {
+                output_type: [[] for _ in range(count)]
+                for output_type, count in counts.items()
+            }
+        for edge in self.edges:
+            connections[edge.source][edge.output_type][edge.output_index].append(
+                edge.to_json()
+            )
+        connections.update(self._raw_connections)
+        return connections
+
+    def connection_sources(self) -> List[str]:
+        """Keys of `connections_json()`, in order"""
+        return list(dict.fromkeys([*self._slot_counts, *self._raw_connections]))
+
+    def source_connections_json(self, source: str) -> Any:
+        """The `connections_json()` entry of `source`, or None if it has none"""
+        if source in self._raw_connections:
+            return self._raw_connections[source]
+        counts = self._slot_counts.get(source)
+        if counts is None:
+            return None
+        outputs = {
+            output_type: [[] for _ in range(count)]
+            for output_type, count in counts.items()
+        }
+        for edge in self.outgoing.get(source, ()):
+            outputs[edge.output_type][edge.output_index].append(edge.to_json())
+        return outputs
+
+    def same_connections(self, other: "WorkflowGraph", source: str) -> bool:
+        """Whether `source` has the same connections in both graphs"""
+        return (
+            self._raw_connections.get(source, _ABSENT)
+            == other._raw_connections.get(source, _ABSENT)
+            and self._slot_counts.get(source) == other._slot_counts.get(source)
+            and self.outgoing.get(source, []) == other.outgoing.get(source, [])
+        )
+
+    def copy(self) -> "WorkflowGraph":
+        """Independent graph with the same content (records are copied)"""
+        graph = WorkflowGraph(self.fields)
+        for node in self.nodes:
+            graph.add_node(node.copy())
+        for source, counts in self._slot_counts.items():
+            graph._slot_counts[source] = dict(counts)
+        for edge in self.edges:
+            graph.add_edge(
+                Edge(
+                    edge.source,
+                    edge.output_type,
+                    edge.output_index,
+                    edge.target,
+                    edge.input_type,
+                    edge.input_index,
+                    edge.extra,
+                )
+            )
+        graph._raw_connections = dict(self._raw_connections)
+        graph._has_connections = self._has_connections
+        return graph
+
+    def add_node(self, node: Node):
+        """Append a node; duplicate names and ids are kept but recorded
+
+        Only string names and non-empty string ids are indexed.
+        """
+        self.nodes.append(node)
+        name = node.get("name")
+        if isinstance(name, str):
+            if name in self.by_name:
+                self.duplicate_names.add(name)
+            else:
+                self.by_name[name] = node
+        node_id = node.get("id")
+        if node_id and isinstance(node_id, str):
+            if node_id in self.by_id:
+                self.duplicate_ids.add(node_id)
+            else:
+                self.by_id[node_id] = node
+
+    def add_edge(self, edge: Edge) -> bool:
+        """Add an edge unless the same edge is already present"""
+        keys = self._edge_keys.setdefault(edge.source, set())
+        key = edge.key
+        try:
+            if key in keys:
+                return False
+            keys.add(key)
+        except TypeError:
+            # Unhashable input type or index from malformed JSON; compare by value
+            if any(other.key == key for other in self.outgoing.get(edge.source, ())):
+                return False
+        self._add_slots(edge.source, edge.output_type, edge.output_index + 1)
+        self.edges.append(edge)
+        self.outgoing.setdefault(edge.source, []).append(edge)
+        self.incoming.setdefault(edge.target, []).append(edge)
+        return True
+
+    def _add_slots(self, source: str, output_type: str, count: int):
+        counts = self._slot_counts.setdefault(source, {})
+        if counts.get(output_type, 0) < count:
+            counts[output_type] = count
+
+    def node(self, name: str) -> Optional[Node]:
+        return self.by_name.get(name)
+
+    def node_by_id(self, node_id: str) -> Optional[Node]:
+        return self.by_id.get(node_id)
+
+    def successors(self, name: str) -> Iterator[str]:
+        """Names of the nodes `name` connects to"""
+        return (edge.target for edge in self.outgoing.get(name, ()))
+
+    def predecessors(self, name: str) -> Iterator[str]:
+        """Names of the nodes that connect to `name`"""
+        return (edge.source for edge in self.incoming.get(name, ()))
+
+    def dangling_edges(self) -> List[Edge]:
+        """Edges whose source or target is not a node of the graph"""
+        return [
+            edge
+            for edge in self.edges
+            if edge.source not in self.by_name or edge.target not in self.by_name
+        ]
+
+    def merge(self, phase: "WorkflowGraph") -> MergeSummary:
+        """Merge `phase` into this graph in place
+
+        A node whose name already exists is skipped; one whose id is taken
+        gets a fresh id. Edges are merged per source node, output type and
+        output index, skipping edges that already exist. Top-level fields
+        of this graph are kept. Connections of `phase` that could not be
+        indexed are not merged; validate the phase first.
+        """
+        nodes_added = nodes_skipped = ids_reassigned = 0
+        for node in phase.nodes:
+            if isinstance(node.name, str) and node.name in self.by_name:
+                nodes_skipped += 1
+                continue
+            if isinstance(node.id, str) and node.id in self.by_id:
+                node = node.copy()
+                node.id = str(uuid.uuid4())
+                ids_reassigned += 1
+            self.add_node(node)
+            nodes_added += 1
+
+        connections_added = connections_skipped = 0
+        for edge in phase.edges:
+            if self.add_edge(edge):
+                connections_added += 1
+            else:
+                connections_skipped += 1
+        for source, counts in phase._slot_counts.items():
+            for output_type, count in counts.items():
+                self._add_slots(source, output_type, count)
+        if phase._has_connections:
+            self._has_connections = True
+
+        return MergeSummary(
+            nodes_added,
+            nodes_skipped,
+            ids_reassigned,
+            connections_added,
+            connections_skipped,
+        )
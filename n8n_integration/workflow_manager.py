@@ -2,21 +2,47 @@
 BuildMap Workflow Manager - Handles workflow creation and phase management
 """
 
-import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import streamlit as st
 
+from n8n_integration.json_extractor import (
+    JSON_FENCES,
+    JsonObjectScanner,
+    extract_all_workflow_jsons,
+    extract_workflow_json,
+    is_workflow_candidate,
+)
+from n8n_integration.export_writer import ExportWriter
 from n8n_integration.n8n_client import n8n_client
+from n8n_integration.tracing import traced, tracer
+from n8n_integration.version_store import WorkflowVersionStore, workflow_versions
+from n8n_integration.workflow_graph import WorkflowGraph
+from n8n_integration.workflow_mirror import WorkflowMirror, workflow_mirror
+
+# Background workers for n8n requests started while the model is still streaming
+_request_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="n8n-request")
 
 
 class WorkflowManager:
     """Manages workflow creation and phase-by-phase building"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        export_writer: Optional[ExportWriter] = None,
+        version_store: Optional[WorkflowVersionStore] = None,
+        mirror: Optional[WorkflowMirror] = None,
+    ):
         self.client = n8n_client
+        # When set, every workflow version written to n8n is also exported
+        self.export_writer = export_writer
+        # Local copy of every committed version, used for rollback
+        self.version_store = version_store or workflow_versions
+        # n8n's latest copy of each workflow, so updates need not fetch first
+        self.mirror = mirror or workflow_mirror
 
     def initialize_session_state(self):
         """Initialize workflow-related session state variables"""
@@ -29,78 +55,96 @@ class WorkflowManager:
         if "workflow_phase_history" not in st.session_state:
             st.session_state.workflow_phase_history = []
 
+    @traced("workflow.extract")
     def extract_workflow_json_from_text(self, text: str) -> Optional[Dict[str, Any]]:
-        """Extract workflow JSON from AI response text"""
-        # Look for JSON in code blocks (more flexible pattern)
-        json_match = re.search(r"```json\n(.*?)\n```", text, re.DOTALL)
-
-        if json_match:
-            try:
-                json_str = json_match.group(1).strip()
-                workflow_json = json.loads(json_str)
-                return workflow_json
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                return None
-
-        # Try alternative code block patterns
-        alt_matches = [
-            re.search(r"```\n(.*?)\n```", text, re.DOTALL),  # Generic code block
-            re.search(r"```javascript\n(.*?)\n```", text, re.DOTALL),  # JS code block
-        ]
+        """Extract workflow JSON from AI response text (single linear pass)"""
+        return extract_workflow_json(text)
 
-        for match in alt_matches:
-            if match:
-                try:
-                    json_str = match.group(1).strip()
-                    workflow_json = json.loads(json_str)
-                    return workflow_json
-                except json.JSONDecodeError:
-                    continue
-
-        # Look for JSON in regular text (more robust approach)
-        try:
-            # Find potential JSON objects
-            json_objects = []
-            stack = []
-            json_start = -1
-
-            for i, char in enumerate(text):
-                if char == "{":
-                    stack.append(i)
-                elif char == "}" and stack:
-                    start = stack.pop()
-                    if not stack:  # Found complete object
-                        json_str = text[start : i + 1]
-                        try:
-                            workflow_json = json.loads(json_str)
-                            # Check if it looks like a workflow
-                            if (
-                                "nodes" in workflow_json
-                                and "connections" in workflow_json
-                            ):
-                                return workflow_json
-                        except json.JSONDecodeError:
-                            pass
-        except:
-            pass
-
-        return None
+    @traced("workflow.extract_all")
+    def extract_all_workflow_jsons_from_text(self, text: str) -> List[Dict[str, Any]]:
+        """Extract every workflow block from AI response text, in order"""
+        return extract_all_workflow_jsons(text)
 
     def process_ai_response(self, ai_response: str) -> str:
-        """Process AI response and create/update workflows in n8n"""
-        workflow_json = self.extract_workflow_json_from_text(ai_response)
+        """Process AI response and create/update workflows in n8n
 
-        if workflow_json:
-            return self.handle_workflow_creation(workflow_json, ai_response)
+        When the response carries several workflow blocks (phases or
+        sub-workflows), they are folded into one change and written to n8n
+        with a single create or update.
+        """
+        workflows = self.extract_all_workflow_jsons_from_text(ai_response)
+
+        if workflows:
+            return self.commit_workflows(workflows, ai_response)
         else:
             return ai_response
 
+    def commit_workflows(
+        self, workflows: List[Dict[str, Any]], original_response: str
+    ) -> str:
+        """Write the workflow blocks of one response as a single change
+
+        When a malformed block stops the fold, the response also says how
+        many other blocks were not written.
+        """
+        workflow_json, skipped = self._fold(workflows)
+        response = self.handle_workflow_creation(workflow_json, original_response)
+        if skipped:
+            plural = "s" if skipped > 1 else ""
+            response += (
+                f"\n\n⚠️ **{skipped} other workflow block{plural} not written.** "
+                "All blocks of an answer are written together; fix the error "
+                "above and send the whole answer again."
+            )
+        return response
+
+    @traced("workflow.fold")
+    def fold_workflows(self, workflows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge workflow blocks from one response into a single workflow
+
+        Nodes and connections are merged in order; the name comes from the
+        last named block, so the phase number reflects the latest phase.
+        A block that is not a well-formed phase is returned on its own, so
+        the write is refused with that block's errors instead of merging
+        part of it.
+        """
+        return self._fold(workflows)[0]
+
+    def _fold(self, workflows: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+        """`fold_workflows()` and the number of blocks it left out"""
+        for workflow_json in workflows:
+            if not self.client.check_phase(workflow_json).valid:
+                return workflow_json, len(workflows) - 1
+        folded = workflows[0]
+        for workflow_json in workflows[1:]:
+            folded = self.client.merge_workflows(folded, workflow_json)
+            if str(workflow_json.get("name", "")).strip():
+                folded["name"] = workflow_json["name"]
+        return folded, 0
+
+    @traced("workflow.handle_creation")
     def handle_workflow_creation(
         self, workflow_json: Dict[str, Any], original_response: str
     ) -> str:
         """Handle workflow creation or update in n8n"""
+        phase_number = self.prepare_workflow(workflow_json, original_response)
+        if phase_number is not None:
+            st.session_state.current_phase = phase_number
 
+        if st.session_state.current_workflow_id:
+            # Update existing workflow (Phase 2+)
+            return self.update_existing_workflow(workflow_json, original_response)
+        else:
+            # Create new workflow (Phase 1)
+            return self.create_new_workflow(workflow_json, original_response)
+
+    def prepare_workflow(
+        self, workflow_json: Dict[str, Any], original_response: str
+    ) -> Optional[int]:
+        """Ensure the workflow has a name and return its phase number, if any
+
+        Touches no session state, so it is safe to call from any thread.
+        """
         # Ensure workflow has a valid name
         if (
             not workflow_json.get("name")
@@ -120,24 +164,83 @@ class WorkflowManager:
         phase_match = re.search(
             r"Phase\s+(\d+)", workflow_json.get("name", ""), re.IGNORECASE
         )
-
-        if phase_match:
-            phase_number = int(phase_match.group(1))
-            st.session_state.current_phase = phase_number
-
-        if st.session_state.current_workflow_id:
-            # Update existing workflow (Phase 2+)
-            return self.update_existing_workflow(workflow_json, original_response)
-        else:
-            # Create new workflow (Phase 1)
-            return self.create_new_workflow(workflow_json, original_response)
+        return int(phase_match.group(1)) if phase_match else None
+
+    @traced("workflow.commit")
+    def commit_workflow(
+        self, workflow_json: Dict[str, Any], workflow_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Create or update the workflow in n8n without touching session state
+
+        Returns the raw client results so they can be rendered later on the
+        Streamlit script thread.
+        """
+        if workflow_id:
+            existing_result, update_result = self._commit_update(
+                workflow_id, workflow_json
+            )
+            return {
+                "action": "update",
+                "existing_result": existing_result,
+                "update_result": update_result,
+            }
+        return {"action": "create", "result": self._create(workflow_json)}
+
+    def start_streaming_commit(self) -> "StreamingWorkflowCommit":
+        """Begin watching a response stream for workflow blocks to commit"""
+        return StreamingWorkflowCommit(self)
+
+    def start_mirror_check(self, workflow_id: str):
+        """Refresh the mirror of `workflow_id` in the background
+
+        Started once the answer opens a ```json block, so the fetch overlaps
+        the rest of the answer and the commit that follows only waits for
+        the PUT. Turns without a workflow never fetch.
+        """
+        fetch = _request_executor.submit(
+            tracer.wrap(self.client.get_workflow), workflow_id
+        )
+        self.mirror.start_check(workflow_id, fetch)
 
     def create_new_workflow(
         self, workflow_json: Dict[str, Any], original_response: str
     ) -> str:
         """Create a new workflow in n8n with enhanced error handling"""
+        result = self._create(workflow_json)
+        return self._render_create_result(workflow_json, original_response, result)
+
+    def _create(self, workflow_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the workflow in n8n and export the created version"""
         result = self.client.create_workflow(workflow_json)
+        if result["success"]:
+            self.mirror.store(result["id"], result["workflow"])
+            result["version"] = self._store_version(
+                workflow_json, result["id"], "create"
+            )
+        return result
+
+    def _store_version(
+        self, workflow_json: Dict[str, Any], workflow_id: str, action: str
+    ) -> int:
+        """Keep a committed workflow version locally and export it
+
+        Returns the local version number used to roll back to it.
+        """
+        stored = self.version_store.record(workflow_id, workflow_json, action)
+        if self.export_writer is not None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            self.export_writer.submit(
+                workflow_json, f"workflow_{workflow_id}_{action}_{timestamp}.json"
+            )
+        return stored.version
 
+    def _render_create_result(
+        self,
+        workflow_json: Dict[str, Any],
+        original_response: str,
+        result: Dict[str, Any],
+    ) -> str:
+        """Record a create result in the session and append it to the response"""
         if result["success"]:
             # Store workflow info in session
             st.session_state.current_workflow_id = result["id"]
@@ -149,6 +252,7 @@ class WorkflowManager:
                     "phase": st.session_state.current_phase,
                     "workflow_id": result["id"],
                     "name": workflow_json.get("name", "Unnamed"),
+                    "version": result.get("version"),
                 }
             )
 
@@ -199,9 +303,80 @@ class WorkflowManager:
         self, workflow_json: Dict[str, Any], original_response: str
     ) -> str:
         """Update existing workflow with new phase and enhanced error handling"""
-        # First, get the existing workflow
-        existing_result = self.client.get_workflow(st.session_state.current_workflow_id)
+        existing_result, update_result = self._commit_update(
+            st.session_state.current_workflow_id, workflow_json
+        )
+        return self._render_update_result(
+            workflow_json, original_response, existing_result, update_result
+        )
+
+    def _commit_update(
+        self, workflow_id: str, workflow_json: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Merge and PUT a phase; update result is None if the fetch failed
+
+        The phase is merged into the mirrored workflow, so the PUT is the
+        only request on the commit path; the freshness check runs earlier,
+        overlapping the answer. The workflow is fetched here when it is not
+        mirrored, and again when n8n rejects a write merged against the mirror.
+        """
+        entry = self.mirror.get(workflow_id)
+        if entry is not None:
+            existing_result = {"success": True}
+            merged_workflow, update_result = self._put_merged(
+                workflow_id, entry.graph, workflow_json
+            )
+            if update_result.get("status_code") in (400, 409):
+                # Our copy may be out of date; retry once against n8n's copy
+                self.mirror.record_conflict(workflow_id)
+                entry = None
+
+        if entry is None:
+            existing_result = self.client.get_workflow(workflow_id)
+            if not existing_result["success"]:
+                return existing_result, None
+            self.mirror.store(workflow_id, existing_result["workflow"])
+            merged_workflow, update_result = self._put_merged(
+                workflow_id, existing_result["workflow"], workflow_json
+            )
 
+        if update_result["success"]:
+            self.mirror.store(workflow_id, update_result["workflow"])
+            update_result["version"] = self._store_version(
+                merged_workflow, workflow_id, "update"
+            )
+        return existing_result, update_result
+
+    def _put_merged(
+        self,
+        workflow_id: str,
+        existing_workflow: Union[Dict[str, Any], WorkflowGraph],
+        workflow_json: Dict[str, Any],
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Merge a phase into `existing_workflow` and PUT the result
+
+        A mirrored graph is merged on a copy, without a round trip through
+        JSON; the mirror entry itself is never modified. A malformed phase
+        is refused before merging, with no request made.
+        """
+        report = self.client.check_phase(workflow_json)
+        if not report.valid:
+            return None, self.client._invalid_result(report)
+        merge = self.client.merge_workflows_with_summary(
+            existing_workflow, workflow_json
+        )
+        update_result = self.client.update_workflow(workflow_id, merge.workflow)
+        update_result["merge"] = merge.summary._asdict()
+        return merge.workflow, update_result
+
+    def _render_update_result(
+        self,
+        workflow_json: Dict[str, Any],
+        original_response: str,
+        existing_result: Dict[str, Any],
+        update_result: Optional[Dict[str, Any]],
+    ) -> str:
+        """Record an update result in the session and append it to the response"""
         if not existing_result["success"]:
             error_msg = existing_result.get("error", "Unknown error")
             details = existing_result.get("details", "")
@@ -217,15 +392,6 @@ class WorkflowManager:
 
             return f"{original_response}{error_section}"
 
-        # Merge the workflows
-        existing_workflow = existing_result["workflow"]
-        merged_workflow = self.client.merge_workflows(existing_workflow, workflow_json)
-
-        # Update the workflow
-        update_result = self.client.update_workflow(
-            st.session_state.current_workflow_id, merged_workflow
-        )
-
         if update_result["success"]:
             # Update phase history
             st.session_state.workflow_phase_history.append(
@@ -233,6 +399,7 @@ class WorkflowManager:
                     "phase": st.session_state.current_phase,
                     "workflow_id": st.session_state.current_workflow_id,
                     "name": workflow_json.get("name", "Unnamed"),
+                    "version": update_result.get("version"),
                 }
             )
 
@@ -273,6 +440,50 @@ class WorkflowManager:
 
             return f"{original_response}{error_section}"
 
+    @traced("workflow.rollback")
+    def rollback_to_version(self, version: int) -> Dict[str, Any]:
+        """Restore an earlier version of the current workflow with one PUT
+
+        The version comes from the local store, so nothing is fetched from
+        n8n. Phase history is cut back to the restored phase and the restore
+        is recorded as a new version.
+        """
+        workflow_id = st.session_state.current_workflow_id
+        if not workflow_id:
+            return {
+                "success": False,
+                "error": "No active workflow",
+                "suggestion": "Create a workflow before rolling back",
+            }
+
+        snapshot = self.version_store.get(workflow_id, version)
+        if snapshot is None:
+            return {
+                "success": False,
+                "error": f"Version {version} not found",
+                "details": f"No local snapshot of version {version} for workflow {workflow_id}",
+                "suggestion": "Pick a phase from this session's phase history",
+            }
+
+        result = self.client.update_workflow(workflow_id, snapshot)
+        if not result["success"]:
+            return result
+
+        self.mirror.store(workflow_id, result["workflow"])
+        result["version"] = self._store_version(snapshot, workflow_id, "rollback")
+        history = [
+            entry
+            for entry in st.session_state.workflow_phase_history
+            if (entry.get("version") or 0) <= version
+        ]
+        st.session_state.workflow_phase_history = history
+        st.session_state.current_workflow_name = snapshot.get(
+            "name", "Unnamed Workflow"
+        )
+        if history:
+            st.session_state.current_phase = history[-1]["phase"]
+        return result
+
     def reset_current_workflow(self):
         """Reset the current workflow state"""
         st.session_state.current_workflow_id = None
@@ -308,5 +519,53 @@ class WorkflowManager:
             return {"has_workflow": False, "message": "Session not initialized"}
 
 
+class StreamingWorkflowCommit:
+    """Watches a streamed AI response and collects its workflow blocks
+
+    `feed()` is called with each chunk on the Streamlit script thread and
+    parses each workflow block as it closes, so the finished answer is not
+    scanned again. `finish()` writes every block, in document order, as
+    one change, exactly like `process_ai_response` would.
+
+    When a workflow is already open, the mirror's freshness check starts as
+    soon as a ```json block opens (or any workflow block closes), so the
+    fetch overlaps the rest of the answer and chat turns without a
+    workflow cost no request.
+    """
+
+    def __init__(self, manager: WorkflowManager):
+        self.manager = manager
+        # Session state is only readable on the script thread, so capture it here
+        self._workflow_id = st.session_state.get("current_workflow_id")
+        self._check_started = False
+        self._scanner = JsonObjectScanner()
+        # Workflow blocks of the answer so far, in document order
+        self.workflows: List[Dict[str, Any]] = []
+
+    def feed(self, chunk: str):
+        """Consume the next chunk of the response stream"""
+        candidates = self._scanner.feed(chunk)
+        if self._scanner.fence in JSON_FENCES:
+            self._start_mirror_check()
+
+        for candidate in candidates:
+            if is_workflow_candidate(candidate):
+                self._start_mirror_check()
+                self.workflows.append(candidate.value)
+
+    def _start_mirror_check(self):
+        """Start the freshness check of the open workflow, once per turn"""
+        if self._workflow_id and not self._check_started:
+            self._check_started = True
+            self.manager.start_mirror_check(self._workflow_id)
+
+    def finish(self, full_response: str) -> str:
+        """Write the answer's workflow blocks and return the enhanced response"""
+        if not self.workflows:
+            # No workflow block seen while streaming; use the regular path
+            return self.manager.process_ai_response(full_response)
+        return self.manager.commit_workflows(self.workflows, full_response)
+
+
 # Singleton instance
 workflow_manager = WorkflowManager()
@@ -0,0 +1,34 @@
+"""
+BuildMap Workflow Merge - Merges a new phase into an existing n8n workflow
+"""
+
+from typing import Any, Dict, NamedTuple, Union
+
+from n8n_integration.workflow_graph import MergeSummary, WorkflowGraph
+
+
+class MergeResult(NamedTuple):
+    workflow: Dict[str, Any]
+    summary: MergeSummary
+
+
+def merge_workflows(
+    existing_workflow: Union[Dict[str, Any], WorkflowGraph], new_phase: Dict[str, Any]
+) -> MergeResult:
+    """Merge `new_phase` into `existing_workflow` without mutating either
+
+    Nodes are matched by name: a new node whose name already exists is
+    skipped, and one whose id is taken gets a fresh id. Connections are
+    merged per source node, output type and output index, so a phase that
+    adds an output to an existing node keeps that node's other outputs.
+    Top-level fields other than nodes and connections come from
+    `existing_workflow`. Runs in O(nodes + edges) on a `WorkflowGraph`;
+    an existing workflow that is already a graph (a mirror entry) is
+    copied rather than loaded from JSON.
+    """
+    if isinstance(existing_workflow, WorkflowGraph):
+        graph = existing_workflow.copy()
+    else:
+        graph = WorkflowGraph.from_json(existing_workflow)
+    summary = graph.merge(WorkflowGraph.from_json(new_phase))
+    return MergeResult(graph.to_json(), summary)
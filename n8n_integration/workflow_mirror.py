@@ -0,0 +1,125 @@
+"""
+BuildMap Workflow Mirror - Local copies of n8n workflows to merge phases against
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, NamedTuple, Optional
+
+from n8n_integration.workflow_graph import WorkflowGraph
+
+# Seconds to wait for a running freshness check before falling back to a GET
+N8N_MIRROR_CHECK_TIMEOUT = float(os.environ.get("N8N_MIRROR_CHECK_TIMEOUT", "10"))
+
+
+class MirrorEntry(NamedTuple):
+    """n8n's copy of a workflow as of its last create, update or fetch"""
+
+    graph: WorkflowGraph  # read-only; call to_json() for a workflow to edit
+    version_id: Optional[str]
+    updated_at: Optional[str]
+    synced_at: float
+
+
+class WorkflowMirror:
+    """Latest known server state of each workflow, keyed by workflow ID
+
+    Entries are filled from the workflow n8n returns on create, update and
+    fetch and held as compact `WorkflowGraph`s, so a phase update can merge
+    against the mirror instead of fetching first. A freshness check (a GET
+    started in the background once the answer opens a workflow block,
+    while the model is still writing) replaces an entry whose `versionId`
+    changed because the workflow was edited in the n8n UI. `get()` waits
+    for that check, so a commit never merges against a copy the check has
+    already shown to be stale.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, MirrorEntry] = {}
+        self._checks: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "checks": 0, "stale": 0, "conflicts": 0}
+
+    def store(self, workflow_id: str, workflow: Dict[str, Any]) -> MirrorEntry:
+        """Record the workflow n8n returned for `workflow_id`"""
+        entry = MirrorEntry(
+            WorkflowGraph.from_json(workflow),
+            workflow.get("versionId"),
+            workflow.get("updatedAt"),
+            time.time(),
+        )
+        with self._lock:
+            self._entries[workflow_id] = entry
+        return entry
+
+    def invalidate(self, workflow_id: str):
+        """Forget `workflow_id`; the next update fetches it again"""
+        with self._lock:
+            self._entries.pop(workflow_id, None)
+
+    def has(self, workflow_id: str) -> bool:
+        with self._lock:
+            return workflow_id in self._entries
+
+    def start_check(self, workflow_id: str, fetch: Future):
+        """Track a background fetch of `workflow_id` as its freshness check
+
+        `fetch` resolves to a `get_workflow` result dict.
+        """
+        with self._lock:
+            self._checks[workflow_id] = fetch
+            self.stats["checks"] += 1
+
+    def get(self, workflow_id: str, timeout: float = None) -> Optional[MirrorEntry]:
+        """The mirrored workflow once any freshness check has finished
+
+        Returns None when the workflow is not mirrored, was deleted, or its
+        check did not finish in time; the caller then fetches it.
+        """
+        with self._lock:
+            check = self._checks.pop(workflow_id, None)
+        if check is not None and not self._apply_check(workflow_id, check, timeout):
+            self.invalidate(workflow_id)
+
+        with self._lock:
+            entry = self._entries.get(workflow_id)
+            self.stats["hits" if entry else "misses"] += 1
+        return entry
+
+    def _apply_check(self, workflow_id: str, check: Future, timeout: float) -> bool:
+        """Fold a freshness check into the mirror; False if the entry is unusable"""
+        try:
+            result = check.result(
+                N8N_MIRROR_CHECK_TIMEOUT if timeout is None else timeout
+            )
+        except Exception:
+            return False
+        if not result["success"]:
+            # A transient error keeps the entry; a conflict on PUT still refetches
+            return result.get("status_code") not in (403, 404)
+
+        workflow = result["workflow"]
+        with self._lock:
+            entry = self._entries.get(workflow_id)
+        if entry is None or entry.version_id != workflow.get("versionId"):
+            if entry is not None:
+                # Someone changed the workflow in n8n since our last write
+                self.stats["stale"] += 1
+            self.store(workflow_id, workflow)
+        return True
+
+    def record_conflict(self, workflow_id: str):
+        """n8n rejected a write merged against the mirror; drop the entry"""
+        with self._lock:
+            self.stats["conflicts"] += 1
+        self.invalidate(workflow_id)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "workflows": len(self._entries)}
+
+
+# Singleton mirror shared by all sessions
+workflow_mirror = WorkflowMirror()
@@ -0,0 +1,373 @@
+"""
+BuildMap Workflow Validator - Pre-flight structural and referential checks
+"""
+
+import numbers
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from n8n_integration.workflow_graph import Node, WorkflowGraph
+
+# n8n workflow schema the validator is built for
+N8N_WORKFLOW_SCHEMA = os.environ.get("N8N_WORKFLOW_SCHEMA", "1")
+
+# Fields n8n sets itself; the API rejects them on create and update
+READ_ONLY_FIELDS = (
+    "active",
+    "tags",
+    "version",
+    "createdAt",
+    "updatedAt",
+    "id",
+    "versionId",
+)
+
+_STRING = (str,)
+_NUMBER = (numbers.Real,)
+_LIST = (list, tuple)
+_DICT = (dict,)
+_TYPE_NAMES = {
+    str: "string",
+    numbers.Real: "number",
+    list: "array",
+    tuple: "array",
+    dict: "object",
+    bool: "boolean",
+    type(None): "null",
+}
+
+# Field rules per schema version: required fields, then typed optional fields
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "1": {
+        "workflow_required": {"name": _STRING, "nodes": _LIST},
+        "workflow_optional": {
+            "connections": _DICT,
+            "settings": _DICT,
+            "staticData": _DICT + (type(None),),
+            "pinData": _DICT,
+        },
+        "node_required": {"name": _STRING, "type": _STRING},
+        "node_optional": {
+            "id": _STRING,
+            "typeVersion": _NUMBER,
+            "position": _LIST,
+            "parameters": _DICT,
+            "credentials": _DICT,
+            "disabled": (bool,),
+        },
+    },
+}
+
+
+class ValidationIssue(NamedTuple):
+    """One problem, located by a JSON path such as `$.nodes[2].typeVersion`"""
+
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+class ValidationReport(NamedTuple):
+    errors: List[ValidationIssue]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def summary(self, limit: int = 10) -> str:
+        """Errors as one line each, at most `limit` of them"""
+        lines = [str(issue) for issue in self.errors[:limit]]
+        if len(self.errors) > limit:
+            lines.append(f"... and {len(self.errors) - limit} more")
+        return "\n".join(lines)
+
+
+def _type_name(types: Tuple[type, ...]) -> str:
+    return " or ".join(dict.fromkeys(_TYPE_NAMES.get(t, t.__name__) for t in types))
+
+
+def _key_path(prefix: str, key: str) -> str:
+    return f"{prefix}.{key}" if key.isidentifier() else f"{prefix}[{key!r}]"
+
+
+class WorkflowValidator:
+    """Checks a workflow before it is sent to n8n, without modifying it
+
+    Field rules for one schema version are compiled into lookup tables
+    once; `validate()` then walks nodes and connections a single time and
+    reports every problem it finds: missing or mistyped fields, empty
+    names, duplicate node names and ids, bad `typeVersion` and `position`
+    values, and connections from or to nodes that do not exist. Nodes are
+    loaded into a `WorkflowGraph`, whose name and id indexes resolve
+    connections and find duplicates in linear time.
+    """
+
+    def __init__(self, schema_version: str = None):
+        self.schema_version = schema_version or N8N_WORKFLOW_SCHEMA
+        if self.schema_version not in SCHEMAS:
+            raise ValueError(f"Unknown n8n workflow schema: {self.schema_version}")
+        schema = SCHEMAS[self.schema_version]
+        self._workflow_rules = self._compile(
+            schema["workflow_required"], schema["workflow_optional"]
+        )
+        self._node_rules = self._compile(
+            schema["node_required"], schema["node_optional"]
+        )
+        self._phase_rules = self._compile(
+            {}, {**schema["workflow_required"], **schema["workflow_optional"]}
+        )
+
+    @staticmethod
+    def _compile(
+        required: Dict[str, tuple], optional: Dict[str, tuple]
+    ) -> List[Tuple[str, tuple, bool, str]]:
+        """(field, types, required, type name) rows, checked in order"""
+        return [
+            (field, types, field in required, _type_name(types))
+            for field, types in {**required, **optional}.items()
+        ]
+
+    def _check_fields(
+        self,
+        data: Dict[str, Any],
+        rules: List[Tuple[str, tuple, bool, str]],
+        prefix: str,
+        errors: List[ValidationIssue],
+    ):
+        for field, types, required, type_name in rules:
+            if field not in data:
+                if required:
+                    errors.append(
+                        ValidationIssue(_key_path(prefix, field), "is required")
+                    )
+                continue
+            value = data[field]
+            # bool is an int subclass; only accept it where booleans belong
+            if not isinstance(value, types) or (
+                isinstance(value, bool) and bool not in types
+            ):
+                errors.append(
+                    ValidationIssue(
+                        _key_path(prefix, field),
+                        f"must be {type_name}, got {type(value).__name__}",
+                    )
+                )
+            elif types is _STRING and required and not value.strip():
+                errors.append(ValidationIssue(_key_path(prefix, field), "is empty"))
+
+    def validate(
+        self,
+        workflow_json: Dict[str, Any],
+        node_types: Any = None,
+        phase: bool = False,
+    ) -> ValidationReport:
+        """Report every structural and referential error in one pass
+
+        With `node_types` (a `NodeTypeCatalog` of the target instance), each
+        node's `type` must be installed and its `typeVersion` available.
+        A `phase` is a fragment to merge into a workflow: it needs no name
+        or nodes, and its connections may name nodes of that workflow, so
+        only its structure is checked.
+        """
+        errors: List[ValidationIssue] = []
+        if not isinstance(workflow_json, dict):
+            errors.append(ValidationIssue("$", "workflow must be an object"))
+            return ValidationReport(errors)
+        self._check_fields(
+            workflow_json,
+            self._phase_rules if phase else self._workflow_rules,
+            "$",
+            errors,
+        )
+
+        nodes = workflow_json.get("nodes")
+        graph = WorkflowGraph()
+        if isinstance(nodes, _LIST):
+            if not nodes and not phase:
+                errors.append(
+                    ValidationIssue("$.nodes", "must contain at least one node")
+                )
+            for index, node in enumerate(nodes):
+                self._validate_node(node, f"$.nodes[{index}]", node_types, errors)
+                # A non-object holds its place, so graph.nodes[i] is $.nodes[i]
+                graph.add_node(Node(node if isinstance(node, dict) else {}))
+            if graph.duplicate_names or graph.duplicate_ids:
+                self._report_duplicates(graph, errors)
+
+        connections = workflow_json.get("connections")
+        if isinstance(connections, dict):
+            self._validate_connections(connections, None if phase else graph, errors)
+        return ValidationReport(errors)
+
+    @staticmethod
+    def _report_duplicates(graph: WorkflowGraph, errors: List[ValidationIssue]):
+        """Flag each node that reuses the name or id of an earlier node"""
+        first_names: Dict[str, int] = {}
+        first_ids: Dict[str, int] = {}
+        for index, node in enumerate(graph.nodes):
+            name = node.get("name")
+            if isinstance(name, str) and name in graph.duplicate_names:
+                if name not in first_names:
+                    first_names[name] = index
+                elif name.strip():
+                    errors.append(
+                        ValidationIssue(
+                            f"$.nodes[{index}].name",
+                            f"duplicate node name {name!r} "
+                            f"(also $.nodes[{first_names[name]}])",
+                        )
+                    )
+            node_id = node.get("id")
+            if isinstance(node_id, str) and node_id in graph.duplicate_ids:
+                if node_id not in first_ids:
+                    first_ids[node_id] = index
+                else:
+                    errors.append(
+                        ValidationIssue(
+                            f"$.nodes[{index}].id",
+                            f"duplicate node id {node_id!r} "
+                            f"(also $.nodes[{first_ids[node_id]}])",
+                        )
+                    )
+
+    def _validate_node(
+        self,
+        node: Any,
+        path: str,
+        node_types: Any,
+        errors: List[ValidationIssue],
+    ):
+        if not isinstance(node, dict):
+            errors.append(ValidationIssue(path, "node must be an object"))
+            return
+        self._check_fields(node, self._node_rules, path, errors)
+
+        type_version = node.get("typeVersion")
+        if (
+            isinstance(type_version, numbers.Real)
+            and not isinstance(type_version, bool)
+            and type_version < 1
+        ):
+            errors.append(
+                ValidationIssue(f"{path}.typeVersion", "must be 1 or greater")
+            )
+        position = node.get("position")
+        if isinstance(position, _LIST) and (
+            len(position) != 2
+            or not all(
+                isinstance(value, numbers.Real) and not isinstance(value, bool)
+                for value in position
+            )
+        ):
+            errors.append(
+                ValidationIssue(f"{path}.position", "must be two numbers [x, y]")
+            )
+
+        node_type = node.get("type")
+        if node_types is not None and isinstance(node_type, str):
+            known = node_types.get(node_type)
+            if known is None:
+                errors.append(
+                    ValidationIssue(
+                        f"{path}.type",
+                        f"node type {node_type!r} is not installed on the n8n instance",
+                    )
+                )
+            elif (
+                isinstance(type_version, numbers.Real)
+                and not isinstance(type_version, bool)
+                and type_version not in known.versions
+            ):
+                errors.append(
+                    ValidationIssue(
+                        f"{path}.typeVersion",
+                        f"version {type_version} of {node_type!r} is not available "
+                        f"(available: {', '.join(map(str, known.versions))})",
+                    )
+                )
+
+    def _validate_connections(
+        self,
+        connections: Dict[str, Any],
+        graph: Optional[WorkflowGraph],
+        errors: List[ValidationIssue],
+    ):
+        for source, outputs in connections.items():
+            source_path = _key_path("$.connections", source)
+            if graph is not None and source not in graph.by_name:
+                errors.append(
+                    ValidationIssue(
+                        source_path, f"source node {source!r} does not exist"
+                    )
+                )
+            if not isinstance(outputs, dict):
+                errors.append(ValidationIssue(source_path, "must be an object"))
+                continue
+            for output_type, slots in outputs.items():
+                type_path = _key_path(source_path, output_type)
+                if not isinstance(slots, _LIST):
+                    errors.append(ValidationIssue(type_path, "must be an array"))
+                    continue
+                for slot_index, edges in enumerate(slots):
+                    slot_path = f"{type_path}[{slot_index}]"
+                    if edges is None:
+                        continue
+                    if not isinstance(edges, _LIST):
+                        errors.append(ValidationIssue(slot_path, "must be an array"))
+                        continue
+                    for edge_index, edge in enumerate(edges):
+                        self._validate_edge(
+                            edge, f"{slot_path}[{edge_index}]", graph, errors
+                        )
+
+    def _validate_edge(
+        self,
+        edge: Any,
+        path: str,
+        graph: Optional[WorkflowGraph],
+        errors: List[ValidationIssue],
+    ):
+        if not isinstance(edge, dict):
+            errors.append(ValidationIssue(path, "connection must be an object"))
+            return
+        target = edge.get("node")
+        if not isinstance(target, str):
+            errors.append(ValidationIssue(f"{path}.node", "is required"))
+        elif graph is not None and target not in graph.by_name:
+            errors.append(
+                ValidationIssue(
+                    f"{path}.node", f"target node {target!r} does not exist"
+                )
+            )
+        if "type" in edge and not isinstance(edge["type"], str):
+            errors.append(ValidationIssue(f"{path}.type", "must be string"))
+        index = edge.get("index", 0)
+        if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+            errors.append(
+                ValidationIssue(f"{path}.index", "must be a non-negative integer")
+            )
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_version: str = None) -> WorkflowValidator:
+    """The validator for `schema_version`, built on first use"""
+    return WorkflowValidator(schema_version)
+
+
+def api_payload(workflow_json: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a workflow as the n8n API accepts it
+
+    Read-only fields are left out and `settings` and `connections` default
+    to empty objects. The input is not modified.
+    """
+    payload = {
+        key: value
+        for key, value in workflow_json.items()
+        if key not in READ_ONLY_FIELDS
+    }
+    payload.setdefault("settings", {})
+    payload.setdefault("connections", {})
+    return payload